@@ -0,0 +1,80 @@
+"""Microbenchmark: combining 50 sheets x 200 templates.
+
+Compares the previous per-template ``get_consent`` over freshly built order
+dicts with the shared ``ConsentMatrix`` reduction.
+
+    python benchmarks/bench_consent_matrix.py
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from models.consent_matrix import ConsentMatrix  # noqa: E402
+from models.db_models import ConsentStatus  # noqa: E402
+
+SHEETS = 50
+TEMPLATES = 200
+REPEAT = 20
+
+
+def _legacy_order(status: ConsentStatus) -> int:
+    # the dict used to be rebuilt on every ConsentStatus.order access
+    return {
+        ConsentStatus.yes: 0,
+        ConsentStatus.okay: 1,
+        ConsentStatus.maybe: 2,
+        ConsentStatus.unknown: 3,
+        ConsentStatus.no: 4,
+    }[status]
+
+
+def _legacy(sheets, template_ids):
+    result = {}
+    for template_id in template_ids:
+        statuses = [sheet.entries_dict[template_id].preference for sheet in sheets]
+        result[template_id] = sorted(statuses, key=_legacy_order, reverse=True)[0]
+    return result
+
+
+def _matrix(sheets, template_ids):
+    return ConsentMatrix.from_sheets(sheets, template_ids).status_by_key()
+
+
+def _make_sheets():
+    rng = random.Random(42)
+    statuses = list(ConsentStatus)
+    template_ids = list(range(1, TEMPLATES + 1))
+    sheets = []
+    for _ in range(SHEETS):
+        entries = [
+            SimpleNamespace(consent_template_id=tid, preference=rng.choice(statuses))
+            for tid in template_ids
+        ]
+        sheets.append(
+            SimpleNamespace(
+                consent_entries=entries,
+                entries_dict={entry.consent_template_id: entry for entry in entries},
+            )
+        )
+    return sheets, template_ids
+
+
+def main():
+    sheets, template_ids = _make_sheets()
+    assert _legacy(sheets, template_ids) == _matrix(sheets, template_ids)
+    timings = {}
+    for name, func in (("legacy", _legacy), ("matrix", _matrix)):
+        timings[name] = min(
+            timeit.repeat(lambda: func(sheets, template_ids), number=1, repeat=REPEAT)
+        )
+        print(f"{name:>7}: {timings[name] * 1000:8.2f} ms for {SHEETS}x{TEMPLATES}")
+    print(f"speedup: {timings['legacy'] / timings['matrix']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark: creating consent sheets against the seeded template catalog.
+
+Times N single ``create_consent_sheet`` calls against one bulk
+``create_consent_sheets`` call on a throwaway SQLite database.
+
+    python benchmarks/bench_create_sheets.py [N]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+os.chdir(ROOT)
+os.environ["DB_CONNECTION_STRING"] = (
+    f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.sqlite'}"
+)
+
+from sqlmodel import SQLModel, func, select  # noqa: E402
+
+from models import model_utils, seeder  # noqa: E402
+from models.db_models import ConsentEntry, ConsentTemplate, User  # noqa: E402
+from models.model_utils import session_scope  # noqa: E402
+from services.sheet_service import (  # noqa: E402
+    create_consent_sheet,
+    create_consent_sheets,
+)
+
+
+def main(count: int = 50):
+    SQLModel.metadata.create_all(model_utils.engine)
+    seeder.seed_consent_questioneer()
+    with session_scope() as session:
+        user = User(id_name="bench", nickname="Bench")
+        session.add(user)
+        session.commit()
+        templates = session.exec(select(func.count(ConsentTemplate.id))).one()
+
+        start = time.perf_counter()
+        for _ in range(count):
+            create_consent_sheet(user, session=session)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        create_consent_sheets(user, count, session=session)
+        bulk = time.perf_counter() - start
+
+        entries = session.exec(select(func.count(ConsentEntry.id))).one()
+    assert entries == 2 * count * templates
+    print(f"{count} sheets x {templates} templates")
+    print(f"single: {single * 1000:8.1f} ms ({single / count * 1000:.2f} ms/sheet)")
+    print(f"  bulk: {bulk * 1000:8.1f} ms ({bulk / count * 1000:.2f} ms/sheet)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
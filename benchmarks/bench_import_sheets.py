@@ -0,0 +1,86 @@
+"""Benchmark: importing exported consent sheets.
+
+Exports one fully filled sheet against the seeded template catalog, then
+imports it N times as a JSON array and as a zip archive of N files on a
+throwaway SQLite database and reports entry rows written per second.
+
+    python benchmarks/bench_import_sheets.py [N]
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+os.chdir(ROOT)
+os.environ["DB_CONNECTION_STRING"] = (
+    f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.sqlite'}"
+)
+
+from sqlmodel import SQLModel, func, select  # noqa: E402
+
+from models import model_utils, seeder  # noqa: E402
+from models.db_models import ConsentEntry, ConsentTemplate, User  # noqa: E402
+from models.model_utils import session_scope  # noqa: E402
+from services.import_service import import_sheets  # noqa: E402
+
+
+def _export(template_ids: list[int]) -> dict:
+    statuses = ["yes", "okay", "maybe", "no", "unknown"]
+    return {
+        "human_name": "bench",
+        "comment": "imported",
+        "consent_entries": [
+            {
+                "consent_template_id": template_id,
+                "preference": statuses[template_id % len(statuses)],
+                "comment": "note" if template_id % 7 == 0 else None,
+            }
+            for template_id in template_ids
+        ],
+        "custom_consent_entries": [
+            {"content": f"custom {index}", "preference": "maybe"} for index in range(5)
+        ],
+    }
+
+
+def _timed(label: str, payload, user, session, rows: int) -> None:
+    start = time.perf_counter()
+    import_sheets(payload, user, session=session)
+    elapsed = time.perf_counter() - start
+    print(f"{label:>5}: {elapsed * 1000:8.1f} ms ({rows / elapsed:,.0f} rows/s)")
+
+
+def main(count: int = 50):
+    SQLModel.metadata.create_all(model_utils.engine)
+    seeder.seed_consent_questioneer()
+    with session_scope() as session:
+        user = User(id_name="bench", nickname="Bench")
+        session.add(user)
+        session.commit()
+        template_ids = session.exec(select(ConsentTemplate.id)).all()
+        sheet = _export(template_ids)
+        rows = count * (len(template_ids) + len(sheet["custom_consent_entries"]))
+
+        array = json.dumps([sheet] * count)
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zipped:
+            for index in range(count):
+                zipped.writestr(f"sheet_{index}.json", json.dumps(sheet))
+
+        print(f"{count} sheets x {len(template_ids)} templates, {rows} rows per run")
+        _timed("zip", archive.getvalue(), user, session, rows)
+        _timed("array", array, user, session, rows)
+
+        entries = session.exec(select(func.count(ConsentEntry.id))).one()
+    assert entries == 2 * count * len(template_ids)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,133 @@
+"""Benchmark: 1k players joining one convention table group at once.
+
+Times concurrent joins through the previous path (invite code lookup without
+index, ``session.merge`` of the membership link) against ``join_group``
+(indexed lookup, ``INSERT ... ON CONFLICT DO NOTHING``) on a throwaway SQLite
+database holding many other groups. Every player joins twice in a row, as
+happens when the join button is clicked twice.
+
+    python benchmarks/bench_join_group.py [PLAYERS] [GROUPS] [WORKERS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+os.chdir(ROOT)
+os.environ["DB_CONNECTION_STRING"] = (
+    f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.sqlite'}"
+)
+
+from sqlalchemy import insert, text  # noqa: E402
+from sqlalchemy.exc import IntegrityError  # noqa: E402
+from sqlmodel import SQLModel, func, select  # noqa: E402
+
+from models import model_utils  # noqa: E402
+from models.db_models import RPGGroup, User, UserGroupLink  # noqa: E402
+from models.model_utils import session_scope  # noqa: E402
+from services.group_service import create_new_group, join_group  # noqa: E402
+
+
+def _legacy_join(code: str, user: User) -> RPGGroup | None:
+    with session_scope() as session:
+        managed_user = session.get(User, user.id)
+        group = session.exec(
+            select(RPGGroup).where(RPGGroup.invite_code == code)
+        ).first()
+        session.merge(UserGroupLink(user_id=managed_user.id, group_id=group.id))
+        session.commit()
+        return group
+
+
+def _setup(players: int, groups: int) -> tuple[list[User], list[tuple[int, str]]]:
+    SQLModel.metadata.create_all(model_utils.engine)
+    with session_scope() as session:
+        gm = User(id_name="gm", nickname="GM")
+        session.add(gm)
+        session.commit()
+        session.exec(
+            insert(RPGGroup),
+            params=[
+                {
+                    "name": f"other-{index}",
+                    "invite_code": f"x{index}-000-000",
+                    "gm_user_id": gm.id,
+                }
+                for index in range(groups)
+            ],
+        )
+        session.exec(
+            insert(User),
+            params=[
+                {"id_name": f"player-{index}", "nickname": f"Player {index}"}
+                for index in range(players)
+            ],
+        )
+        session.commit()
+        users = session.exec(select(User).where(User.id != gm.id)).all()
+        session.expunge_all()
+        tables = [create_new_group(gm, session=session) for _ in range(2)]
+        tables = [(table.id, table.invite_code) for table in tables]
+        session.expunge_all()
+    return users, tables
+
+
+def _run(join, code: str, users: list[User], workers: int) -> tuple[float, int]:
+    def attempt(user: User) -> bool:
+        try:
+            join(code, user)
+        except IntegrityError:
+            # two joins of one player raced between the SELECT and the INSERT
+            return False
+        return True
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        twice = [user for user in users for _ in range(2)]
+        failed = list(pool.map(attempt, twice)).count(False)
+    return time.perf_counter() - start, failed
+
+
+def _members(group_id: int) -> int:
+    with session_scope() as session:
+        return session.exec(
+            select(func.count()).where(UserGroupLink.group_id == group_id)
+        ).one()
+
+
+def main(players: int = 1000, groups: int = 20000, workers: int = 16):
+    users, (legacy_table, table) = _setup(players, groups)
+
+    with model_utils.engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_rpggroup_invite_code"))
+    legacy, legacy_failed = _run(_legacy_join, legacy_table[1], users, workers)
+    with model_utils.engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE UNIQUE INDEX ix_rpggroup_invite_code ON rpggroup (invite_code)"
+            )
+        )
+    upsert, upsert_failed = _run(join_group, table[1], users, workers)
+
+    assert _members(table[0]) == players + 1
+    joins = 2 * players
+    print(
+        f"{joins} joins of {players} players, {groups} other groups, {workers} workers"
+    )
+    for label, seconds, failed in (
+        ("merge", legacy, legacy_failed),
+        ("upsert", upsert, upsert_failed),
+    ):
+        print(
+            f"{label:>6}: {seconds * 1000:8.1f} ms "
+            f"({seconds / joins * 1000:.2f} ms/join, {failed} failed)"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
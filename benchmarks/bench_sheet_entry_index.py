@@ -0,0 +1,66 @@
+"""Microbenchmark: entry lookups while rendering a 300-template sheet.
+
+Replays the lookups the sheet editor (one ``get_entry`` per template) and the
+sheet display (one lookup per template and sheet) make while rendering, once
+with the previous dict that was rebuilt on every access and once with the
+cached ``ConsentSheet.entry_index``.
+
+    python benchmarks/bench_sheet_entry_index.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from models.db_models import ConsentEntry, ConsentSheet  # noqa: E402
+
+TEMPLATES = 300
+SHEETS = 5
+REPEAT = 20
+
+
+def _legacy_get_entry(sheet: ConsentSheet, template_id: int) -> ConsentEntry:
+    # consent_entries_dict used to build a new dict on every access
+    return {entry.consent_template_id: entry for entry in sheet.consent_entries}.get(
+        template_id
+    )
+
+
+def _make_sheet(template_ids: list[int]) -> ConsentSheet:
+    sheet = ConsentSheet(unique_name="bench")
+    sheet.consent_entries.extend(
+        ConsentEntry(consent_template_id=template_id) for template_id in template_ids
+    )
+    return sheet
+
+
+def _render(sheets, template_ids, get_entry):
+    editor = [get_entry(sheets[0], template_id) for template_id in template_ids]
+    display = {
+        template_id: [get_entry(sheet, template_id) for sheet in sheets]
+        for template_id in template_ids
+    }
+    return editor, display
+
+
+def main() -> None:
+    template_ids = list(range(1, TEMPLATES + 1))
+    sheets = [_make_sheet(template_ids) for _ in range(SHEETS)]
+    assert _render(sheets, template_ids, _legacy_get_entry) == _render(
+        sheets, template_ids, ConsentSheet.get_entry
+    )
+
+    for label, get_entry in (
+        ("rebuilt dict", _legacy_get_entry),
+        ("entry index", ConsentSheet.get_entry),
+    ):
+        seconds = timeit.timeit(
+            lambda: _render(sheets, template_ids, get_entry), number=REPEAT
+        )
+        print(f"{label:>12}: {seconds / REPEAT * 1000:8.2f} ms per render")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""sheet template version
+
+Revision ID: 3c1d9e7b2a40
+Revises: 8f751cf861d1
+Create Date: 2026-10-18 13:10:12.418263
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1d9e7b2a40'
+down_revision: Union[str, None] = '8f751cf861d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing sheets start at version 0 and get backfilled once on first read
+    with op.batch_alter_table('consentsheet', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('template_version', sa.Integer(), nullable=False, server_default='0')
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('consentsheet', schema=None) as batch_op:
+        batch_op.drop_column('template_version')
@@ -0,0 +1,69 @@
+"""group consent aggregate
+
+Revision ID: 5a7e2c9d4b18
+Revises: 3c1d9e7b2a40
+Create Date: 2026-10-18 13:40:27.906114
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7e2c9d4b18'
+down_revision: Union[str, None] = '3c1d9e7b2a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the consentstatus type already exists on postgres, reuse it instead of creating it
+CONSENT_STATUS = sa.Enum(
+    'yes', 'okay', 'maybe', 'no', 'unknown', name='consentstatus'
+).with_variant(
+    postgresql.ENUM(
+        'yes', 'okay', 'maybe', 'no', 'unknown', name='consentstatus', create_type=False
+    ),
+    'postgresql',
+)
+
+
+def _aggregate_columns() -> list[sa.Column]:
+    return [
+        sa.Column('preference', CONSENT_STATUS, nullable=False),
+        sa.Column('has_hard_limit', sa.Boolean(), nullable=False),
+        sa.Column('sheet_count', sa.Integer(), nullable=False),
+        sa.Column('yes_count', sa.Integer(), nullable=False),
+        sa.Column('okay_count', sa.Integer(), nullable=False),
+        sa.Column('maybe_count', sa.Integer(), nullable=False),
+        sa.Column('unknown_count', sa.Integer(), nullable=False),
+        sa.Column('no_count', sa.Integer(), nullable=False),
+        sa.Column('comments', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    # rows are rebuilt lazily per group on first read of the group page
+    op.create_table('groupconsentaggregate',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('consent_template_id', sa.Integer(), nullable=False),
+    *_aggregate_columns(),
+    sa.ForeignKeyConstraint(['consent_template_id'], ['consenttemplate.id'], ),
+    sa.ForeignKeyConstraint(['group_id'], ['rpggroup.id'], ),
+    sa.PrimaryKeyConstraint('group_id', 'consent_template_id')
+    )
+    op.create_table('groupcustomconsentaggregate',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('content_key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('content', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    *_aggregate_columns(),
+    sa.ForeignKeyConstraint(['group_id'], ['rpggroup.id'], ),
+    sa.PrimaryKeyConstraint('group_id', 'content_key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('groupcustomconsentaggregate')
+    op.drop_table('groupconsentaggregate')
@@ -0,0 +1,30 @@
+"""unique share id index
+
+Revision ID: 9b3f6a1c7e52
+Revises: 5a7e2c9d4b18
+Create Date: 2026-10-18 14:20:41.230118
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3f6a1c7e52'
+down_revision: Union[str, None] = '5a7e2c9d4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # share ids were checked against a full scan before, so existing values are unique
+    with op.batch_alter_table('consentsheet', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_consentsheet_public_share_id'), ['public_share_id'], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('consentsheet', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_consentsheet_public_share_id'))
@@ -0,0 +1,38 @@
+"""optimistic concurrency versions
+
+Revision ID: c4e81f2a9d36
+Revises: 9b3f6a1c7e52
+Create Date: 2026-10-18 15:30:12.584203
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e81f2a9d36'
+down_revision: Union[str, None] = '9b3f6a1c7e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing rows start at version 0, entries have not been changed since
+    with op.batch_alter_table('consentsheet', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('consententry', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('consententry', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('consentsheet', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,67 @@
+"""link global gm sheet
+
+Revision ID: e2a7c5b83f19
+Revises: c4e81f2a9d36
+Create Date: 2026-10-18 16:10:37.402915
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c5b83f19'
+down_revision: Union[str, None] = 'c4e81f2a9d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Global groups created without a GM sheet used to be repaired on every
+    # page load; do it once here. Their aggregates are dropped and rebuilt on
+    # the next read of the group page.
+    connection = op.get_bind()
+    group_ids = connection.execute(
+        sa.text(
+            "SELECT rpggroup.id FROM rpggroup"
+            " WHERE rpggroup.invite_code = 'global'"
+            " AND rpggroup.gm_consent_sheet_id IS NULL"
+            " AND EXISTS (SELECT 1 FROM consentsheet"
+            " WHERE consentsheet.user_id = rpggroup.gm_user_id)"
+        )
+    ).scalars().all()
+    for group_id in group_ids:
+        params = {"group_id": group_id}
+        connection.execute(
+            sa.text(
+                "UPDATE rpggroup SET gm_consent_sheet_id = ("
+                "SELECT MIN(consentsheet.id) FROM consentsheet"
+                " WHERE consentsheet.user_id = rpggroup.gm_user_id)"
+                " WHERE rpggroup.id = :group_id"
+            ),
+            params,
+        )
+        connection.execute(
+            sa.text(
+                "INSERT INTO groupconsentsheetlink (group_id, consent_sheet_id)"
+                " SELECT rpggroup.id, rpggroup.gm_consent_sheet_id FROM rpggroup"
+                " WHERE rpggroup.id = :group_id AND NOT EXISTS ("
+                "SELECT 1 FROM groupconsentsheetlink"
+                " WHERE groupconsentsheetlink.group_id = rpggroup.id"
+                " AND groupconsentsheetlink.consent_sheet_id"
+                " = rpggroup.gm_consent_sheet_id)"
+            ),
+            params,
+        )
+        for table in ('groupconsentaggregate', 'groupcustomconsentaggregate'):
+            connection.execute(
+                sa.text(f"DELETE FROM {table} WHERE group_id = :group_id"), params
+            )
+
+
+def downgrade() -> None:
+    # the repaired links are valid data, nothing to undo
+    pass
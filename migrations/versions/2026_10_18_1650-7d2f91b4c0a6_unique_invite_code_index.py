@@ -0,0 +1,36 @@
+"""unique invite code index
+
+Revision ID: 7d2f91b4c0a6
+Revises: e2a7c5b83f19
+Create Date: 2026-10-18 16:50:12.504318
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f91b4c0a6'
+down_revision: Union[str, None] = 'e2a7c5b83f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # codes are prefixed with the group id, but a group that never got its
+    # prefixed code may share the placeholder one; those get their id prepended
+    op.execute(
+        "UPDATE rpggroup SET invite_code = CAST(id AS VARCHAR) || '-' || invite_code "
+        "WHERE invite_code IS NOT NULL AND id NOT IN "
+        "(SELECT MIN(id) FROM rpggroup GROUP BY invite_code)"
+    )
+    with op.batch_alter_table('rpggroup', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_rpggroup_invite_code'), ['invite_code'], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('rpggroup', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_rpggroup_invite_code'))
@@ -0,0 +1,84 @@
+"""secondary indexes
+
+Revision ID: a3c8e5f17b29
+Revises: 7d2f91b4c0a6
+Create Date: 2026-10-18 17:20:37.918254
+
+"""
+from typing import Sequence, Union
+import sqlmodel
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8e5f17b29'
+down_revision: Union[str, None] = '7d2f91b4c0a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_DUPLICATE_ENTRIES = (
+    "SELECT id FROM consententry WHERE id NOT IN ("
+    "SELECT MAX(id) FROM consententry"
+    " GROUP BY consent_sheet_id, consent_template_id)"
+)
+
+
+def upgrade() -> None:
+    # Nothing kept entries unique per sheet and template. The newest entry is
+    # the one the sheet shows, older duplicates are dropped; the aggregates of
+    # the affected groups are rebuilt on the next read of the group page.
+    for table in ('groupconsentaggregate', 'groupcustomconsentaggregate'):
+        op.execute(
+            f"DELETE FROM {table} WHERE group_id IN ("
+            "SELECT groupconsentsheetlink.group_id FROM groupconsentsheetlink"
+            " JOIN consententry ON consententry.consent_sheet_id"
+            " = groupconsentsheetlink.consent_sheet_id"
+            f" WHERE consententry.id IN ({_DUPLICATE_ENTRIES}))"
+        )
+    op.execute(f"DELETE FROM consententry WHERE id IN ({_DUPLICATE_ENTRIES})")
+
+    with op.batch_alter_table('consententry', schema=None) as batch_op:
+        batch_op.create_index('ix_consententry_consent_sheet_id_consent_template_id', ['consent_sheet_id', 'consent_template_id'], unique=True)
+
+    with op.batch_alter_table('consentsheet', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_consentsheet_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('customconsententry', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_customconsententry_consent_sheet_id'), ['consent_sheet_id'], unique=False)
+
+    with op.batch_alter_table('groupconsentsheetlink', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_groupconsentsheetlink_consent_sheet_id'), ['consent_sheet_id'], unique=False)
+
+    with op.batch_alter_table('playfunanswer', schema=None) as batch_op:
+        batch_op.create_index('ix_playfunanswer_result_id_question_id', ['result_id', 'question_id'], unique=False)
+
+    with op.batch_alter_table('usergrouplink', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_usergrouplink_group_id'), ['group_id'], unique=False)
+
+    with op.batch_alter_table('userlogin', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_userlogin_user_id'), ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('userlogin', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_userlogin_user_id'))
+
+    with op.batch_alter_table('usergrouplink', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_usergrouplink_group_id'))
+
+    with op.batch_alter_table('playfunanswer', schema=None) as batch_op:
+        batch_op.drop_index('ix_playfunanswer_result_id_question_id')
+
+    with op.batch_alter_table('groupconsentsheetlink', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_groupconsentsheetlink_consent_sheet_id'))
+
+    with op.batch_alter_table('customconsententry', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_customconsententry_consent_sheet_id'))
+
+    with op.batch_alter_table('consentsheet', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_consentsheet_user_id'))
+
+    with op.batch_alter_table('consententry', schema=None) as batch_op:
+        batch_op.drop_index('ix_consententry_consent_sheet_id_consent_template_id')
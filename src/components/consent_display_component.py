@@ -2,22 +2,45 @@ import logging
 
 from nicegui import ui
 
-from controller.sheet_controller import get_consent_template_by_id
-from models.db_models import ConsentEntry, ConsentStatus, ConsentTemplate
+from models.db_models import (
+    ConsentEntry,
+    ConsentStatus,
+    GroupConsentAggregate,
+)
+from services.consent_aggregate_service import status_counts
 from services.session_service import session_storage
+from services.template_catalog import CatalogTemplate, get_template_catalog
 
 
 class ConsentDisplayComponent(ui.row):
     consents: list[ConsentEntry]
-    consent_template: ConsentTemplate
+    aggregate: GroupConsentAggregate | None = None
+    status: ConsentStatus | None = None
+    consent_template: CatalogTemplate
 
-    def __init__(self, consents: list[ConsentEntry]):
+    def __init__(
+        self,
+        consents: list[ConsentEntry] = None,
+        aggregate: GroupConsentAggregate | None = None,
+        status: ConsentStatus | None = None,
+        show_counts: bool = False,
+    ):
         super().__init__()
+        self.status = status
+        self.show_counts = show_counts
+        if aggregate is not None:
+            self.consents = []
+            self.aggregate = aggregate
+            self.consent_template = get_template_catalog().get(
+                aggregate.consent_template_id
+            )
+            self.content()
+            return
         if not consents or not consents[0]:
             logging.getLogger("content_consent_finder").debug("No consents found")
             return
         self.consents = consents
-        self.consent_template = get_consent_template_by_id(
+        self.consent_template = get_template_catalog().get(
             self.consents[0].consent_template_id
         )
         self.content()
@@ -26,9 +49,21 @@ class ConsentDisplayComponent(ui.row):
     def content(self):
         self.clear()
         lang = session_storage.get("lang", "en")
-        group_consent = ConsentStatus.get_consent(
-            [consent.preference for consent in self.consents]
-        )
+        if self.aggregate is not None and self.show_counts:
+            group_consent = self.aggregate.preference
+            comment = " ".join(
+                f"{status.as_emoji}{count}"
+                for status, count in status_counts(self.aggregate).items()
+                if count
+            )
+        elif self.aggregate is not None:
+            group_consent = self.aggregate.preference
+            comment = self.aggregate.comments
+        else:
+            group_consent = self.status or ConsentStatus.get_consent(
+                consent.preference for consent in self.consents if consent
+            )
+            comment = self.consents[0].comment
         with self.classes("w-full"):
             ui.label(self.consent_template.topic_local.get_text(lang)).classes(
                 "text-md"
@@ -38,4 +73,4 @@ class ConsentDisplayComponent(ui.row):
                 group_consent.explanation(lang)
             )
 
-            ui.label(self.consents[0].comment).classes("text-md")
+            ui.label(comment).classes("text-md")
@@ -1,37 +1,81 @@
 import logging
 
-from nicegui import ui, events
+from nicegui import core, ui, events
 
-from controller.sheet_controller import update_entry
-from localization.language_manager import make_localisable
-from models.db_models import ConsentEntry, ConsentStatus, User
+from controller.sheet_controller import reload_consent_entry, set_category_preference
+from localization.language_manager import get_localization, make_localisable
+from models.db_models import ConsentEntry, ConsentSheet, ConsentStatus, User
+from services.entry_write_buffer import queue_entry_update
 from services.session_service import session_storage
+from services.sheet_service import ConcurrentUpdateError
+from services.template_catalog import CatalogTemplate, get_template_catalog
 
 
 class ConsentEntryComponent(ui.row):
     consent_entry: ConsentEntry
+    template: CatalogTemplate
+    persist_changes: bool = True
 
     def __init__(
         self,
         consent_entry: ConsentEntry,
         user: User,
+        template: CatalogTemplate | None = None,
     ):
         super().__init__()
         if not consent_entry:
             logging.getLogger("content_consent_finder").error("No consent entry")
             return
         self.consent_entry = consent_entry
+        self.template = template or get_template_catalog().get(
+            consent_entry.consent_template_id
+        )
         self.user = user
         self.content()
 
     def update_value(self, value_change: events.ValueChangeEventArguments):
-        if value_change.value is None:
+        if value_change.value is None or not self.persist_changes:
             return
         logging.getLogger("content_consent_finder").debug(
-            f"ConsentEntryComponent {self.consent_entry.consent_template.id} {value_change}"
+            f"ConsentEntryComponent {self.template.id} {value_change}"
         )
         self.consent_entry.preference = value_change.value
-        update_entry(self.user, self.consent_entry)
+        queue_entry_update(self.user, self.consent_entry, self.on_conflict)
+
+    def on_conflict(self, error: Exception):
+        """Called by the write buffer, usually from its flushing thread."""
+        logging.getLogger("content_consent_finder").info(error)
+        message_key = (
+            "sheet_changed_elsewhere"
+            if isinstance(error, ConcurrentUpdateError)
+            else "entry_not_saved"
+        )
+        if core.loop is not None:
+            core.loop.call_soon_threadsafe(self.reload_entry, message_key)
+
+    def reload_entry(self, message_key: str = "sheet_changed_elsewhere"):
+        """Show the stored value of an entry whose edit was dropped."""
+        if self.is_deleted:
+            return
+        reload_consent_entry(self.consent_entry)
+        with self:
+            ui.notify(get_localization(message_key), type="warning")
+        self.persist_changes = False
+        try:
+            self.toggle.value = self.consent_entry.preference
+        finally:
+            self.persist_changes = True
+
+    def show_preference(self, preference: ConsentStatus):
+        """Display a preference that is already stored without writing it again."""
+        self.persist_changes = False
+        try:
+            # the stored entry moved on one version with that write
+            self.consent_entry.version += 1
+            self.consent_entry.preference = preference
+            self.toggle.value = preference
+        finally:
+            self.persist_changes = True
 
     @ui.refreshable
     def content(self):
@@ -39,37 +83,45 @@ class ConsentEntryComponent(ui.row):
         lang = session_storage.get("lang", "en")
         with self.classes("w-full pt-6 lg:pt-1 gap-0 lg:gap-2"):
             self.comment_toggle = ui.checkbox("🗨️")
-            self.comment_toggle.mark(
-                f"comment_toggle_{self.consent_entry.consent_template.id}"
-            )
-            ui.label(
-                self.consent_entry.consent_template.topic_local.get_text(lang)
-            ).classes("text-md").tooltip(
-                self.consent_entry.consent_template.explanation_local.get_text(lang)
-            )
+            self.comment_toggle.mark(f"comment_toggle_{self.template.id}")
+            ui.label(self.template.topic_local.get_text(lang)).classes(
+                "text-md"
+            ).tooltip(self.template.explanation_local.get_text(lang))
             ui.space()
             self.toggle = ui.toggle(
                 {status: status.as_emoji for status in ConsentStatus}
             ).bind_value(self.consent_entry, "preference")
             self.toggle.on_value_change(self.update_value)
-            self.toggle.mark(f"toggle_{self.consent_entry.consent_template.id}")
+            self.toggle.mark(f"toggle_{self.template.id}")
             self.comment_input = (
                 ui.input("Comment")
                 .bind_visibility_from(self.comment_toggle, "value")
                 .bind_value(self.consent_entry, "comment")
-                .on("focusout", lambda _: update_entry(self.user, self.consent_entry))
-                .mark(f"comment_input_{self.consent_entry.consent_template.id}")
+                .on(
+                    "focusout",
+                    lambda _: queue_entry_update(
+                        self.user, self.consent_entry, self.on_conflict
+                    ),
+                )
+                .mark(f"comment_input_{self.template.id}")
             )
             make_localisable(self.comment_input, key="comment")
 
 
 class CategoryEntryComponent(ui.row):
     category: str
+    category_id: int
+    sheet: ConsentSheet
     topics: list[ConsentEntryComponent]
 
-    def __init__(self, category: str):
+    def __init__(
+        self, category: str, category_id: int, sheet: ConsentSheet, user: User
+    ):
         super().__init__()
         self.category = category
+        self.category_id = category_id
+        self.sheet = sheet
+        self.user = user
         with self.classes("w-full pt-6"):
             ui.label(self.category).classes("text-xl")
             ui.space()
@@ -83,6 +135,13 @@ class CategoryEntryComponent(ui.row):
         logging.getLogger("content_consent_finder").info(
             f"CategoryEntryComponent {self.category} {self.toggle.value} clicked"
         )
+        if self.toggle.value is None:
+            return
+        changed = set(
+            set_category_preference(
+                self.user, self.sheet, self.category_id, self.toggle.value
+            )
+        )
         for topic in self.topics:
-            if topic.toggle.value == ConsentStatus.unknown:
-                topic.consent_entry.preference = self.toggle.value
+            if topic.template.id in changed:
+                topic.show_preference(self.toggle.value)
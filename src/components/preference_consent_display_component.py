@@ -2,14 +2,14 @@ import random
 
 from nicegui import ui
 
-from controller.sheet_controller import get_consent_template_by_id
-from models.db_models import ConsentStatus, ConsentTemplate
+from models.db_models import ConsentStatus
 from services.session_service import session_storage
+from services.template_catalog import CatalogTemplate, get_template_catalog
 
 
 class PreferenceConsentDisplayComponent(ui.row):
     preference: ConsentStatus
-    consent_template: ConsentTemplate | None = None
+    consent_template: CatalogTemplate | None = None
     comments: list[str]
     custom_text: str
 
@@ -24,7 +24,7 @@ class PreferenceConsentDisplayComponent(ui.row):
         self.preference = status
         self.custom_text = custom_text
         if consent_template_id:
-            self.consent_template = get_consent_template_by_id(consent_template_id)
+            self.consent_template = get_template_catalog().get(consent_template_id)
         self.comments = comments or []
         if self.comments:
             random.shuffle(self.comments)
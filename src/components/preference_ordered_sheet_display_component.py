@@ -7,22 +7,20 @@ from components.preference_consent_display_component import (
 )
 from controller.sheet_controller import (
     duplicate_sheet,
-    get_all_consent_topics,
     get_consent_sheet_by_id,
     get_consent_sheet_by_share_id,
-)
-from controller.util_controller import (
-    get_all_localized_texts,
+    get_consent_sheets_by_ids,
 )
 from localization.language_manager import get_localization, make_localisable
 from models.db_models import (
     ConsentSheet,
     ConsentStatus,
-    ConsentTemplate,
-    CustomConsentEntry,
-    LocalizedText,
 )
 from controller.user_controller import get_user_from_storage
+from services.consent_aggregate_service import (
+    PreferenceBuckets,
+    get_preference_buckets,
+)
 from services.session_service import get_current_user_id, session_storage
 
 
@@ -30,15 +28,19 @@ class PreferenceOrderedSheetDisplayComponent(ui.column):
     sheet: ConsentSheet = None
     sheets: list[ConsentSheet] = None
     redact_name: bool
-    text_lookup: dict[int, LocalizedText]
     share_expansion: ui.expansion
     share_image: ui.image
+    group_id: int | None = None
+    buckets: PreferenceBuckets | None = None
+    sheet_count: int | None = None
 
     def __init__(
         self,
         consent_sheet: ConsentSheet = None,
         consent_sheets: list[ConsentSheet] = None,
         redact_name: bool = False,
+        group_id: int | None = None,
+        sheet_count: int | None = None,
     ):
         super().__init__()
         logging.getLogger("content_consent_finder").debug(
@@ -48,9 +50,9 @@ class PreferenceOrderedSheetDisplayComponent(ui.column):
             self.sheets = consent_sheets
         else:
             self.sheet = consent_sheet
-        self.text_lookup = get_all_localized_texts()
+        self.group_id = group_id
+        self.sheet_count = sheet_count
         self.redact_name = redact_name
-        self.templates: list[ConsentTemplate] = get_all_consent_topics()
         logging.getLogger("content_consent_finder").debug(
             f"initialized with {self.sheet} {self.sheets}"
         )
@@ -60,11 +62,10 @@ class PreferenceOrderedSheetDisplayComponent(ui.column):
     def sheet_name(self):
         if self.redact_name:
             return "Consent Sheet"
-        return (
-            self.sheet.display_name
-            if self.sheet
-            else get_localization("consent_of") + str(len(self.sheets))
-        )
+        if self.sheet:
+            return self.sheet.display_name
+        count = self.sheet_count if self.sheets is None else len(self.sheets)
+        return get_localization("consent_of") + str(count)
 
     @property
     def sheet_comments(self):
@@ -82,13 +83,21 @@ class PreferenceOrderedSheetDisplayComponent(ui.column):
 
     def button_duplicate(self, user_id: str):
         logging.getLogger("content_consent_finder").debug(f"Duplicating {self.sheet}")
-        if duplicate := duplicate_sheet(self.sheet, user_id):
+        if duplicate_sheet(self.sheet.id, user_id):
             ui.navigate.to("/home")
-            ui.notify(duplicate.human_name + get_localization("sheet_duplicated"))
+            ui.notify(
+                f"Copy of {self.sheet.display_name}"
+                + get_localization("sheet_duplicated")
+            )
         else:
             ui.notify(get_localization("sheet_not_duplicated"))
 
     def refresh_sheets(self):
+        if self.group_id is not None:
+            # the buckets are read from the aggregates, the sheets stay as the
+            # page loaded them
+            self.buckets = get_preference_buckets(group_id=self.group_id)
+            return
         user_id = get_current_user_id()
         if self.sheet:
             self.sheet = (
@@ -98,14 +107,20 @@ class PreferenceOrderedSheetDisplayComponent(ui.column):
                     self.sheet.public_share_id, self.sheet.id
                 )
             )
-        if self.sheets:
+        if self.sheets and user_id:
+            self.sheets = get_consent_sheets_by_ids(
+                user_id, [sheet.id for sheet in self.sheets]
+            )
+        elif self.sheets:
             self.sheets = [
-                get_consent_sheet_by_id(user_id, sheet.id)
-                if user_id
-                else get_consent_sheet_by_share_id(sheet.public_share_id, sheet.id)
+                get_consent_sheet_by_share_id(sheet.public_share_id, sheet.id)
                 for sheet in self.sheets
             ]
             self.sheets = [sheet for sheet in self.sheets if sheet is not None]
+        self.buckets = get_preference_buckets(
+            [sheet.id for sheet in self.sheets or [self.sheet] if sheet],
+            group_id=self.group_id,
+        )
 
     @ui.refreshable
     def content(self):
@@ -119,52 +134,10 @@ class PreferenceOrderedSheetDisplayComponent(ui.column):
 
     def content_topic_displays(self):
         lang = session_storage.get("lang", "en")
-        lookup_consents = {
-            template.id: ConsentStatus.get_consent(
-                [
-                    sheet.consent_entries_dict.get(template.id).preference
-                    for sheet in self.sheets or [self.sheet]
-                ]
-            )
-            for template in self.templates
-        }
-        prefence_entries: dict[
-            ConsentStatus, list[ConsentTemplate | CustomConsentEntry]
-        ] = {
-            status: [
-                template
-                for template in self.templates
-                if lookup_consents[template.id] == status
-            ]
-            for status in ConsentStatus
-        }
-        grouped_custom_entries: dict[str, list[CustomConsentEntry]] = {}
-        for sheet in self.sheets or [self.sheet]:
-            for custom_entry in sheet.custom_consent_entries:
-                if custom_entry.content == "":
-                    continue
-                grouped_custom_entries.setdefault(
-                    custom_entry.content.lower(), []
-                ).append(custom_entry)
-
-        for content, entries in grouped_custom_entries.items():
-            status = ConsentStatus.get_consent([entry.preference for entry in entries])
-            prefence_entries.setdefault(status, []).append(
-                CustomConsentEntry(
-                    content=content,
-                    preference=status,
-                    comment="; ".join(
-                        entry.comment for entry in entries if entry.comment
-                    ),
-                )
-            )
-
         for status in ConsentStatus.ordered():
-            if not prefence_entries.get(status):
+            if not self.buckets.size(status):
                 continue
-            with ui.card().classes(
-                f"row-span-{(len(prefence_entries.get(status)) // 3) + 1} "
-            ):
+            with ui.card().classes(f"row-span-{(self.buckets.size(status) // 3) + 1} "):
                 with ui.expansion(
                     text=status.as_emoji + status.name.capitalize()
                 ).classes(
@@ -172,20 +145,19 @@ class PreferenceOrderedSheetDisplayComponent(ui.column):
                 ) as status_expansion:
                     ui.markdown(status.explanation(lang))
                 logging.getLogger("content_consent_finder").debug(
-                    f"Displaying {status} with {len(prefence_entries[status])} entries"
+                    f"Displaying {status} with {self.buckets.size(status)} entries"
                 )
                 status_expansion.mark(f"status_expansion_{status.name}")
-                for template_or_custom in prefence_entries[status]:
-                    if isinstance(template_or_custom, ConsentTemplate):
-                        PreferenceConsentDisplayComponent(
-                            status,
-                            consent_template_id=template_or_custom.id,
-                        )
-                    elif isinstance(template_or_custom, CustomConsentEntry):
-                        PreferenceConsentDisplayComponent(
-                            status,
-                            custom_text=template_or_custom.content,
-                        )
+                for template_id in self.buckets.templates[status]:
+                    PreferenceConsentDisplayComponent(
+                        status,
+                        consent_template_id=template_id,
+                    )
+                for custom_text in self.buckets.custom_entries[status]:
+                    PreferenceConsentDisplayComponent(
+                        status,
+                        custom_text=custom_text,
+                    )
 
     def display_foot(self):
         user = get_user_from_storage()
@@ -8,38 +8,43 @@ from components.preference_consent_display_component import (
 )
 from controller.sheet_controller import (
     duplicate_sheet,
-    get_all_consent_topics,
     get_consent_sheet_by_id,
-)
-from controller.util_controller import (
-    get_all_localized_texts,
+    get_consent_sheets_by_ids,
 )
 from localization.language_manager import get_localization, make_localisable
 from models.db_models import (
     ConsentSheet,
-    ConsentTemplate,
     CustomConsentEntry,
-    LocalizedText,
 )
 from controller.user_controller import get_user_from_storage
-from models.db_models import ConsentStatus
+from models.consent_matrix import ConsentMatrix
+from services.consent_aggregate_service import (
+    COMMENT_SEPARATOR,
+    GroupConsentOverview,
+    get_group_consent_overview,
+)
+from services.export_service import export_url
 from services.session_service import session_storage
+from services.template_catalog import TemplateCatalog, get_template_catalog
 
 
 class SheetDisplayComponent(ui.column):
     sheet: ConsentSheet = None
     sheets: list[ConsentSheet] = None
     redact_name: bool
-    categories: list[int]
-    grouped_topics: dict[int, list[ConsentTemplate]]
-    text_lookup: dict[int, LocalizedText]
+    catalog: TemplateCatalog
     export_button: ui.button | None = None
+    group_id: int | None = None
+    group_overview: GroupConsentOverview | None = None
+    sheet_count: int | None = None
 
     def __init__(
         self,
         consent_sheet: ConsentSheet = None,
         consent_sheets: list[ConsentSheet] = None,
         redact_name: bool = False,
+        group_id: int | None = None,
+        sheet_count: int | None = None,
     ):
         super().__init__()
         logging.getLogger("content_consent_finder").debug(
@@ -49,58 +54,60 @@ class SheetDisplayComponent(ui.column):
             self.sheets = consent_sheets
         else:
             self.sheet = consent_sheet
-        self.text_lookup = get_all_localized_texts()
+        self.group_id = group_id
+        self.sheet_count = sheet_count
         self.redact_name = redact_name
-        self.topics: list[ConsentTemplate] = get_all_consent_topics()
-        self.categories = sorted(list({topic.category_id for topic in self.topics}))
-        self.grouped_topics = {
-            category_id: [
-                template
-                for template in self.topics
-                if template.category_id == category_id
-            ]
-            for category_id in self.categories
-        }
+        self.catalog = get_template_catalog()
         self.export_button = None
         self.content()
 
+    @property
+    def counts_only(self) -> bool:
+        """Large groups pass no sheets and are shown from aggregated counts."""
+        return self.group_id is not None and self.sheet is None and self.sheets is None
+
     @property
     def sheet_name(self):
         if self.redact_name:
             return "Consent Sheet"
-        return (
-            self.sheet.human_name
-            if self.sheet
-            else get_localization("consent_of")
-            + str(len(self.sheets) if self.sheets else 1)
-        )
+        if self.sheet:
+            return self.sheet.human_name
+        count = self.sheet_count if self.sheets is None else len(self.sheets)
+        return get_localization("consent_of") + str(count or 1)
 
     @property
     def sheet_comments(self):
-        return (
-            self.sheet.comment
-            if self.sheet
-            else "\n---\n".join(
-                sheet.comment for sheet in self.sheets if sheet and sheet.comment
-            )
+        if self.sheet:
+            return self.sheet.comment
+        return "\n---\n".join(
+            sheet.comment for sheet in self.sheets or [] if sheet and sheet.comment
         )
 
     def button_duplicate(self, user_id: int):
         logging.getLogger("content_consent_finder").debug(f"Duplicating {self.sheet}")
-        if duplicate := duplicate_sheet(self.sheet, user_id):
+        if duplicate_sheet(self.sheet.id, user_id):
             ui.navigate.to("/home")
-            ui.notify(duplicate.human_name + get_localization("sheet_duplicated"))
+            ui.notify(
+                f"Copy of {self.sheet.display_name}"
+                + get_localization("sheet_duplicated")
+            )
         else:
             ui.notify(get_localization("sheet_not_duplicated"))
 
     def refresh_sheets(self):
+        if self.group_id is not None:
+            # the grid is read from the aggregates, the page already loaded
+            # the sheets for their names and comments
+            self.group_overview = get_group_consent_overview(
+                self.group_id, with_comments=not self.counts_only
+            )
+            return
         if self.sheet:
             self.sheet = get_consent_sheet_by_id(self.user.id_name, self.sheet.id)
         if self.sheets:
-            self.sheets = [
-                get_consent_sheet_by_id(self.user.id_name, sheet.id)
-                for sheet in self.sheets
-            ]
+            self.sheets = get_consent_sheets_by_ids(
+                self.user.id_name, [sheet.id for sheet in self.sheets]
+            )
 
     @ui.refreshable
     def content(self):
@@ -118,50 +125,82 @@ class SheetDisplayComponent(ui.column):
             self.display_foot()
 
     def content_topic_displays(self):
+        if self.group_overview is not None:
+            self.content_group_topic_displays()
+            return
         lang = session_storage.get("lang", "en")
-        for category_id in self.categories:
-            templates = self.grouped_topics[category_id]
+        sheets = self.sheets or [self.sheet]
+        template_status = ConsentMatrix.from_sheets(
+            sheets, list(self.catalog.by_id)
+        ).status_by_key()
+        for category_id in self.catalog.categories:
+            templates = self.catalog.grouped[category_id]
             lookup_consents = {
-                template.id: [
-                    sheet.consent_entries_dict.get(template.id)
-                    for sheet in self.sheets or [self.sheet]
-                ]
+                template.id: [sheet.get_entry(template.id) for sheet in sheets]
                 for template in templates
             }
             with ui.card().classes(f"row-span-{(len(templates) // 3) + 1} "):
                 with ui.row().classes("w-full pt-6"):
-                    ui.label(self.text_lookup[category_id].get_text(lang)).classes(
-                        "text-xl"
-                    )
+                    ui.label(
+                        self.catalog.category_text(category_id).get_text(lang)
+                    ).classes("text-xl")
                     for topic in templates:
-                        ConsentDisplayComponent(lookup_consents[topic.id])
-
-        custom_entries = [
-            entry
-            for sheet in self.sheets or [self.sheet]
-            for entry in sheet.custom_consent_entries
-            if entry.content
-        ]
+                        ConsentDisplayComponent(
+                            lookup_consents[topic.id],
+                            status=template_status[topic.id],
+                        )
+
+        custom_status = ConsentMatrix.from_custom_entries(
+            sheets, key=str.lower
+        ).status_by_key()
         grouped_custom_entries: dict[str, list[CustomConsentEntry]] = {}
-        for entry in custom_entries:
-            key = entry.content.lower()
-            if key not in grouped_custom_entries:
-                grouped_custom_entries[key] = []
-            grouped_custom_entries[key].append(entry)
+        for sheet in sheets:
+            for entry in sheet.custom_consent_entries:
+                if entry.content:
+                    grouped_custom_entries.setdefault(entry.content.lower(), []).append(
+                        entry
+                    )
         with ui.card().classes("row-span-1"):
             with ui.row().classes("w-full pt-6"):
                 ui.label("Custom Entries").classes("text-xl")
-                for custom_entries in grouped_custom_entries.values():
+                for key, custom_entries in grouped_custom_entries.items():
                     PreferenceConsentDisplayComponent(
-                        status=ConsentStatus.get_consent(
-                            [entry.preference for entry in custom_entries]
-                        ),
+                        status=custom_status[key],
                         custom_text=custom_entries[0].content,
                         comments=[
                             entry.comment for entry in custom_entries if entry.comment
                         ],
                     )
 
+    def content_group_topic_displays(self):
+        lang = session_storage.get("lang", "en")
+        for category_id in self.catalog.categories:
+            templates = self.catalog.grouped[category_id]
+            with ui.card().classes(f"row-span-{(len(templates) // 3) + 1} "):
+                with ui.row().classes("w-full pt-6"):
+                    ui.label(
+                        self.catalog.category_text(category_id).get_text(lang)
+                    ).classes("text-xl")
+                    for topic in templates:
+                        ConsentDisplayComponent(
+                            aggregate=self.group_overview.aggregate(topic.id),
+                            show_counts=self.counts_only,
+                        )
+
+        with ui.card().classes("row-span-1"):
+            with ui.row().classes("w-full pt-6"):
+                ui.label("Custom Entries").classes("text-xl")
+                for aggregate in self.group_overview.custom_entries:
+                    PreferenceConsentDisplayComponent(
+                        status=aggregate.preference,
+                        custom_text=aggregate.content,
+                        comments=(
+                            aggregate.comments.split(COMMENT_SEPARATOR)
+                            if not self.counts_only and aggregate.comments
+                            else []
+                        ),
+                    )
+
     def display_foot(self):
         if not self.user:
             make_localisable(ui.label(), key="login_to_duplicate")
@@ -174,12 +213,15 @@ class SheetDisplayComponent(ui.column):
                 ),
                 key="duplicate",
             )
+        if self.counts_only:
+            return
         self.export_button = ui.button("Export as JSON").on_click(
-            lambda: ui.download.content(
-                ConsentSheet.export_sheets_as_json(
-                    [self.sheet] if self.sheet else self.sheets
-                ),
-                f"export_consent_sheet_{self.sheet.id if self.sheet else 'group'}.json",
+            lambda: ui.download.from_url(
+                export_url(
+                    [self.sheet.id]
+                    if self.sheet
+                    else [sheet.id for sheet in self.sheets]
+                )
             )
         )
         self.export_button.mark("export_sheet_button")
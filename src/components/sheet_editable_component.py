@@ -8,31 +8,28 @@ from components.consent_entry_component import (
 )
 from components.custom_consent_entry_component import CustomConsentEntryComponent
 from controller.sheet_controller import (
-    create_share_id,
-    get_all_consent_topics,
     get_consent_sheet_by_id,
+    share_sheet,
     update_consent_sheet,
     update_custom_entry,
 )
 from controller.user_controller import get_user_from_storage
-from controller.util_controller import (
-    get_all_localized_texts,
-)
-from localization.language_manager import make_localisable
+from localization.language_manager import get_localization, make_localisable
 from models.db_models import (
     ConsentSheet,
     ConsentStatus,
-    ConsentTemplate,
     CustomConsentEntry,
 )
+from services.async_utils import run_sync
+from services.entry_write_buffer import flush_entry_updates
+from services.sheet_service import ConcurrentUpdateError
 from services.session_service import get_current_user_id, session_storage
+from services.template_catalog import TemplateCatalog, get_template_catalog
 
 
 class SheetEditableComponent(ui.grid):
     sheet: ConsentSheet
-    topics: list[ConsentTemplate]
-    categories: list[str]
-    grouped_topics: dict[str, list[ConsentTemplate]]
+    catalog: TemplateCatalog
     share_button: ui.button
 
     def __init__(self, consent_sheet: ConsentSheet):
@@ -43,28 +40,32 @@ class SheetEditableComponent(ui.grid):
             cce for cce in self.sheet.custom_consent_entries if cce.content != ""
         ]
         logging.getLogger("content_consent_finder").debug(self.sheet)
-        self.text_lookup = get_all_localized_texts()
-        self.topics: list[ConsentTemplate] = get_all_consent_topics()
-        self.categories = sorted(list({topic.category_id for topic in self.topics}))
-        self.grouped_topics = {
-            category_id: [
-                template
-                for template in self.topics
-                if template.category_id == category_id
-            ]
-            for category_id in self.categories
-        }
+        self.catalog = get_template_catalog()
         self.user = get_user_from_storage()
+        ui.context.client.on_disconnect(self.flush_entries)
         self.content()
 
+    async def flush_entries(self):
+        await run_sync(flush_entry_updates, [self.sheet.id])
+
+    def save_details(self) -> bool:
+        try:
+            update_consent_sheet(self.user, self.sheet)
+        except ConcurrentUpdateError as error:
+            logging.getLogger("content_consent_finder").info(error)
+            ui.notify(get_localization("sheet_changed_elsewhere"), type="warning")
+            self.sheet = get_consent_sheet_by_id(get_current_user_id(), self.sheet.id)
+            self.content.refresh()
+            return False
+        return True
+
     def unshare(self):
         self.sheet.public_share_id = None
-        update_consent_sheet(self.user, self.sheet)
-        ui.navigate.to(f"/consentsheet/{self.sheet.id}?show=edit")
+        if self.save_details():
+            ui.navigate.to(f"/consentsheet/{self.sheet.id}?show=edit")
 
     def share(self):
-        self.sheet.public_share_id = create_share_id()
-        update_consent_sheet(self.user, self.sheet)
+        share_sheet(self.user, self.sheet)
         ui.navigate.to(f"/consentsheet/{self.sheet.id}?show=edit")
 
     @ui.refreshable
@@ -75,13 +76,13 @@ class SheetEditableComponent(ui.grid):
             make_localisable(
                 ui.input("Sheet Name")
                 .bind_value(self.sheet, "human_name")
-                .on("focusout", lambda _: update_consent_sheet(self.user, self.sheet)),
+                .on("focusout", lambda _: self.save_details()),
                 key="sheet_name",
             ).mark("sheet_name_input")
             make_localisable(
                 ui.input("Comment")
                 .bind_value(self.sheet, "comment")
-                .on("focusout", lambda _: update_consent_sheet(self.user, self.sheet)),
+                .on("focusout", lambda _: self.save_details()),
                 key="sheet_comment",
             ).mark("sheet_comment_input")
             if self.sheet.public_share_id:
@@ -96,17 +97,22 @@ class SheetEditableComponent(ui.grid):
                     self.share_button,
                     key="share",
                 ).mark("share_button")
-            for category_id in self.categories:
-                templates = self.grouped_topics[category_id]
+            for category_id in self.catalog.categories:
+                templates = self.catalog.grouped[category_id]
+                category_text = self.catalog.category_text(category_id)
                 with ui.card().classes(f"row-span-{(len(templates) // 2) + 1} "):
                     with ui.row().classes("w-full pt-0"):
                         category_component = CategoryEntryComponent(
-                            category=self.text_lookup[category_id].get_text(lang),
+                            category=category_text.get_text(lang),
+                            category_id=category_id,
+                            sheet=self.sheet,
+                            user=self.user,
                         )
                         category_component.topics = [
                             ConsentEntryComponent(
                                 self.sheet.get_entry(topic.id),
                                 user=self.user,
+                                template=topic,
                             )
                             for topic in templates
                         ]
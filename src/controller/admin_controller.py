@@ -20,6 +20,10 @@ from models.db_models import (
     UserGroupLink,
 )
 from models.model_utils import add_and_refresh, engine
+from services.group_cache import invalidate_group_cache
+from services.sheet_visibility import invalidate_visible_sheets
+from services.template_catalog import invalidate_template_catalog
+from services.text_catalog import invalidate_text_catalog
 
 
 def update_localized_text(text: LocalizedText):
@@ -37,6 +41,8 @@ def update_localized_text(text: LocalizedText):
         else:
             add_and_refresh(session, text)
             logging.getLogger("content_consent_finder").debug(f"added {text}")
+        invalidate_template_catalog()
+        invalidate_text_catalog()
         return text
 
 
@@ -133,6 +139,10 @@ def clear_table(table):
             session.exec(delete(table)).rowcount
         )
         session.commit()
+        invalidate_template_catalog()
+        invalidate_text_catalog()
+        invalidate_visible_sheets()
+        invalidate_group_cache()
         return get_status()
 
 
@@ -183,6 +193,7 @@ def store_content_answer(
             explanation_local=explanation,
         )
         add_and_refresh(session, content_template)
+        invalidate_template_catalog()
         return content_template
 
 
@@ -1,12 +1,18 @@
 from services.group_service import (
     assign_consent_sheet_to_group,
+    count_group_members,
+    count_group_sheets,
     create_new_group,
     delete_group,
     ensure_global_group,
+    fetch_group_member_page,
+    fetch_group_roster,
+    fetch_group_sheet_ids,
     fetch_group_sheets,
     fetch_group_users,
     get_group_by_id,
     get_group_by_name_id,
+    is_large_group,
     join_group,
     leave_group,
     regenerate_invite_code,
@@ -16,13 +22,19 @@ from services.group_service import (
 
 __all__ = [
     "assign_consent_sheet_to_group",
+    "count_group_members",
+    "count_group_sheets",
     "create_new_group",
     "delete_group",
     "ensure_global_group",
+    "fetch_group_member_page",
+    "fetch_group_roster",
+    "fetch_group_sheet_ids",
     "fetch_group_sheets",
     "fetch_group_users",
     "get_group_by_id",
     "get_group_by_name_id",
+    "is_large_group",
     "join_group",
     "leave_group",
     "regenerate_invite_code",
@@ -1,26 +1,39 @@
 import logging
 
 from a_logger_setup import LOGGER_NAME
-import random
-import string
 from datetime import datetime
-from functools import lru_cache
 
-from sqlmodel import Session, delete, select
+from sqlalchemy import exists, insert, literal, update
+from sqlmodel import Session, delete, func, select
 
 from models.db_models import (
     ConsentEntry,
     ConsentSheet,
-    ConsentTemplate,
     CustomConsentEntry,
     RPGGroup,
     User,
     ConsentStatus,
-    UserGroupLink,
     GroupConsentSheetLink,
 )
 from models.model_utils import add_and_refresh, engine
-from services.sheet_service import create_consent_sheet
+from services.consent_aggregate_service import (
+    refresh_group_aggregates,
+    refresh_sheet_custom_aggregates,
+)
+from services.entry_write_buffer import flush_entry_updates
+from services.id_allocator import allocate_unique_id, generate_id
+from services.import_service import import_sheets
+from services.template_catalog import CatalogTemplate, get_template_catalog
+from services.sheet_service import (
+    SHEET_CONTENT,
+    ConcurrentUpdateError,
+    CreatedSheet,
+    backfill_consent_entries,
+    create_consent_sheet,
+    set_category_preference as set_sheet_category_preference,
+    update_sheet_details,
+)
+from services.sheet_visibility import filter_visible
 from services.async_utils import run_sync
 
 
@@ -31,75 +44,115 @@ def fetch_sheet_groups(sheet: ConsentSheet) -> list[RPGGroup]:
 
 
 def create_share_id():
+    return generate_id()
+
+
+def share_sheet(user: User, sheet: ConsentSheet) -> str:
+    logging.getLogger(LOGGER_NAME).debug(f"share_sheet {sheet}")
+    _user_may_edit_sheet(user, sheet)
     with Session(engine) as session:
-        existing_share_ids = set(
-            session.exec(select(ConsentSheet.public_share_id)).all()
-        )
-        share_id = "".join(random.choices(string.ascii_letters + string.digits, k=8))
-        while share_id in existing_share_ids:
-            share_id = "".join(
-                random.choices(string.ascii_letters + string.digits, k=12)
+
+        def _set_share_id(share_id: str) -> None:
+            session.exec(
+                update(ConsentSheet)
+                .where(ConsentSheet.id == sheet.id)
+                .values(
+                    public_share_id=share_id,
+                    updated_at=datetime.now(),
+                    version=ConsentSheet.version + 1,
+                )
             )
+
+        share_id = allocate_unique_id(session, _set_share_id, kind="sheet_share_id")
+        session.commit()
+        sheet.public_share_id = share_id
+        sheet.version += 1
         return share_id
 
 
-def create_new_consentsheet(user: User, session: Session | None = None) -> ConsentSheet:
+def create_new_consentsheet(user: User, session: Session | None = None) -> CreatedSheet:
     return create_consent_sheet(user, session=session)
 
 
-def import_sheet_from_json(json_text: str, user: User):
-    import json
-
+def import_sheet_from_json(json_text: str | bytes, user: User) -> int:
+    """Import an upload and return the id of its first sheet."""
     logging.getLogger(LOGGER_NAME).info(f"import_sheet_from_json for {user}")
     logging.getLogger(LOGGER_NAME).debug(f"json: {type(json_text)}")
-    sheet_data = json.loads(json_text)
     with Session(engine) as session:
-        user = session.get(User, user.id)
-        imported_sheet = ConsentSheet.import_sheet_from_json(sheet_data, user, session)
-        session.commit()
-        logging.getLogger(LOGGER_NAME).info(f"imported {imported_sheet}")
-        return imported_sheet.id
+        sheet_ids = import_sheets(json_text, user, session=session)
+        logging.getLogger(LOGGER_NAME).info(f"imported sheets {sheet_ids}")
+        return sheet_ids[0]
 
 
-def duplicate_sheet(sheet_id: int, user_id: str | int):
-    logging.getLogger(LOGGER_NAME).debug(f"duplicate_sheet {sheet_id} {user_id}")
+_SHEET_DELETE_ATTEMPTS = 3
 
-    sheet_unique_name = "".join(
-        random.choices(string.ascii_letters + string.digits, k=8)
-    )
+_COPIED_SHEET_COLUMNS = [
+    "unique_name",
+    "user_id",
+    "human_name",
+    "comment",
+    "created_at",
+    "updated_at",
+    "template_version",
+]
+
+
+def duplicate_sheet(sheet_id: int, user_id: str | int) -> int | None:
+    logging.getLogger(LOGGER_NAME).debug(f"duplicate_sheet {sheet_id} {user_id}")
+    flush_entry_updates([sheet_id])
     with Session(engine) as session:
-        possible_collision = set(session.exec(select(ConsentSheet.unique_name)).all())
-        while sheet_unique_name in possible_collision:
-            sheet_unique_name = "".join(
-                random.choices(string.ascii_letters + string.digits, k=8)
+        new_sheet_ids: list[int] = []
+
+        def _copy_sheet(unique_name: str) -> None:
+            now = datetime.now()
+            display_name = func.coalesce(
+                func.nullif(ConsentSheet.human_name, ""), ConsentSheet.unique_name
+            )
+            copy = select(
+                literal(unique_name),
+                literal(int(user_id)),
+                literal("Copy of ") + display_name,
+                ConsentSheet.comment,
+                literal(now),
+                literal(now),
+                ConsentSheet.template_version,
+            ).where(ConsentSheet.id == sheet_id)
+            result = session.exec(
+                insert(ConsentSheet)
+                .from_select(_COPIED_SHEET_COLUMNS, copy)
+                .returning(ConsentSheet.id)
+            )
+            new_sheet_ids[:] = result.scalars().all()
+
+        allocate_unique_id(session, _copy_sheet, kind="sheet_unique_name")
+        if not new_sheet_ids:
+            logging.getLogger(LOGGER_NAME).warning(f"sheet {sheet_id} not found")
+            return None
+        new_sheet_id = new_sheet_ids[0]
+        session.exec(
+            insert(ConsentEntry).from_select(
+                ["consent_sheet_id", "consent_template_id", "preference", "comment"],
+                select(
+                    literal(new_sheet_id),
+                    ConsentEntry.consent_template_id,
+                    ConsentEntry.preference,
+                    ConsentEntry.comment,
+                ).where(ConsentEntry.consent_sheet_id == sheet_id),
             )
-        sheet = session.get(ConsentSheet, sheet_id)
-        user = session.get(User, int(user_id))
-        new_sheet = ConsentSheet(
-            unique_name=sheet_unique_name,
-            user_id=user.id,
-            user=user,
-            human_name=f"Copy of {sheet.display_name}",
-            comment=sheet.comment,
         )
-        add_and_refresh(session, new_sheet)
-        blueprint_entries = session.exec(
-            select(ConsentEntry).where(ConsentEntry.consent_sheet_id == sheet_id)
-        ).all()
-        for blueprint in blueprint_entries:
-            entry = ConsentEntry(
-                consent_sheet_id=new_sheet.id,
-                consent_sheet=new_sheet,
-                consent_template_id=blueprint.consent_template_id,
-                consent_template=blueprint.consent_template,
-                preference=blueprint.preference,
-                comment=blueprint.comment,
+        session.exec(
+            insert(CustomConsentEntry).from_select(
+                ["consent_sheet_id", "content", "preference", "comment"],
+                select(
+                    literal(new_sheet_id),
+                    CustomConsentEntry.content,
+                    CustomConsentEntry.preference,
+                    CustomConsentEntry.comment,
+                ).where(CustomConsentEntry.consent_sheet_id == sheet_id),
             )
-            session.add(entry)
-            new_sheet.consent_entries.append(entry)
+        )
         session.commit()
-        session.refresh(new_sheet)
-        return new_sheet
+        return new_sheet_id
 
 
 def delete_sheet(user: User, sheet: ConsentSheet, session: Session = None):
@@ -109,36 +162,50 @@ def delete_sheet(user: User, sheet: ConsentSheet, session: Session = None):
             return delete_sheet(user, sheet, session)
     _user_may_edit_sheet(user, sheet)
     sheet = session.get(ConsentSheet, sheet.id)
-    # delete group links
-    session.exec(
-        delete(GroupConsentSheetLink).where(
+    group_ids = session.exec(
+        select(GroupConsentSheetLink.group_id).where(
             GroupConsentSheetLink.consent_sheet_id == sheet.id
         )
-    )
-    # delete entries
-    session.exec(delete(ConsentEntry).where(ConsentEntry.consent_sheet_id == sheet.id))
-    if sheet in user.consent_sheets:
-        user.consent_sheets.remove(sheet)
-    session.delete(sheet)
+    ).all()
+    # entries written concurrently, e.g. by a backfill, keep the sheet row
+    for _ in range(_SHEET_DELETE_ATTEMPTS):
+        if _delete_sheet_rows(session, sheet.id):
+            break
+        logging.getLogger(LOGGER_NAME).warning(
+            f"entries of sheet {sheet.id} reappeared while deleting"
+        )
+    else:
+        error = ConcurrentUpdateError("consentsheet", sheet.id, sheet.version)
+        session.rollback()
+        raise error
+    session.expunge(sheet)
+    if group_ids:
+        refresh_group_aggregates(group_ids, session)
     session.commit()
     logging.getLogger(LOGGER_NAME).debug(f"deleted {sheet}")
     return sheet
 
 
-def _user_may_see_sheet(user: User, sheet: ConsentSheet, session: Session):
-    # is own sheet
-    if (user and sheet.user_id == user.id) or sheet.public_share_id:
-        return True
-    # is in group
-    if session.exec(
-        select(GroupConsentSheetLink).where(
-            GroupConsentSheetLink.consent_sheet_id == sheet.id,
-            GroupConsentSheetLink.group_id == UserGroupLink.group_id,
-            UserGroupLink.user_id == user.id,
-        )
-    ).first():
-        return True
-    logging.getLogger(LOGGER_NAME).warning(f"User {user} may not see sheet {sheet}")
+def _delete_sheet_rows(session: Session, sheet_id: int) -> bool:
+    """Delete a sheet with its group links and entries.
+
+    The sheet row only goes together with its entries, so a new sheet that
+    gets the id again cannot find any of them. Returns ``False`` and keeps
+    the sheet row when entries are still there.
+    """
+    for model in (GroupConsentSheetLink, ConsentEntry, CustomConsentEntry):
+        session.exec(delete(model).where(model.consent_sheet_id == sheet_id))
+    return bool(
+        session.exec(
+            delete(ConsentSheet)
+            .where(
+                ConsentSheet.id == sheet_id,
+                ~exists().where(ConsentEntry.consent_sheet_id == sheet_id),
+                ~exists().where(CustomConsentEntry.consent_sheet_id == sheet_id),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    )
 
 
 def _user_may_edit_sheet(user: User, sheet: ConsentSheet):
@@ -149,6 +216,22 @@ def _user_may_edit_sheet(user: User, sheet: ConsentSheet):
     raise PermissionError(f"User {user} may not edit sheet {sheet}")
 
 
+def reload_consent_entry(entry: ConsentEntry) -> None:
+    """Overwrite ``entry`` with its stored preference, comment and version."""
+    logging.getLogger(LOGGER_NAME).debug(f"reload_consent_entry {entry}")
+    with Session(engine) as session:
+        stored = session.exec(
+            select(
+                ConsentEntry.preference, ConsentEntry.comment, ConsentEntry.version
+            ).where(
+                ConsentEntry.consent_sheet_id == entry.consent_sheet_id,
+                ConsentEntry.consent_template_id == entry.consent_template_id,
+            )
+        ).first()
+    if stored is not None:
+        entry.preference, entry.comment, entry.version = stored
+
+
 def get_all_custom_entries() -> list[CustomConsentEntry]:
     logging.getLogger(LOGGER_NAME).debug("get_all_custom_entries")
     with Session(engine) as session:
@@ -163,94 +246,59 @@ def update_custom_entry(user: User, entry: CustomConsentEntry):
         entry.content = entry.content or ""
         _user_may_edit_sheet(user, entry_sheet)
         if entry.id:
-            logging.getLogger(LOGGER_NAME).debug(f"saved {entry}")
             session.merge(entry)
-            session.commit()
         else:
-            add_and_refresh(session, entry)
-            logging.getLogger(LOGGER_NAME).debug(f"saved {entry}")
+            session.add(entry)
+        session.flush()
+        refresh_sheet_custom_aggregates([entry_sheet.id], session)
+        session.commit()
+        logging.getLogger(LOGGER_NAME).debug(f"saved {entry}")
+        if entry in session:
+            session.refresh(entry)
             return entry
 
 
-def update_entry(user: User, entry: ConsentEntry):
-    logging.getLogger(LOGGER_NAME).debug(f"update_entry {entry}")
+def set_category_preference(
+    user: User,
+    sheet: ConsentSheet,
+    category_id: int,
+    status: ConsentStatus,
+    only_unknown: bool = True,
+) -> list[int]:
+    """Set ``status`` on a whole category and return the changed template ids."""
+    logging.getLogger(LOGGER_NAME).debug(
+        f"set_category_preference {sheet.id} {category_id} {status}"
+    )
+    _user_may_edit_sheet(user, sheet)
+    # buffered single edits were made first and must not win afterwards
+    flush_entry_updates([sheet.id])
     with Session(engine) as session:
-        entry_sheet = session.get(ConsentSheet, entry.consent_sheet_id)
-        _user_may_edit_sheet(user, entry_sheet)
-        existing_by_template = session.exec(
-            select(ConsentEntry).where(
-                ConsentEntry.consent_sheet_id == entry.consent_sheet_id,
-                ConsentEntry.consent_template_id == entry.consent_template_id,
-            )
-        ).first()
-        if entry.id:
-            if entry.preference is None:
-                logging.getLogger(LOGGER_NAME).warning(f"repaired {entry}")
-                entry.preference = ConsentStatus.unknown
-            session.merge(entry)
-            session.commit()
-        elif existing_by_template:
-            existing_by_template.preference = entry.preference
-            existing_by_template.comment = entry.comment
-            add_and_refresh(session, existing_by_template)
-            logging.getLogger(LOGGER_NAME).debug(f"merged {existing_by_template}")
-            entry.id = existing_by_template.id
-        else:
-            new_entry = ConsentEntry(
-                consent_sheet_id=entry.consent_sheet_id or entry.consent_sheet.id,
-                consent_template_id=entry.consent_template_id,
-                preference=entry.preference,
-                comment=entry.comment,
-            )
-            add_and_refresh(session, new_entry)
-            logging.getLogger(LOGGER_NAME).debug(f"saved {new_entry}")
-            entry.id = new_entry.id
-            entry.consent_sheet_id = new_entry.consent_sheet_id
-            entry.consent_template_id = new_entry.consent_template_id
-
+        return set_sheet_category_preference(
+            sheet.id, category_id, status, only_unknown, session=session
+        )
 
-@lru_cache
-def get_consent_template_by_id(template_id: int) -> ConsentTemplate:
-    """
-    Retrieve a ConsentTemplate by its ID, using an LRU cache to avoid redundant database queries.
 
-    This function is cached with @lru_cache, so repeated calls with the same template_id
-    will return the cached result rather than querying the database again. Be aware that
-    changes to ConsentTemplate records in the database will not be reflected until the cache
-    is cleared or expires.
-    """
-    with Session(engine) as session:
-        return session.get(ConsentTemplate, template_id)
+def get_consent_template_by_id(template_id: int) -> CatalogTemplate | None:
+    """Look up a template in the shared :class:`TemplateCatalog`."""
+    return get_template_catalog().get(template_id)
 
 
-def get_all_consent_topics() -> list[ConsentTemplate]:
+def get_all_consent_topics() -> list[CatalogTemplate]:
     logging.getLogger(LOGGER_NAME).debug("get_all_consent_topics")
-    with Session(engine) as session:
-        return session.exec(select(ConsentTemplate)).all()
+    return list(get_template_catalog().templates)
 
 
 def get_consent_sheet_by_share_id(share_id: str, sheet_id: int) -> ConsentSheet | None:
     logging.getLogger(LOGGER_NAME).debug(
         f"get_consent_sheet_by_share_id {sheet_id} with share_id {share_id}"
     )
+    flush_entry_updates([sheet_id])
     with Session(engine) as session:
-        sheet = session.get(ConsentSheet, sheet_id)
+        sheet = session.get(ConsentSheet, sheet_id, options=SHEET_CONTENT)
         if sheet and sheet.public_share_id == share_id:
-            # check entries
-            templates = get_all_consent_topics()
-            for template in templates:
-                if not sheet.get_entry(template.id):
-                    new_entry = ConsentEntry(
-                        consent_sheet_id=sheet.id,
-                        consent_sheet=sheet,
-                        consent_template_id=template.id,
-                        consent_template=template,
-                    )
-                    session.add(new_entry)
-                    sheet.consent_entries.append(new_entry)
-                    session.commit()
-            session.commit()
-            return session.get(ConsentSheet, sheet_id)
+            if backfill_consent_entries([sheet], session=session):
+                sheet = _reload_sheet(session, sheet_id)
+            return sheet
     return None
 
 
@@ -258,34 +306,77 @@ def get_consent_sheet_by_id(user_id_name: str, sheet_id: int) -> ConsentSheet:
     logging.getLogger(LOGGER_NAME).debug(
         f"get_consent_sheet_by_id {sheet_id} as {user_id_name}"
     )
+    flush_entry_updates([sheet_id])
     with Session(engine) as session:
-        if sheet := session.get(ConsentSheet, sheet_id):
-            user = session.exec(
-                select(User).where(User.id_name == user_id_name)
-            ).first()
-            if not user and not sheet.public_share_id:
-                logging.getLogger(LOGGER_NAME).warning(f"User not found {user_id_name}")
-                all_users = session.exec(select(User)).all()
-                for user in all_users:
-                    logging.getLogger(LOGGER_NAME).debug(user)
-                return None
-            if not _user_may_see_sheet(user, sheet, session):
-                return None
-            # check entries
-            templates = get_all_consent_topics()
-            for template in templates:
-                if not sheet.get_entry(template.id):
-                    new_entry = ConsentEntry(
-                        consent_sheet_id=sheet.id,
-                        consent_sheet=sheet,
-                        consent_template_id=template.id,
-                        consent_template=template,
-                    )
-                    session.add(new_entry)
-                    sheet.consent_entries.append(new_entry)
-                    session.commit()
-            session.commit()
-            return session.get(ConsentSheet, sheet_id)
+        if not filter_visible(_user_id(user_id_name, session), [sheet_id], session):
+            logging.getLogger(LOGGER_NAME).warning(
+                f"User {user_id_name} may not see sheet {sheet_id}"
+            )
+            return None
+        if sheet := session.get(ConsentSheet, sheet_id, options=SHEET_CONTENT):
+            if backfill_consent_entries([sheet], session=session):
+                sheet = _reload_sheet(session, sheet_id)
+            return sheet
+
+
+def _reload_sheet(session: Session, sheet_id: int) -> ConsentSheet:
+    return session.get(
+        ConsentSheet, sheet_id, options=SHEET_CONTENT, populate_existing=True
+    )
+
+
+def get_consent_sheets_by_ids(
+    user_id_name: str, sheet_ids: list[int]
+) -> list[ConsentSheet]:
+    """Load every visible sheet of ``sheet_ids`` in a fixed number of queries.
+
+    Permissions are checked for all sheets at once with
+    :func:`filter_visible`, entries are completed with a single backfill and
+    the order of ``sheet_ids`` is kept. Sheets the user may not see are left
+    out.
+    """
+    logging.getLogger(LOGGER_NAME).debug(
+        f"get_consent_sheets_by_ids {sheet_ids} as {user_id_name}"
+    )
+    if not sheet_ids:
+        return []
+    flush_entry_updates(sheet_ids)
+    with Session(engine) as session:
+        visible_ids = filter_visible(
+            _user_id(user_id_name, session), sheet_ids, session
+        )
+        if not visible_ids:
+            return []
+        query = (
+            select(ConsentSheet)
+            .where(ConsentSheet.id.in_(visible_ids))
+            .options(*SHEET_CONTENT)
+        )
+        sheets = session.exec(query).all()
+        if backfill_consent_entries(sheets, session=session):
+            sheets = session.exec(query.execution_options(populate_existing=True)).all()
+        by_id = {sheet.id: sheet for sheet in sheets}
+        return [by_id[sheet_id] for sheet_id in sheet_ids if sheet_id in by_id]
+
+
+def get_visible_sheet_ids(user_id_name: str | None, sheet_ids: list[int]) -> list[int]:
+    """Return the ids of ``sheet_ids`` the user may see, in their given order.
+
+    Without ``user_id_name`` only publicly shared sheets are visible.
+    """
+    logging.getLogger(LOGGER_NAME).debug(
+        f"get_visible_sheet_ids {sheet_ids} as {user_id_name}"
+    )
+    if not sheet_ids:
+        return []
+    with Session(engine) as session:
+        return filter_visible(_user_id(user_id_name, session), sheet_ids, session)
+
+
+def _user_id(user_id_name: str | None, session: Session) -> int | None:
+    if not user_id_name:
+        return None
+    return session.exec(select(User.id).where(User.id_name == user_id_name)).first()
 
 
 def update_consent_sheet(user: User, sheet: ConsentSheet):
@@ -293,10 +384,8 @@ def update_consent_sheet(user: User, sheet: ConsentSheet):
     with Session(engine) as session:
         _user_may_edit_sheet(user, sheet)
         if sheet.id:
-            sheet.updated_at = datetime.now()
-            session.merge(sheet)
-            session.commit()
-            logging.getLogger(LOGGER_NAME).debug(f"merged {sheet}")
+            update_sheet_details(sheet, session=session)
+            logging.getLogger(LOGGER_NAME).debug(f"updated {sheet}")
         else:
             new_sheet = ConsentSheet(
                 unique_name=sheet.unique_name,
@@ -325,7 +414,13 @@ async def create_share_id_async() -> str:
     return await run_sync(create_share_id)
 
 
-async def create_new_consentsheet_async(user: User) -> ConsentSheet:
+async def share_sheet_async(user: User, sheet: ConsentSheet) -> str:
+    """Asynchronous wrapper for :func:`share_sheet`."""
+
+    return await run_sync(share_sheet, user, sheet)
+
+
+async def create_new_consentsheet_async(user: User) -> CreatedSheet:
     """Asynchronous wrapper for :func:`create_new_consentsheet`."""
 
     return await run_sync(create_new_consentsheet, user)
@@ -337,7 +432,7 @@ async def import_sheet_from_json_async(json_text: str, user: User) -> int:
     return await run_sync(import_sheet_from_json, json_text, user)
 
 
-async def duplicate_sheet_async(sheet_id: int, user_id: str | int) -> ConsentSheet:
+async def duplicate_sheet_async(sheet_id: int, user_id: str | int) -> int | None:
     """Asynchronous wrapper for :func:`duplicate_sheet`."""
 
     return await run_sync(duplicate_sheet, sheet_id, user_id)
@@ -364,19 +459,29 @@ async def update_custom_entry_async(user: User, entry: CustomConsentEntry):
     await run_sync(update_custom_entry, user, entry)
 
 
-async def update_entry_async(user: User, entry: ConsentEntry):
-    """Asynchronous wrapper for :func:`update_entry`."""
-
-    await run_sync(update_entry, user, entry)
+async def set_category_preference_async(
+    user: User,
+    sheet: ConsentSheet,
+    category_id: int,
+    status: ConsentStatus,
+    only_unknown: bool = True,
+) -> list[int]:
+    """Asynchronous wrapper for :func:`set_category_preference`."""
+
+    return await run_sync(
+        set_category_preference, user, sheet, category_id, status, only_unknown
+    )
 
 
-async def get_consent_template_by_id_async(template_id: int) -> ConsentTemplate:
+async def get_consent_template_by_id_async(
+    template_id: int,
+) -> CatalogTemplate | None:
     """Asynchronous wrapper for :func:`get_consent_template_by_id`."""
 
     return await run_sync(get_consent_template_by_id, template_id)
 
 
-async def get_all_consent_topics_async() -> list[ConsentTemplate]:
+async def get_all_consent_topics_async() -> list[CatalogTemplate]:
     """Asynchronous wrapper for :func:`get_all_consent_topics`."""
 
     return await run_sync(get_all_consent_topics)
@@ -391,6 +496,15 @@ async def get_consent_sheet_by_id_async(
     return await run_sync(get_consent_sheet_by_id, user_id_name, sheet_id)
 
 
+async def get_consent_sheets_by_ids_async(
+    user_id_name: str,
+    sheet_ids: list[int],
+) -> list[ConsentSheet]:
+    """Asynchronous wrapper for :func:`get_consent_sheets_by_ids`."""
+
+    return await run_sync(get_consent_sheets_by_ids, user_id_name, sheet_ids)
+
+
 async def update_consent_sheet_async(user: User, sheet: ConsentSheet) -> None:
     """Asynchronous wrapper for :func:`update_consent_sheet`."""
 
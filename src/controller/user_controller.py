@@ -10,7 +10,6 @@ from models.db_models import (
     ConsentSheet,
     RPGGroup,
     User,
-    UserGroupLink,
     UserLogin,
 )
 from models.model_utils import (
@@ -19,7 +18,7 @@ from models.model_utils import (
     hash_password,
     session_scope,
 )
-from controller.sheet_controller import delete_sheet
+from services.account_service import AccountDeletionReport, delete_user_account
 from services.session_service import session_storage
 from telemetry import get_metrics_recorder
 
@@ -46,6 +45,21 @@ def fetch_user_groups(user: User, session: Session | None = None) -> list[RPGGro
         return _fetch(scoped_session)
 
 
+def fetch_user_consent_sheets(
+    user: User, session: Session | None = None
+) -> list[ConsentSheet]:
+    LOGGER.debug("fetch_user_consent_sheets %s", user)
+
+    def _fetch(active_session: Session) -> list[ConsentSheet]:
+        return user.fetch_consent_sheets(active_session)
+
+    if session is not None:
+        return _fetch(session)
+
+    with session_scope() as scoped_session:
+        return _fetch(scoped_session)
+
+
 def get_user_by_account_and_password(
     account_name: str, password: str, session: Session | None = None
 ) -> User | None:
@@ -95,6 +109,7 @@ def create_user_account(
             password_hash=hash_password(password),
         )
         add_and_refresh(active_session, user_login)
+        active_session.refresh(user)
         LOGGER.debug("created %s and %s", user, user_login)
         return user
 
@@ -105,51 +120,11 @@ def create_user_account(
         return _create(scoped_session)
 
 
-def delete_account(user: User, session: Session | None = None) -> User | None:
+def delete_account(
+    user: User, session: Session | None = None
+) -> AccountDeletionReport | None:
     LOGGER.debug("delete_account %s", user)
-
-    def _delete(active_session: Session) -> User | None:
-        managed_user = active_session.get(User, user.id)
-        if managed_user is None:
-            LOGGER.debug("user %s already removed", user)
-            return None
-
-        created_groups = active_session.exec(
-            select(RPGGroup).where(RPGGroup.gm_user_id == managed_user.id)
-        ).all()
-        for group in created_groups:
-            LOGGER.debug("deleting %s", group)
-            active_session.delete(group)
-
-        joined_group_links = active_session.exec(
-            select(UserGroupLink).where(UserGroupLink.user_id == managed_user.id)
-        ).all()
-        for link in joined_group_links:
-            LOGGER.debug("leaving %s", link)
-            active_session.delete(link)
-
-        created_sheets = active_session.exec(
-            select(ConsentSheet).where(ConsentSheet.user_id == managed_user.id)
-        ).all()
-        for sheet in created_sheets:
-            delete_sheet(managed_user, sheet, active_session)
-
-        if user_login := active_session.exec(
-            select(UserLogin).where(UserLogin.user_id == managed_user.id)
-        ).first():
-            LOGGER.debug("deleting %s", user_login)
-            active_session.delete(user_login)
-
-        active_session.delete(managed_user)
-        active_session.commit()
-        LOGGER.debug("deleted %s", managed_user)
-        return managed_user
-
-    if session is not None:
-        return _delete(session)
-
-    with session_scope() as scoped_session:
-        return _delete(scoped_session)
+    return delete_user_account(user.id, session=session)
 
 
 def update_user(user: User, session: Session | None = None) -> None:
@@ -229,6 +204,7 @@ def get_or_create_sso_user(
             password_hash=hash_password(random_secret),
         )
         add_and_refresh(active_session, user_login)
+        active_session.refresh(user)
         return user
 
     if session is not None:
@@ -5,14 +5,15 @@ import string
 import traceback
 from pathlib import Path
 from time import perf_counter
-from fastapi import Request, Response
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import HTTPException, Query, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi_sso.sso.discord import DiscordSSO
 from fastapi_sso.sso.google import GoogleSSO
 from nicegui import Client, app, ui
 from nicegui.page import page
 
 from a_logger_setup import LOGGER_NAME, configure_logging
+from controller.sheet_controller import get_visible_sheet_ids
 from controller.user_controller import (
     get_user_by_id_name,
     get_or_create_sso_user,
@@ -24,6 +25,7 @@ from components.layout import (
 )
 from localization.language_manager import make_localisable
 from models.db_models import User
+from models.model_utils import pool_stats
 from models.seeder import seed_consent_questioneer
 from pages.admin_page import content as admin_page_content
 from pages.content_trigger_view import content as content_trigger_view
@@ -38,6 +40,12 @@ from pages.sheet_page import content as sheet_content
 from pages.news_page import content as news_content
 from public_share_qr import generate_sheet_share_qr_code
 from settings import Settings, get_settings
+from services.entry_write_buffer import flush_entry_updates
+from services.export_service import (
+    EXPORT_PATH,
+    export_filename,
+    iter_sheets_export,
+)
 from services.session_service import (
     begin_user_session,
     end_user_session,
@@ -58,9 +66,13 @@ LOGGER = logging.getLogger(LOGGER_NAME)
 
 if request_metrics := setup_metrics(settings):
     request_metrics.set_session_stats_provider(get_session_stats)
+    request_metrics.set_pool_stats_provider(pool_stats)
     set_metrics_recorder(request_metrics)
     app.middleware("http")(request_metrics.middleware())
 
+# buffered consent entry edits must not be lost on shutdown
+app.on_shutdown(lambda: flush_entry_updates())
+
 
 google_sso = GoogleSSO(
     settings.google_client_id,
@@ -256,6 +268,20 @@ def qr(share_id: str, sheet_id: str):
     return Response(content=img_byte_arr.getvalue(), media_type="image/png")
 
 
+@app.get(EXPORT_PATH)
+def export_sheets(sheet_id: list[int] = Query(...)):
+    sheet_ids = get_visible_sheet_ids(get_current_user_id(), sheet_id)
+    if not sheet_ids:
+        raise HTTPException(status_code=404, detail="No exportable sheets")
+    return StreamingResponse(
+        iter_sheets_export(sheet_ids),
+        media_type="application/json",
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(sheet_ids)}"'
+        },
+    )
+
+
 def redact_string(s: str) -> str:
     if s == "-default-":
         return s
@@ -288,6 +314,27 @@ def startup_message(current_settings: Settings):
         "DISCORD_ALLOW_INSECURE_HTTP: %s", current_settings.discord_allow_insecure_http
     )
     LOGGER.info("PORT: %s", current_settings.port)
+    LOGGER.info(
+        "LARGE_GROUP_MEMBER_THRESHOLD: %s",
+        current_settings.large_group_member_threshold,
+    )
+    LOGGER.info(
+        "SQLITE: journal_mode=%s synchronous=%s busy_timeout_ms=%s "
+        "mmap_size_mb=%s cache_size_kib=%s",
+        current_settings.sqlite_journal_mode,
+        current_settings.sqlite_synchronous,
+        current_settings.sqlite_busy_timeout_ms,
+        current_settings.sqlite_mmap_size_mb,
+        current_settings.sqlite_cache_size_kib,
+    )
+    LOGGER.info(
+        "DB_POOL: size=%s max_overflow=%s pre_ping=%s recycle_seconds=%s",
+        current_settings.db_pool_size,
+        current_settings.db_max_overflow,
+        current_settings.db_pool_pre_ping,
+        current_settings.db_pool_recycle_seconds,
+    )
+    LOGGER.info("DB_POOL_STATS: %s", pool_stats() or "<not pooled>")
     LOGGER.info("====================================================")
 
 
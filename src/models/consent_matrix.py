@@ -0,0 +1,115 @@
+"""Sheets x topics matrix of consent ordinals for combining many sheets at once.
+
+Each cell holds ``ConsentStatus.order`` as ``int8`` (``MISSING`` where a sheet
+has no entry), so the most restrictive status of a topic over all sheets is a
+single ``max`` reduction instead of a sort per topic.
+"""
+
+from typing import Callable, Hashable, Iterable, Sequence
+
+import numpy as np
+
+from models.db_models import ConsentSheet, ConsentStatus
+
+MISSING = -1
+
+_STATUS_BY_ORDINAL: tuple[ConsentStatus, ...] = tuple(
+    sorted(ConsentStatus, key=lambda status: status.order)
+)
+_ORDINAL_BY_STATUS: dict[ConsentStatus, int] = {
+    status: status.order for status in ConsentStatus
+}
+
+
+class ConsentMatrix:
+    """Consent ordinals of ``len(rows)`` sheets over the topics in ``keys``."""
+
+    ordinals: np.ndarray
+    keys: list[Hashable]
+
+    def __init__(self, ordinals: np.ndarray, keys: Sequence[Hashable]):
+        self.ordinals = ordinals
+        self.keys = list(keys)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Iterable[tuple[Hashable, ConsentStatus]]],
+        keys: Sequence[Hashable] | None = None,
+    ) -> "ConsentMatrix":
+        """Build a matrix from one ``(key, status)`` iterable per sheet.
+
+        Without ``keys`` the columns are every key seen, in first-seen order.
+        Keys outside ``keys`` are ignored; if a key repeats within one row the
+        most restrictive status wins.
+        """
+        rows = [list(row) for row in rows]
+        if keys is None:
+            keys = list(dict.fromkeys(key for row in rows for key, _ in row))
+        column_of = {key: column for column, key in enumerate(keys)}
+        row_indices: list[int] = []
+        columns: list[int] = []
+        values: list[int] = []
+        for row_index, row in enumerate(rows):
+            for key, status in row:
+                column = column_of.get(key)
+                if column is not None and status is not None:
+                    row_indices.append(row_index)
+                    columns.append(column)
+                    values.append(_ORDINAL_BY_STATUS[status])
+        ordinals = np.full((len(rows), len(keys)), MISSING, dtype=np.int8)
+        np.maximum.at(ordinals, (row_indices, columns), np.array(values, dtype=np.int8))
+        return cls(ordinals, keys)
+
+    @classmethod
+    def from_sheets(
+        cls,
+        sheets: Sequence[ConsentSheet],
+        template_ids: Sequence[int] | None = None,
+    ) -> "ConsentMatrix":
+        """Matrix of the template entries of ``sheets``, one column per template."""
+        return cls.from_rows(
+            [
+                [
+                    (entry.consent_template_id, entry.preference)
+                    for entry in sheet.consent_entries
+                ]
+                for sheet in sheets
+            ],
+            template_ids,
+        )
+
+    @classmethod
+    def from_custom_entries(
+        cls,
+        sheets: Sequence[ConsentSheet],
+        key: Callable[[str], Hashable] = str,
+    ) -> "ConsentMatrix":
+        """Matrix of the non-empty custom entries of ``sheets`` by ``key(content)``."""
+        return cls.from_rows(
+            [
+                [
+                    (key(entry.content), entry.preference)
+                    for entry in sheet.custom_consent_entries
+                    if entry.content
+                ]
+                for sheet in sheets
+            ]
+        )
+
+    def most_restrictive(self, axis: int = 0) -> np.ndarray:
+        """Reduce to the highest ordinal along ``axis`` (0: per topic, 1: per sheet)."""
+        if self.ordinals.shape[axis] == 0:
+            return np.full(self.ordinals.shape[1 - axis], MISSING, dtype=np.int8)
+        return self.ordinals.max(axis=axis)
+
+    def statuses(self, axis: int = 0) -> list[ConsentStatus | None]:
+        """Like :meth:`most_restrictive` but mapped back to statuses."""
+        return [
+            _STATUS_BY_ORDINAL[ordinal] if ordinal != MISSING else None
+            for ordinal in self.most_restrictive(axis).tolist()
+        ]
+
+    def status_by_key(self) -> dict[Hashable, ConsentStatus | None]:
+        """Return the most restrictive status of every column keyed by its key."""
+        return dict(zip(self.keys, self.statuses(axis=0)))
@@ -1,21 +1,48 @@
+import logging
+import os
 from datetime import datetime
 
+from sqlalchemy import Index, event
+from sqlalchemy.orm import ORMExecuteState
 from sqlmodel import Field, SQLModel, Relationship, Session, select
 from enum import Enum
+from types import MappingProxyType
+from typing import Iterable, Mapping
 
-LAZY_MODE = "selectin"
+# queries load the relationships they need with selectinload/joinedload.
+# The tests run with DB_LAZY_LOAD=raise_on_sql, so touching any other
+# relationship fails there; production loads it lazily and logs a warning.
+LAZY_MODE = os.getenv("DB_LAZY_LOAD", "select")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _warn_on_lazy_load(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_select and orm_execute_state.lazy_loaded_from is not None:
+        logging.getLogger("content_consent_finder").warning(
+            "lazy load of %s", orm_execute_state.loader_strategy_path
+        )
+
+
+def _loaded(instance: SQLModel, relationship: str):
+    """Return ``relationship`` of ``instance`` if it is loaded, else ``None``.
+
+    ``__repr__`` must not trigger a lazy load, so it only shows loaded ones.
+    """
+    return instance.__dict__.get(relationship)
 
 
 class GroupConsentSheetLink(SQLModel, table=True):
     group_id: int = Field(default=None, primary_key=True, foreign_key="rpggroup.id")
     consent_sheet_id: int = Field(
-        default=None, primary_key=True, foreign_key="consentsheet.id"
+        default=None, primary_key=True, foreign_key="consentsheet.id", index=True
     )
 
 
 class UserGroupLink(SQLModel, table=True):
     user_id: int = Field(default=None, primary_key=True, foreign_key="user.id")
-    group_id: int = Field(default=None, primary_key=True, foreign_key="rpggroup.id")
+    group_id: int = Field(
+        default=None, primary_key=True, foreign_key="rpggroup.id", index=True
+    )
 
 
 class ConsentStatus(str, Enum):
@@ -28,35 +55,21 @@ class ConsentStatus(str, Enum):
 
     @property
     def as_emoji(self):
-        return {
-            ConsentStatus.yes: "🟢",
-            ConsentStatus.okay: "🟡",
-            ConsentStatus.maybe: "🟠",
-            ConsentStatus.no: "❌",
-            ConsentStatus.unknown: "❔",
-        }[self]
+        return _STATUS_EMOJI[self]
 
     @property
     def order(self):
-        return {
-            ConsentStatus.yes: 0,
-            ConsentStatus.okay: 1,
-            ConsentStatus.maybe: 2,
-            ConsentStatus.unknown: 3,
-            ConsentStatus.no: 4,
-        }[self]
+        return _STATUS_ORDER[self]
 
     @staticmethod
-    def get_consent(statuses: list["ConsentStatus"]):
-        return (
-            sorted(statuses, key=lambda x: x.order, reverse=True)[0]
-            if statuses
-            else ConsentStatus.unknown
+    def get_consent(statuses: Iterable["ConsentStatus"]):
+        return max(
+            statuses, key=_STATUS_ORDER.__getitem__, default=ConsentStatus.unknown
         )
 
     @staticmethod
     def ordered() -> list["ConsentStatus"]:
-        return sorted(list(ConsentStatus), key=lambda x: x.order, reverse=True)
+        return list(_STATUS_BY_RESTRICTION)
 
     def explanation(self, lang: str = ""):
         if lang == "de":
@@ -79,6 +92,26 @@ class ConsentStatus(str, Enum):
         }[self]
 
 
+# lookup tables for the hot ConsentStatus helpers, built once at import
+_STATUS_ORDER: dict[ConsentStatus, int] = {
+    ConsentStatus.yes: 0,
+    ConsentStatus.okay: 1,
+    ConsentStatus.maybe: 2,
+    ConsentStatus.unknown: 3,
+    ConsentStatus.no: 4,
+}
+_STATUS_EMOJI: dict[ConsentStatus, str] = {
+    ConsentStatus.yes: "🟢",
+    ConsentStatus.okay: "🟡",
+    ConsentStatus.maybe: "🟠",
+    ConsentStatus.no: "❌",
+    ConsentStatus.unknown: "❔",
+}
+_STATUS_BY_RESTRICTION: tuple[ConsentStatus, ...] = tuple(
+    sorted(_STATUS_ORDER, key=_STATUS_ORDER.__getitem__, reverse=True)
+)
+
+
 class PlayFunQuestion(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
     question_id: int = Field(default=None, foreign_key="localizedtext.id")
@@ -90,7 +123,9 @@ class PlayFunQuestion(SQLModel, table=True):
     created_at: datetime = Field(default=datetime.now())
 
     def __repr__(self):
-        return f"<PlayFunQuestion {self.id} {self.play_style} Weight:{self.weight} {self.question_local.get_text()[:20]}...>"
+        question = _loaded(self, "question_local")
+        text = question.get_text()[:20] if question else f"id:{self.question_id}"
+        return f"<PlayFunQuestion {self.id} {self.play_style} Weight:{self.weight} {text}...>"
 
     def __str__(self):
         return self.__repr__()
@@ -116,7 +151,8 @@ class PlayFunResult(SQLModel, table=True):
     )
 
     def __repr__(self):
-        return f"<PlayFunResult {self.id} User:{self.user.nickname if self.user else self.user_id} Ratings:{self.ratings}>"
+        user = _loaded(self, "user")
+        return f"<PlayFunResult {self.id} User:{user.nickname if user else self.user_id} Ratings:{self.ratings}>"
 
     def __str__(self):
         return self.__repr__()
@@ -187,6 +223,10 @@ class PlayFunResult(SQLModel, table=True):
 
 
 class PlayFunAnswer(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_playfunanswer_result_id_question_id", "result_id", "question_id"),
+    )
+
     id: int = Field(default=None, primary_key=True)
     question_id: int = Field(default=None, foreign_key="playfunquestion.id")
     question: PlayFunQuestion = Relationship(sa_relationship_kwargs={"lazy": LAZY_MODE})
@@ -246,7 +286,12 @@ class FAQItem(SQLModel, table=True):
     )
 
     def __repr__(self):
-        return f"<FAQItem {self.id} {self.question_local.get_text()[:20]}... -> {self.answer_local.get_text()[:20]}...>"
+        question, answer = _loaded(self, "question_local"), _loaded(
+            self, "answer_local"
+        )
+        question_text = question.get_text()[:20] if question else self.question_id
+        answer_text = answer.get_text()[:20] if answer else self.answer_id
+        return f"<FAQItem {self.id} {question_text}... -> {answer_text}...>"
 
 
 class ConsentTemplate(SQLModel, table=True):
@@ -274,16 +319,11 @@ class ConsentTemplate(SQLModel, table=True):
     )
 
     def __repr__(self):
+        category, topic = _loaded(self, "category_local"), _loaded(self, "topic_local")
         category_text = (
-            f"{self.category_local.get_text()[:20]}..."
-            if self.category_local
-            else f"id:{self.category_id}"
-        )
-        topic_text = (
-            f"{self.topic_local.get_text()[:20]}..."
-            if self.topic_local
-            else f"id:{self.topic_id}"
+            f"{category.get_text()[:20]}..." if category else f"id:{self.category_id}"
         )
+        topic_text = f"{topic.get_text()[:20]}..." if topic else f"id:{self.topic_id}"
         return f"<ConsentTemplate {self.id} {category_text} {topic_text}>"
 
     def __str__(self):
@@ -292,13 +332,17 @@ class ConsentTemplate(SQLModel, table=True):
 
 class UserLogin(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
-    user_id: int = Field(default=None, foreign_key="user.id")
+    user_id: int = Field(default=None, foreign_key="user.id", index=True)
     user: "User" = Relationship(sa_relationship_kwargs={"lazy": LAZY_MODE})
     account_name: str = Field(default=None, index=True, unique=True)
     password_hash: str = Field(default=None)
 
     def __repr__(self):
-        return f"<UserLogin {self.id} user:{self.user_id} {self.user.nickname} {self.account_name}>"
+        user = _loaded(self, "user")
+        nickname = user.nickname if user else ""
+        return (
+            f"<UserLogin {self.id} user:{self.user_id} {nickname} {self.account_name}>"
+        )
 
 
 class User(SQLModel, table=True):
@@ -322,11 +366,18 @@ class User(SQLModel, table=True):
             )
         ).all()
 
+    def fetch_consent_sheets(self, session: Session) -> list["ConsentSheet"]:
+        return session.exec(
+            select(ConsentSheet).where(ConsentSheet.user_id == self.id)
+        ).all()
+
     def __repr__(self):
-        return f"<User {self.id} {self.id_name} {self.nickname} [{len(self.consent_sheets)} sheets] >"
+        sheets = _loaded(self, "consent_sheets")
+        sheet_count = f" [{len(sheets)} sheets]" if sheets is not None else ""
+        return f"<User {self.id} {self.id_name} {self.nickname}{sheet_count} >"
 
     def __str__(self):
-        return f"<User {self.id} {self.id_name} {self.nickname} [{len(self.consent_sheets)} sheets] >"
+        return self.__repr__()
 
 
 class ConsentSheet(SQLModel, table=True):
@@ -337,7 +388,20 @@ class ConsentSheet(SQLModel, table=True):
     updated_at: datetime = Field(default=datetime.now())
     comment: str | None = Field(default=None)
     public_share_id: str | None = Field(
-        default=None, description="if set, the sheet can be found by everyone"
+        default=None,
+        unique=True,
+        index=True,
+        description="if set, the sheet can be found by everyone",
+    )
+    template_version: int = Field(
+        default=0,
+        sa_column_kwargs={"server_default": "0"},
+        description="template catalog version the entries were last completed against",
+    )
+    version: int = Field(
+        default=0,
+        sa_column_kwargs={"server_default": "0"},
+        description="bumped on every write, writes only apply to the loaded version",
     )
     consent_entries: list["ConsentEntry"] = Relationship(
         back_populates="consent_sheet",
@@ -349,7 +413,7 @@ class ConsentSheet(SQLModel, table=True):
         sa_relationship_kwargs={"lazy": LAZY_MODE},
         cascade_delete=True,
     )
-    user_id: int = Field(default=None, foreign_key="user.id")
+    user_id: int = Field(default=None, foreign_key="user.id", index=True)
     user: User = Relationship(
         sa_relationship_kwargs={"lazy": LAZY_MODE}, back_populates="consent_sheets"
     )
@@ -364,117 +428,93 @@ class ConsentSheet(SQLModel, table=True):
 
     @staticmethod
     def export_sheets_as_json(sheets: list["ConsentSheet"]) -> str:
-        import json
-
-        sheet_data = {
-            "unique_name": f"export_of_sheet_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            if len(sheets) == 1
-            else "export_of_multiple_sheets",
-            "human_name": sheets[0].human_name if len(sheets) == 1 else None,
-            "comment": sheets[0].comment
-            if len(sheets) == 1
-            else "; ".join(sheet.comment for sheet in sheets if sheet.comment),
-            "consent_entries": [
-                {
-                    "consent_template_id": entry.consent_template_id,
-                    "preference": ConsentStatus.get_consent(
-                        sheet_entry.preference
-                        for sheet in sheets
-                        for sheet_entry in sheet.consent_entries
-                        if entry.consent_template_id == sheet_entry.consent_template_id
-                    ),
-                    "comment": "; ".join(
-                        sheet_entry.comment
-                        for sheet in sheets
-                        for sheet_entry in sheet.consent_entries
-                        if entry.consent_template_id == sheet_entry.consent_template_id
-                        and sheet_entry.comment
-                    )
-                    or None,
-                }
-                for entry in sheets[0].consent_entries
-            ],
-            "custom_consent_entries": [
-                {
-                    "content": entry.content,
-                    "preference": ConsentStatus.get_consent(
-                        sheet_entry.preference
-                        for sheet in sheets
-                        for sheet_entry in sheet.custom_consent_entries
-                        if entry.content == sheet_entry.content
-                    ),
-                    "comment": "; ".join(
-                        sheet_entry.comment
-                        for sheet in sheets
-                        for sheet_entry in sheet.custom_consent_entries
-                        if entry.content == sheet_entry.content and sheet_entry.comment
-                    )
-                    or None,
-                }
-                for entry in sheets[0].custom_consent_entries
-            ],
-        }
-        return json.dumps(sheet_data, indent=4)
+        """Export already loaded ``sheets``; see ``services.export_service``."""
+        from services.export_service import export_header, iter_export_json
+
+        entry_rows = sorted(
+            (
+                (entry.consent_template_id, entry.preference, entry.comment)
+                for sheet in sheets
+                for entry in sheet.consent_entries
+            ),
+            key=lambda row: row[0],
+        )
+        custom_rows = [
+            (entry.content, entry.preference, entry.comment)
+            for sheet in sheets
+            for entry in sheet.custom_consent_entries
+            if entry.content
+        ]
+        return "".join(
+            iter_export_json(
+                export_header(sheets),
+                entry_rows,
+                custom_rows,
+                several_sheets=len(sheets) > 1,
+            )
+        )
 
     @staticmethod
     def import_sheet_from_json(
         data: dict, user: User, session: Session
     ) -> "ConsentSheet":
-        import random
-        import string
+        """Import one exported sheet; see ``services.import_service``."""
+        from services.import_service import import_documents
 
-        sheet_unique_name = "".join(
-            random.choices(string.ascii_letters + string.digits, k=8)
-        )
+        [sheet_id] = import_documents([("sheet", data)], user, session=session)
+        return session.get(ConsentSheet, sheet_id)
 
-        sheet = ConsentSheet(
-            unique_name=sheet_unique_name,
-            human_name=data.get("human_name"),
-            comment=data.get("comment"),
-            user_id=user.id,
-        )
-        session.add(sheet)
-        session.commit()
-        session.refresh(sheet)
-        for entry_data in data.get("consent_entries", []):
-            entry = ConsentEntry(
-                consent_sheet_id=sheet.id,
-                consent_template_id=entry_data["consent_template_id"],
-                preference=entry_data["preference"],
-                comment=entry_data.get("comment"),
-            )
-            session.add(entry)
-        for custom_entry_data in data.get("custom_consent_entries", []):
-            custom_entry = CustomConsentEntry(
-                consent_sheet_id=sheet.id,
-                content=custom_entry_data["content"],
-                preference=custom_entry_data["preference"],
-                comment=custom_entry_data.get("comment"),
+    @property
+    def entry_index(self) -> Mapping[int, "ConsentEntry"]:
+        """Read-only ``consent_template_id -> entry`` index of the loaded entries.
+
+        Built on first use and dropped whenever the entries collection changes,
+        an entry is moved to another template or the sheet is expired or
+        refreshed.
+        """
+        index = self.__dict__.get("_entry_index")
+        if index is None:
+            index = MappingProxyType(
+                {entry.consent_template_id: entry for entry in self.consent_entries}
             )
-            session.add(custom_entry)
-        session.commit()
-        return sheet
+            self.__dict__["_entry_index"] = index
+        return index
 
     @property
-    def consent_entries_dict(self):
-        return {entry.consent_template_id: entry for entry in self.consent_entries}
+    def consent_entries_dict(self) -> Mapping[int, "ConsentEntry"]:
+        return self.entry_index
 
     def get_entry(self, template_id: int) -> "ConsentEntry":
-        return self.consent_entries_dict.get(template_id)
+        return self.entry_index.get(template_id)
+
+    def invalidate_entry_index(self) -> None:
+        self.__dict__.pop("_entry_index", None)
 
     @property
     def display_name(self):
         return self.human_name or self.unique_name
 
     def __str__(self):
-        owner = self.user.nickname if getattr(self, "user", None) else self.user_id
+        user, entries = _loaded(self, "user"), _loaded(self, "consent_entries")
+        owner = user.nickname if user else self.user_id
+        entry_count = f" {len(entries)} entries," if entries is not None else ""
         return (
-            f"<ConsentSheet {self.id} {self.unique_name} {len(self.consent_entries)} entries, "
+            f"<ConsentSheet {self.id} {self.unique_name}{entry_count} "
             f"Owner:{owner}, shared:{self.public_share_id}>"
         )
 
 
 class ConsentEntry(SQLModel, table=True):
+    # one entry per template and sheet, also the conflict target of upserts
+    __table_args__ = (
+        Index(
+            "ix_consententry_consent_sheet_id_consent_template_id",
+            "consent_sheet_id",
+            "consent_template_id",
+            unique=True,
+        ),
+    )
+
     id: int = Field(default=None, primary_key=True)
     consent_sheet_id: int = Field(default=None, foreign_key="consentsheet.id")
     consent_sheet: "ConsentSheet" = Relationship(
@@ -486,11 +526,41 @@ class ConsentEntry(SQLModel, table=True):
     )
     preference: ConsentStatus = Field(default=ConsentStatus.unknown)
     comment: str | None = Field(default=None)
+    version: int = Field(
+        default=0,
+        sa_column_kwargs={"server_default": "0"},
+        description="bumped on every write, writes only apply to the loaded version",
+    )
+    updated_at: datetime | None = Field(
+        default=None, description="last change of preference or comment"
+    )
+
+
+def _drop_entry_index(sheet: ConsentSheet | None, *args) -> None:
+    # expiring a garbage collected instance passes None
+    if sheet is not None:
+        sheet.invalidate_entry_index()
+
+
+for _identifier in ("append", "remove", "bulk_replace"):
+    event.listen(ConsentSheet.consent_entries, _identifier, _drop_entry_index)
+for _identifier in ("expire", "refresh"):
+    event.listen(ConsentSheet, _identifier, _drop_entry_index)
+
+
+@event.listens_for(ConsentEntry.consent_template_id, "set")
+def _drop_entry_index_of_sheet(entry: ConsentEntry, value, oldvalue, initiator) -> None:
+    # only a sheet that is already loaded can hold an index
+    sheet = entry.__dict__.get("consent_sheet")
+    if sheet is not None and value != oldvalue:
+        sheet.invalidate_entry_index()
 
 
 class CustomConsentEntry(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
-    consent_sheet_id: int = Field(default=None, foreign_key="consentsheet.id")
+    consent_sheet_id: int = Field(
+        default=None, foreign_key="consentsheet.id", index=True
+    )
     consent_sheet: "ConsentSheet" = Relationship(
         back_populates="custom_consent_entries",
         sa_relationship_kwargs={"lazy": LAZY_MODE},
@@ -503,7 +573,7 @@ class CustomConsentEntry(SQLModel, table=True):
 class RPGGroup(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
     name: str = Field(default=None)
-    invite_code: str = Field(default=None)
+    invite_code: str = Field(default=None, unique=True, index=True)
     gm_user_id: int = Field(default=None, foreign_key="user.id")
     gm_user: User = Relationship(sa_relationship_kwargs={"lazy": LAZY_MODE})
     gm_consent_sheet_id: int | None = Field(default=None, foreign_key="consentsheet.id")
@@ -527,7 +597,47 @@ class RPGGroup(SQLModel, table=True):
         ).all()
 
     def __str__(self):
-        return f"<RPGGroup {self.id} {self.name} GM:{self.gm_user.nickname}>"
+        gm_user = _loaded(self, "gm_user")
+        gm = gm_user.nickname if gm_user else self.gm_user_id
+        return f"<RPGGroup {self.id} {self.name} GM:{gm}>"
 
     def __repr__(self):
-        return f"<RPGGroup {self.id} {self.name} GM:{self.gm_user.nickname}>"
+        return str(self)
+
+
+class GroupConsentAggregate(SQLModel, table=True):
+    """Most restrictive preference per template over all sheets of a group.
+
+    Maintained on write by ``services.consent_aggregate_service``.
+    """
+
+    group_id: int = Field(default=None, primary_key=True, foreign_key="rpggroup.id")
+    consent_template_id: int = Field(
+        default=None, primary_key=True, foreign_key="consenttemplate.id"
+    )
+    preference: ConsentStatus = Field(default=ConsentStatus.unknown)
+    has_hard_limit: bool = Field(default=False)
+    sheet_count: int = Field(default=0)
+    yes_count: int = Field(default=0)
+    okay_count: int = Field(default=0)
+    maybe_count: int = Field(default=0)
+    unknown_count: int = Field(default=0)
+    no_count: int = Field(default=0)
+    comments: str | None = Field(default=None)
+
+
+class GroupCustomConsentAggregate(SQLModel, table=True):
+    """Most restrictive preference per custom entry text over a group's sheets."""
+
+    group_id: int = Field(default=None, primary_key=True, foreign_key="rpggroup.id")
+    content_key: str = Field(default=None, primary_key=True)
+    content: str = Field(default=None)
+    preference: ConsentStatus = Field(default=ConsentStatus.unknown)
+    has_hard_limit: bool = Field(default=False)
+    sheet_count: int = Field(default=0)
+    yes_count: int = Field(default=0)
+    okay_count: int = Field(default=0)
+    maybe_count: int = Field(default=0)
+    unknown_count: int = Field(default=0)
+    no_count: int = Field(default=0)
+    comments: str | None = Field(default=None)
@@ -4,9 +4,12 @@ from pathlib import Path
 from typing import Iterator
 
 import bcrypt
+from sqlalchemy import Engine, event, make_url
+from sqlalchemy.pool import QueuePool
 from sqlmodel import Session, SQLModel, create_engine
 
 from models.db_models import RPGGroup
+from settings import Settings, get_settings
 from utlis import sanitize_name
 
 
@@ -36,7 +39,76 @@ sqlite_file_name.parent.mkdir(exist_ok=True)
 
 sqlite_url = os.getenv("DB_CONNECTION_STRING", f"sqlite:///{sqlite_file_name}")
 
-engine = create_engine(sqlite_url, echo=False)
+
+def sqlite_pragmas(url: str, settings: Settings) -> dict[str, str | int]:
+    """Return the pragmas every new SQLite connection of ``url`` is set up with.
+
+    WAL lets readers continue while one connection writes and the busy timeout
+    makes a second writer wait instead of failing with "database is locked".
+    In-memory databases keep their journal and have nothing to map.
+    """
+    pragmas: dict[str, str | int] = {
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "synchronous": settings.sqlite_synchronous,
+        "cache_size": -settings.sqlite_cache_size_kib,
+    }
+    if make_url(url).database not in (None, "", ":memory:"):
+        pragmas["journal_mode"] = settings.sqlite_journal_mode
+        pragmas["mmap_size"] = settings.sqlite_mmap_size_mb * 1024 * 1024
+    return pragmas
+
+
+def engine_options(url: str, settings: Settings) -> dict:
+    """Return the ``create_engine`` pool options for ``url``."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+    }
+
+
+def create_db_engine(url: str, settings: Settings | None = None) -> Engine:
+    """Create the engine for ``url`` tuned by ``settings``.
+
+    SQLite connections get :func:`sqlite_pragmas` when they are opened, other
+    databases a connection pool sized by :func:`engine_options`.
+    """
+    settings = settings or get_settings()
+    db_engine = create_engine(url, echo=False, **engine_options(url, settings))
+    if db_engine.dialect.name == "sqlite":
+        pragmas = sqlite_pragmas(url, settings)
+
+        @event.listens_for(db_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return db_engine
+
+
+def pool_stats(db_engine: Engine | None = None) -> dict[str, int]:
+    """Return the connection counts of the pool of ``db_engine``.
+
+    Only queue pools keep counts, others (in-memory SQLite) return ``{}``.
+    """
+    pool = (db_engine or engine).pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # negative while the pool has not opened all of its connections yet
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+engine = create_db_engine(sqlite_url)
 
 
 def generate_group_name_id(group: RPGGroup) -> str:
@@ -9,7 +9,9 @@ from models.db_models import (
     ConsentTemplate,
     CustomConsentEntry,
     FAQItem,
+    GroupConsentAggregate,
     GroupConsentSheetLink,
+    GroupCustomConsentAggregate,
     LocalizedText,
     PlayFunQuestion,
     PlayFunResult,
@@ -19,10 +21,16 @@ from models.db_models import (
     UserGroupLink,
 )
 from models.model_utils import add_all_and_refresh, add_and_refresh, engine
+from services.group_cache import invalidate_group_cache
+from services.sheet_visibility import invalidate_visible_sheets
+from services.template_catalog import invalidate_template_catalog
+from services.text_catalog import invalidate_text_catalog
 
 
 def clear_all():
     with Session(engine) as session:
+        session.exec(delete(GroupConsentAggregate))
+        session.exec(delete(GroupCustomConsentAggregate))
         session.exec(delete(ConsentTemplate))
         session.exec(delete(FAQItem))
         session.exec(delete(PlayFunQuestion))
@@ -39,12 +47,22 @@ def clear_all():
         # session.exec(delete(User))
         # session.exec(delete(UserLogin))
         session.commit()
+    invalidate_template_catalog()
+    invalidate_text_catalog()
+    invalidate_visible_sheets()
+    invalidate_group_cache()
 
 
 def seed_consent_questioneer():
     topic_files = Path("src", "seeding", "contents").glob("*.md")
     with Session(engine) as session:
-        existing_templates = session.exec(select(ConsentTemplate)).all()
+        existing_topics = set(
+            session.exec(
+                select(LocalizedText.text_de).join(
+                    ConsentTemplate, ConsentTemplate.topic_id == LocalizedText.id
+                )
+            ).all()
+        )
         category_cache: dict[str, LocalizedText] = {}
         for file in topic_files:
             category_en = file.stem.capitalize()
@@ -66,11 +84,7 @@ def seed_consent_questioneer():
                 logging.debug(f"Content: {content_de[:20]}...")
                 content_de, explanation_de = content_de.strip().split("\n", 1)
                 content_en, explanation_en = content_en.strip().split("\n", 1)
-                existing_template = any(
-                    template.topic_local.text_de == content_de
-                    for template in existing_templates
-                )
-                if existing_template:
+                if content_de in existing_topics:
                     continue
                 logging.debug(f"Creating template for topic:{content_en}")
                 local_topic = LocalizedText(text_en=content_en, text_de=content_de)
@@ -99,9 +113,11 @@ def seed_consent_questioneer():
 
         all_templates = session.exec(select(ConsentTemplate)).all()
         logging.debug(f"Templates: {len(all_templates)}")
+    invalidate_template_catalog()
     # seed_users()
     seed_faq()
     seed_playfun_questions()
+    invalidate_text_catalog()
 
 
 def seed_faq():
@@ -177,15 +193,11 @@ def make_playfun_question(
     statement_en: str,
     play_style: str,
     session: Session,
-    existing_questions: list[PlayFunQuestion],
+    existing_statements: set[str],
     existing_texts: list[LocalizedText],
     weight: int = 1,
 ):
-    existing_question = any(
-        question.question_local.text_de == statement_de
-        for question in existing_questions
-    )
-    if existing_question:
+    if statement_de in existing_statements:
         return
     local_statement = LocalizedText(text_en=statement_en, text_de=statement_de)
     existing_text = any(text.text_de == statement_de for text in existing_texts)
@@ -205,9 +217,15 @@ def make_playfun_question(
 def seed_playfun_questions():
     files = Path("src", "seeding", "playfun").glob("*.md")
     with Session(engine) as session:
-        existing_questions = session.exec(select(PlayFunQuestion)).all()
+        existing_statements = set(
+            session.exec(
+                select(LocalizedText.text_de).join(
+                    PlayFunQuestion, PlayFunQuestion.question_id == LocalizedText.id
+                )
+            ).all()
+        )
         existing_texts = session.exec(select(LocalizedText)).all()
-        logging.debug(f"Questions: {len(existing_questions)}")
+        logging.debug(f"Questions: {len(existing_statements)}")
         logging.debug(f"Texts: {len(existing_texts)}")
         for file in files:
             play_style = file.stem.capitalize()
@@ -246,7 +264,7 @@ def seed_playfun_questions():
                     statement_en,
                     play_style,
                     session,
-                    existing_questions,
+                    existing_statements,
                     existing_texts,
                     1,
                 )
@@ -257,7 +275,7 @@ def seed_playfun_questions():
                     statement_en,
                     play_style,
                     session,
-                    existing_questions,
+                    existing_statements,
                     existing_texts,
                     -1,
                 )
@@ -7,6 +7,7 @@ from controller.user_controller import get_user_from_storage
 from controller.util_controller import get_all_faq, store_faq_question
 from localization.language_manager import get_localization, make_localisable
 from services.session_service import session_storage
+from services.text_catalog import lookup_texts
 
 
 def store_user_faq(user_faq: str):
@@ -62,11 +63,15 @@ def content(**kwargs):
             make_tour_card(tour)
     ui.separator()
     faq_items = get_all_faq()
+    texts = lookup_texts(
+        [text_id for item in faq_items for text_id in (item.question_id, item.answer_id)],
+        lang,
+    )
     with ui.grid().classes("gap-4 mx-auto lg:grid-cols-2 grid-cols-1 2xl:w-2/3"):
         for faq_item in faq_items:
             FAQElementComponent(
-                faq_item.question_local.get_text(lang),
-                faq_item.answer_local.get_text(lang),
+                texts.get(faq_item.question_id, ""),
+                texts.get(faq_item.answer_id, ""),
             )
     with ui.card().classes("w-5/6 mx-auto 2xl:w-2/3"):
         user_faq = ui.textarea("Neue Frage").classes("w-full")
@@ -1,4 +1,5 @@
 import logging
+import math
 
 from nicegui import ui
 
@@ -10,16 +11,25 @@ from components.sheet_display_component import SheetDisplayComponent
 from components.sheet_editable_component import SheetEditableComponent
 from components.tab_components import TabSpec, create_localised_tabs, create_tab_panels
 from services.group_service import (
+    MEMBER_PAGE_SIZE,
     assign_consent_sheet_to_group,
+    count_group_members,
+    count_group_sheets,
     create_new_group,
-    fetch_group_sheets,
-    fetch_group_users,
+    fetch_group_member_page,
+    fetch_group_roster,
+    fetch_group_sheet_ids,
     get_group_by_name_id,
+    is_large_group,
     leave_group,
     regenerate_invite_code,
     update_group,
 )
-from controller.user_controller import get_user_by_id_name
+from controller.sheet_controller import (
+    get_consent_sheet_by_id,
+    get_consent_sheets_by_ids,
+)
+from controller.user_controller import fetch_user_consent_sheets, get_user_by_id_name
 from guided_tour import NiceGuidedTour
 from localization.language_manager import get_localization, make_localisable
 from models.db_models import (
@@ -56,9 +66,21 @@ def content(group_name_id: str = None, **kwargs):
         return
     group: RPGGroup = get_group_by_name_id(group_name_id)
     logging.getLogger(LOGGER_NAME).debug(f"{group}")
-    logging.getLogger(LOGGER_NAME).debug(f"sheet {group.gm_consent_sheet}")
     logging.getLogger(LOGGER_NAME).debug(f"sheet_id {group.gm_consent_sheet_id}")
-    group_consent_sheets = fetch_group_sheets(group)
+    member_count = count_group_members(group)
+    large_group = is_large_group(member_count)
+    if large_group:
+        # only the user's own sheets are loaded, the group is shown from counts
+        group_consent_sheets = get_consent_sheets_by_ids(
+            user.id_name, fetch_group_sheet_ids(group, user.id)
+        )
+        sheet_count = count_group_sheets(group)
+    else:
+        group_consent_sheets = get_consent_sheets_by_ids(
+            user.id_name, fetch_group_sheet_ids(group)
+        )
+        sheet_count = len(group_consent_sheets)
+    display_sheets = None if large_group else group_consent_sheets
     logging.getLogger(LOGGER_NAME).debug(f"consent_sheets {group_consent_sheets}")
     is_gm = user.id == group.gm_user_id
     tabs, named_tabs = _build_group_tabs(tour_create_group)
@@ -72,13 +94,17 @@ def content(group_name_id: str = None, **kwargs):
     logging.getLogger(LOGGER_NAME).debug(f"show_tab {show_tab}")
     with panels:
         with ui.tab_panel(named_tabs["consent"]):
-            logging.getLogger(LOGGER_NAME).info(f"sheet {group.gm_consent_sheet}")
+            logging.getLogger(LOGGER_NAME).info(f"sheet {group.gm_consent_sheet_id}")
             sheet_display = SheetDisplayComponent(
-                consent_sheets=group_consent_sheets,
+                consent_sheets=display_sheets,
+                group_id=group.id,
+                sheet_count=sheet_count,
             )
         with ui.tab_panel(named_tabs["ordered_topics"]):
             ordered_topics_display = PreferenceOrderedSheetDisplayComponent(
-                consent_sheets=group_consent_sheets
+                consent_sheets=display_sheets,
+                group_id=group.id,
+                sheet_count=sheet_count,
             )
         with ui.tab_panel(named_tabs["edit"]):
             sheet_editor = edit_tab_content(user, group, is_gm, group_consent_sheets)
@@ -97,7 +123,10 @@ def content(group_name_id: str = None, **kwargs):
                 ui.label("Global Group")
             else:
                 general_tab_content(
-                    group, is_gm, tour_create_group, group_consent_sheets
+                    group,
+                    is_gm,
+                    tour_create_group,
+                    member_count if large_group else None,
                 )
     panels.on_value_change(
         lambda x: storage_show_tab_and_refresh(
@@ -133,7 +162,15 @@ def edit_tab_content(
     group_consent_sheets: list[ConsentSheet],
 ):
     if is_gm:
-        sheet_editor = SheetEditableComponent(group.gm_consent_sheet)
+        gm_sheet = next(
+            (
+                sheet
+                for sheet in group_consent_sheets
+                if sheet.id == group.gm_consent_sheet_id
+            ),
+            None,
+        ) or get_consent_sheet_by_id(user.id_name, group.gm_consent_sheet_id)
+        sheet_editor = SheetEditableComponent(gm_sheet)
     else:
         if user_sheet := next(
             (sheet for sheet in group_consent_sheets if sheet.user_id == user.id),
@@ -146,7 +183,7 @@ def edit_tab_content(
                 ui.label("No Consent Sheet assigned yet"),
                 key="no_sheet_assigned",
             )
-            for consent_sheet in user.consent_sheets:
+            for consent_sheet in fetch_user_consent_sheets(user):
                 ui.button(
                     consent_sheet.display_name,
                     on_click=lambda consent_sheet=consent_sheet: (
@@ -180,7 +217,7 @@ def general_tab_content(
     group: RPGGroup,
     is_gm: bool,
     tour_create_group: NiceGuidedTour,
-    group_consent_sheets: list[ConsentSheet],
+    large_group_member_count: int | None = None,
 ):
     group_name_input = (
         ui.input("Group Name")
@@ -220,32 +257,89 @@ def general_tab_content(
             key="new_code",
         )
 
+    if large_group_member_count is not None:
+        member_list = paginated_member_list(group, is_gm, large_group_member_count)
+        tour_create_group.add_step(
+            member_list,
+            get_localization("tour_create_group_member_grid"),
+        )
+        return
     with ui.grid().classes("grid-cols-3 lg:gap-4 gap-1") as grid:
         tour_create_group.add_step(
             grid,
             get_localization("tour_create_group_member_grid"),
         )
-        for player in fetch_group_users(group):
-            ui.label(player.nickname)
-            has_sheet_in_consent = any(
-                sheet for sheet in group_consent_sheets if sheet.user_id == player.id
-            )
-            make_localisable(
-                ui.label("Part of Consent"),
-                key="part_of_consent"
-                if has_sheet_in_consent
-                else "sheet_missing_in_consent",
+        for member in fetch_group_roster(group):
+            ui.label(member.nickname)
+            member_status(
+                is_gm,
+                member.is_gm,
+                member.has_sheet_in_group,
+                lambda member=member: leave_group(group, User(id=member.user_id)),
             )
-            if player.id == group.gm_user_id:
-                ui.label("GM")
-            else:
-                remove_button = (
-                    ui.button("Remove Player", color="red")
-                    .on_click(lambda player=player: leave_group(group, player))
-                    .tooltip(get_localization("gm_only_remove_player"))
-                )
-                remove_button.set_enabled(is_gm)
-                make_localisable(
-                    remove_button,
-                    key="remove_player",
+
+
+def member_status(
+    is_gm: bool,
+    member_is_gm: bool,
+    has_sheet_in_consent: bool,
+    on_remove,
+):
+    make_localisable(
+        ui.label("Part of Consent"),
+        key="part_of_consent" if has_sheet_in_consent else "sheet_missing_in_consent",
+    )
+    if member_is_gm:
+        ui.label("GM")
+    else:
+        remove_button = (
+            ui.button("Remove Player", color="red")
+            .on_click(on_remove)
+            .tooltip(get_localization("gm_only_remove_player"))
+        )
+        remove_button.set_enabled(is_gm)
+        make_localisable(
+            remove_button,
+            key="remove_player",
+        )
+
+
+def paginated_member_list(group: RPGGroup, is_gm: bool, member_count: int):
+    """Members of a large group, one page at a time with details loaded on open."""
+    pages = max(1, math.ceil(member_count / MEMBER_PAGE_SIZE))
+
+    @ui.refreshable
+    def member_page(page: int = 1):
+        for member in fetch_group_member_page(group, page):
+            with ui.expansion(member.nickname).classes("w-full") as details:
+                details.on_value_change(
+                    lambda event, member=member, details=details: (
+                        load_member_details(event.value, details, member)
+                    )
                 )
+
+    def load_member_details(opened: bool, details: ui.expansion, member) -> None:
+        if not opened or details.default_slot.children:
+            return
+        player = User(id=member.user_id, nickname=member.nickname)
+        with details, ui.row().classes("w-full"):
+            member_status(
+                is_gm,
+                member.user_id == group.gm_user_id,
+                bool(fetch_group_sheet_ids(group, member.user_id)),
+                lambda: remove_member(player),
+            )
+
+    def remove_member(player: User) -> None:
+        leave_group(group, player)
+        member_page.refresh(pagination.value)
+
+    with ui.column().classes("w-full") as member_list:
+        pagination = ui.pagination(
+            1,
+            pages,
+            direction_links=True,
+            on_change=lambda event: member_page.refresh(event.value),
+        )
+        member_page()
+    return member_list
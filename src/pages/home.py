@@ -17,6 +17,7 @@ from services.home_service import (
     SheetSummary,
     UserNotFoundError,
 )
+from services.import_service import MAX_IMPORT_BYTES
 from utlis import sanitize_name
 from services.session_service import (
     end_user_session,
@@ -259,9 +260,15 @@ def _render_sheet_actions(
     tour_create_sheet.add_step(
         new_sheet_button, get_localization("tour_create_sheet_new_sheet_button")
     )
-    import_upload = ui.upload(
-        label="Import", on_upload=actions.import_sheet_handler()
-    ).mark("import_sheet_upload")
+    import_upload = (
+        ui.upload(
+            label="Import",
+            on_upload=actions.import_sheet_handler(),
+            max_file_size=MAX_IMPORT_BYTES,
+        )
+        .props('accept=".json,.zip"')
+        .mark("import_sheet_upload")
+    )
     make_localisable(import_upload, key="import_sheet")
     tour_create_sheet.add_next_page(lambda: ui.navigate.to("/consentsheet/"))
     make_localisable(new_sheet_button, key="create_sheet")
@@ -569,15 +576,18 @@ class HomeActions:
         self,
     ) -> Callable[[events.UploadEventArguments], Awaitable[None]]:
         async def _import(upload_event: events.UploadEventArguments) -> None:
-            payload = await upload_event.file.text()
+            payload = await upload_event.file.read()
             try:
-                imported_sheet_id = await self._service.import_sheet(
+                imported_sheet_ids = await self._service.import_sheets(
                     self.user_id, payload
                 )
             except HomeServiceError as exc:
                 _notify_error(exc)
                 return
             ui.notify(get_localization("sheet_imported_successfully"))
-            ui.navigate.to(f"/consentsheet/{imported_sheet_id}")
+            if len(imported_sheet_ids) == 1:
+                ui.navigate.to(f"/consentsheet/{imported_sheet_ids[0]}")
+            else:
+                ui.navigate.reload()
 
         return _import
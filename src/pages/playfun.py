@@ -18,6 +18,7 @@ from models.db_models import (
     User,
 )
 from services.session_service import session_storage
+from services.text_catalog import lookup_texts
 
 SHOW_TAB_STORAGE_KEY = "playfun_tab"
 
@@ -83,11 +84,12 @@ def question_content(user: User):
         "lg:w-1/2 mx-auto"
     )
     lang = session_storage.get("lang", "en")
+    texts = lookup_texts([question.question_id for question in statements], lang)
     with ui.grid().classes("w-full lg:grid-cols-2 gap-4"):
         for playfun_question in statements:
             with ui.card():
                 with ui.row():
-                    ui.label(playfun_question.question_local.get_text(lang))
+                    ui.label(texts.get(playfun_question.question_id, ""))
                     # ui.label(
                     #     f"{playfun_question.play_style} {playfun_question.id}"
                     # ).classes("text-xs text-gray-500")
@@ -145,7 +147,6 @@ def construct_ratings(user: User) -> PlayFunResult:
         for play_style in answers
     }
     return PlayFunResult(
-        user=user or None,
         user_id=user.id if user else None,
         **{f"{play_style}_rating": value for play_style, value in ratings.items()},
     )
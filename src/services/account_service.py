@@ -0,0 +1,148 @@
+"""Removal of a user together with everything they own.
+
+The object graph of an account is deleted with a fixed sequence of set-based
+DELETE statements whose filters are subqueries on the user id, so the number
+of statements does not depend on how many sheets, groups or playstyle results
+the user has and no row is loaded into the session first. Everything runs in
+one transaction; the group and visible-sheet caches of every group the user
+owned, joined or shared a sheet with are invalidated after the commit.
+"""
+
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import delete, or_
+from sqlmodel import Session, select
+
+from a_logger_setup import LOGGER_NAME
+from models.db_models import (
+    ConsentEntry,
+    ConsentSheet,
+    CustomConsentEntry,
+    GroupConsentAggregate,
+    GroupConsentSheetLink,
+    GroupCustomConsentAggregate,
+    PlayFunAnswer,
+    PlayFunResult,
+    RPGGroup,
+    User,
+    UserGroupLink,
+    UserLogin,
+)
+from services.async_utils import run_sync
+from services.consent_aggregate_service import refresh_group_aggregates
+from services.group_cache import invalidate_group_cache
+from services.service_utils import transactional
+from services.sheet_visibility import invalidate_visible_sheets
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+
+@dataclass(frozen=True)
+class AccountDeletionReport:
+    """Rows removed by :func:`delete_user_account`, keyed by table name."""
+
+    user_id: int
+    deleted_rows: dict[str, int]
+
+    @property
+    def total(self) -> int:
+        return sum(self.deleted_rows.values())
+
+
+def _deletions(user_id: int) -> list:
+    """Return the DELETE statements of an account in dependency order."""
+    owned_groups = select(RPGGroup.id).where(RPGGroup.gm_user_id == user_id)
+    owned_sheets = select(ConsentSheet.id).where(ConsentSheet.user_id == user_id)
+    results = select(PlayFunResult.id).where(PlayFunResult.user_id == user_id)
+    return [
+        delete(GroupConsentAggregate).where(
+            GroupConsentAggregate.group_id.in_(owned_groups)
+        ),
+        delete(GroupCustomConsentAggregate).where(
+            GroupCustomConsentAggregate.group_id.in_(owned_groups)
+        ),
+        delete(GroupConsentSheetLink).where(
+            or_(
+                GroupConsentSheetLink.group_id.in_(owned_groups),
+                GroupConsentSheetLink.consent_sheet_id.in_(owned_sheets),
+            )
+        ),
+        delete(UserGroupLink).where(
+            or_(
+                UserGroupLink.group_id.in_(owned_groups),
+                UserGroupLink.user_id == user_id,
+            )
+        ),
+        delete(RPGGroup).where(RPGGroup.gm_user_id == user_id),
+        delete(ConsentEntry).where(ConsentEntry.consent_sheet_id.in_(owned_sheets)),
+        delete(CustomConsentEntry).where(
+            CustomConsentEntry.consent_sheet_id.in_(owned_sheets)
+        ),
+        delete(ConsentSheet).where(ConsentSheet.user_id == user_id),
+        delete(PlayFunAnswer).where(PlayFunAnswer.result_id.in_(results)),
+        delete(PlayFunResult).where(PlayFunResult.user_id == user_id),
+        delete(UserLogin).where(UserLogin.user_id == user_id),
+        delete(User).where(User.id == user_id),
+    ]
+
+
+@transactional
+def delete_user_account(
+    user_id: int, *, session: Session | None = None
+) -> AccountDeletionReport | None:
+    """Delete ``user_id`` with their groups, sheets, logins and playstyle results.
+
+    Groups of other users that held one of the deleted sheets get their
+    aggregates recomputed. Returns ``None`` when the user does not exist.
+    """
+    LOGGER.debug("delete_user_account %s", user_id)
+    if session.exec(select(User.id).where(User.id == user_id)).first() is None:
+        return None
+    affected_groups = session.exec(
+        select(GroupConsentSheetLink.group_id)
+        .join(RPGGroup, RPGGroup.id == GroupConsentSheetLink.group_id)
+        .join(ConsentSheet, ConsentSheet.id == GroupConsentSheetLink.consent_sheet_id)
+        .where(ConsentSheet.user_id == user_id, RPGGroup.gm_user_id != user_id)
+        .distinct()
+    ).all()
+    touched_groups = set(affected_groups)
+    touched_groups.update(
+        session.exec(select(RPGGroup.id).where(RPGGroup.gm_user_id == user_id)).all()
+    )
+    touched_groups.update(
+        session.exec(
+            select(UserGroupLink.group_id).where(UserGroupLink.user_id == user_id)
+        ).all()
+    )
+    member_ids = set(
+        session.exec(
+            select(UserGroupLink.user_id).where(
+                UserGroupLink.group_id.in_(touched_groups)
+            )
+        ).all()
+    )
+    member_ids.add(user_id)
+
+    deleted_rows: dict[str, int] = {}
+    for statement in _deletions(user_id):
+        result = session.exec(statement.execution_options(synchronize_session=False))
+        deleted_rows[statement.table.name] = result.rowcount
+    if affected_groups:
+        refresh_group_aggregates(affected_groups, session)
+    session.commit()
+    invalidate_group_cache(touched_groups)
+    invalidate_visible_sheets(member_ids)
+
+    report = AccountDeletionReport(user_id=user_id, deleted_rows=deleted_rows)
+    LOGGER.info("deleted account %s: %s rows %s", user_id, report.total, deleted_rows)
+    return report
+
+
+# Async-friendly wrappers ---------------------------------------------------
+
+
+async def delete_user_account_async(user_id: int) -> AccountDeletionReport | None:
+    """Asynchronous wrapper for :func:`delete_user_account`."""
+
+    return await run_sync(delete_user_account, user_id)
@@ -0,0 +1,373 @@
+"""Read model of the combined consent of every group, maintained on write.
+
+``GroupConsentAggregate`` holds one row per (group, template) and
+``GroupCustomConsentAggregate`` one row per (group, custom entry text). Write
+paths call the ``refresh_*`` helpers inside their own transaction so only the
+rows touched by the change are recomputed; group pages read the result with
+a primary key lookup instead of combining every member's entries in Python.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from sqlalchemy import and_, case, cast, delete, func, insert, literal
+from sqlalchemy.orm import defer
+from sqlmodel import Session, select
+
+from a_logger_setup import LOGGER_NAME
+from models.db_models import (
+    ConsentEntry,
+    ConsentStatus,
+    CustomConsentEntry,
+    GroupConsentAggregate,
+    GroupConsentSheetLink,
+    GroupCustomConsentAggregate,
+)
+from services.async_utils import run_sync
+from services.service_utils import transactional
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+COMMENT_SEPARATOR = "\n"
+
+_STATUS_COUNT_COLUMNS = {
+    ConsentStatus.yes: "yes_count",
+    ConsentStatus.okay: "okay_count",
+    ConsentStatus.maybe: "maybe_count",
+    ConsentStatus.unknown: "unknown_count",
+    ConsentStatus.no: "no_count",
+}
+_AGGREGATE_COLUMNS = [
+    "preference",
+    "has_hard_limit",
+    "sheet_count",
+    *_STATUS_COUNT_COLUMNS.values(),
+    "comments",
+]
+
+
+@dataclass(frozen=True)
+class GroupConsentOverview:
+    """Everything the group consent tabs need, read from the aggregate tables."""
+
+    group_id: int
+    templates: dict[int, GroupConsentAggregate]
+    custom_entries: list[GroupCustomConsentAggregate]
+
+    def aggregate(self, template_id: int) -> GroupConsentAggregate:
+        """Return the aggregate of ``template_id``, or one without any votes.
+
+        Templates added to the catalog after the group's aggregates were last
+        refreshed have no row yet.
+        """
+        aggregate = self.templates.get(template_id)
+        if aggregate is None:
+            return GroupConsentAggregate(
+                group_id=self.group_id, consent_template_id=template_id
+            )
+        return aggregate
+
+    def preference(self, template_id: int) -> ConsentStatus:
+        return self.aggregate(template_id).preference
+
+
+@dataclass(frozen=True)
+class PreferenceBuckets:
+    """Template ids and custom entry texts grouped by their combined status."""
+
+    templates: dict[ConsentStatus, list[int]]
+    custom_entries: dict[ConsentStatus, list[str]]
+
+    def __len__(self) -> int:
+        return sum(map(len, self.templates.values())) + sum(
+            map(len, self.custom_entries.values())
+        )
+
+    def size(self, status: ConsentStatus) -> int:
+        return len(self.templates[status]) + len(self.custom_entries[status])
+
+
+def status_counts(
+    aggregate: GroupConsentAggregate | GroupCustomConsentAggregate,
+) -> dict[ConsentStatus, int]:
+    """Return how many of the group's sheets chose each status, most open first."""
+    return {
+        status: getattr(aggregate, _STATUS_COUNT_COLUMNS[status])
+        for status in _STATUS_COUNT_COLUMNS
+    }
+
+
+def _most_restrictive(preference_column):
+    """Return ``max(order)`` over ``preference_column`` mapped back to a status."""
+    ordinal = case(
+        {status: status.order for status in ConsentStatus}, value=preference_column
+    )
+    return cast(
+        case(
+            {status.order: literal(status.name) for status in ConsentStatus},
+            value=func.max(ordinal),
+        ),
+        preference_column.type,
+    )
+
+
+def _aggregate_columns(preference_column, comment_column) -> list:
+    """Return the SELECT list shared by both aggregate tables."""
+    return [
+        _most_restrictive(preference_column),
+        func.max(case((preference_column == ConsentStatus.no, 1), else_=0)) == 1,
+        func.count(),
+        *(
+            func.sum(case((preference_column == status, 1), else_=0))
+            for status in _STATUS_COUNT_COLUMNS
+        ),
+        func.aggregate_strings(
+            case((comment_column != "", comment_column)), COMMENT_SEPARATOR
+        ),
+    ]
+
+
+def _refresh_template_rows(session: Session, group_filter, template_ids) -> None:
+    stale_rows = delete(GroupConsentAggregate).where(
+        GroupConsentAggregate.group_id.in_(group_filter)
+    )
+    source_filter = [GroupConsentSheetLink.group_id.in_(group_filter)]
+    if template_ids is not None:
+        stale_rows = stale_rows.where(
+            GroupConsentAggregate.consent_template_id.in_(template_ids)
+        )
+        source_filter.append(ConsentEntry.consent_template_id.in_(template_ids))
+    session.exec(stale_rows)
+    session.exec(
+        insert(GroupConsentAggregate).from_select(
+            ["group_id", "consent_template_id", *_AGGREGATE_COLUMNS],
+            select(
+                GroupConsentSheetLink.group_id,
+                ConsentEntry.consent_template_id,
+                *_aggregate_columns(ConsentEntry.preference, ConsentEntry.comment),
+            )
+            .join(
+                GroupConsentSheetLink,
+                GroupConsentSheetLink.consent_sheet_id == ConsentEntry.consent_sheet_id,
+            )
+            .where(*source_filter)
+            .group_by(GroupConsentSheetLink.group_id, ConsentEntry.consent_template_id),
+        )
+    )
+
+
+def _refresh_custom_rows(session: Session, group_filter) -> None:
+    session.exec(
+        delete(GroupCustomConsentAggregate).where(
+            GroupCustomConsentAggregate.group_id.in_(group_filter)
+        )
+    )
+    content_key = func.lower(CustomConsentEntry.content)
+    session.exec(
+        insert(GroupCustomConsentAggregate).from_select(
+            ["group_id", "content_key", "content", *_AGGREGATE_COLUMNS],
+            select(
+                GroupConsentSheetLink.group_id,
+                content_key,
+                func.min(CustomConsentEntry.content),
+                *_aggregate_columns(
+                    CustomConsentEntry.preference, CustomConsentEntry.comment
+                ),
+            )
+            .join(
+                GroupConsentSheetLink,
+                GroupConsentSheetLink.consent_sheet_id
+                == CustomConsentEntry.consent_sheet_id,
+            )
+            .where(
+                GroupConsentSheetLink.group_id.in_(group_filter),
+                and_(
+                    CustomConsentEntry.content.is_not(None),
+                    CustomConsentEntry.content != "",
+                ),
+            )
+            .group_by(GroupConsentSheetLink.group_id, content_key),
+        )
+    )
+
+
+def _groups_of_sheets(sheet_ids: Iterable[int]):
+    return select(GroupConsentSheetLink.group_id).where(
+        GroupConsentSheetLink.consent_sheet_id.in_(list(sheet_ids))
+    )
+
+
+def refresh_group_aggregates(group_ids: Iterable[int], session: Session) -> None:
+    """Recompute all aggregate rows of ``group_ids``; the caller commits."""
+    group_ids = list(group_ids)
+    LOGGER.debug("refresh_group_aggregates %s", group_ids)
+    _refresh_template_rows(session, group_ids, None)
+    _refresh_custom_rows(session, group_ids)
+
+
+def refresh_sheet_entry_aggregates(
+    sheet_ids: Iterable[int], template_ids: Iterable[int] | None, session: Session
+) -> None:
+    """Recompute the template rows touched by entry changes on ``sheet_ids``.
+
+    Only groups the sheets are linked to and, when given, only ``template_ids``
+    are rewritten. The caller commits.
+    """
+    template_ids = None if template_ids is None else list(template_ids)
+    _refresh_template_rows(session, _groups_of_sheets(sheet_ids), template_ids)
+
+
+def refresh_sheet_custom_aggregates(sheet_ids: Iterable[int], session: Session) -> None:
+    """Recompute the custom entry rows of every group ``sheet_ids`` belong to."""
+    _refresh_custom_rows(session, _groups_of_sheets(sheet_ids))
+
+
+def delete_group_aggregates(group_ids: Iterable[int], session: Session) -> None:
+    """Drop the aggregate rows of groups that are about to be deleted."""
+    group_ids = list(group_ids)
+    session.exec(
+        delete(GroupConsentAggregate).where(
+            GroupConsentAggregate.group_id.in_(group_ids)
+        )
+    )
+    session.exec(
+        delete(GroupCustomConsentAggregate).where(
+            GroupCustomConsentAggregate.group_id.in_(group_ids)
+        )
+    )
+
+
+def _read_overview(
+    session: Session, group_id: int, with_comments: bool = True
+) -> GroupConsentOverview:
+    template_query = select(GroupConsentAggregate).where(
+        GroupConsentAggregate.group_id == group_id
+    )
+    custom_query = (
+        select(GroupCustomConsentAggregate)
+        .where(GroupCustomConsentAggregate.group_id == group_id)
+        .order_by(GroupCustomConsentAggregate.content_key)
+    )
+    if not with_comments:
+        # the joined comments grow with the group, counts do not
+        template_query = template_query.options(
+            defer(GroupConsentAggregate.comments, raiseload=True)
+        )
+        custom_query = custom_query.options(
+            defer(GroupCustomConsentAggregate.comments, raiseload=True)
+        )
+    templates = session.exec(template_query).all()
+    custom_entries = session.exec(custom_query).all()
+    return GroupConsentOverview(
+        group_id=group_id,
+        templates={row.consent_template_id: row for row in templates},
+        custom_entries=list(custom_entries),
+    )
+
+
+@transactional
+def get_group_consent_overview(
+    group_id: int, with_comments: bool = True, session: Session | None = None
+) -> GroupConsentOverview:
+    """Return the combined consent of ``group_id`` from the aggregate tables.
+
+    Groups that predate the aggregate tables are rebuilt once on first read.
+    Without ``with_comments`` the joined comments are not loaded; reading
+    them then raises.
+    """
+    LOGGER.debug("get_group_consent_overview %s", group_id)
+    overview = _read_overview(session, group_id, with_comments)
+    if overview.templates:
+        return overview
+    has_sheets = session.exec(
+        select(GroupConsentSheetLink.consent_sheet_id).where(
+            GroupConsentSheetLink.group_id == group_id
+        )
+    ).first()
+    if has_sheets is None:
+        return overview
+    refresh_group_aggregates([group_id], session)
+    session.commit()
+    return _read_overview(session, group_id, with_comments)
+
+
+def _empty_buckets() -> PreferenceBuckets:
+    return PreferenceBuckets(
+        templates={status: [] for status in ConsentStatus.ordered()},
+        custom_entries={status: [] for status in ConsentStatus.ordered()},
+    )
+
+
+@transactional
+def get_preference_buckets(
+    sheet_ids: Sequence[int] = (),
+    group_id: int | None = None,
+    session: Session | None = None,
+) -> PreferenceBuckets:
+    """Bucket every template and custom entry by its most restrictive status.
+
+    With ``group_id`` the buckets come from the group's aggregate rows.
+    Otherwise the statuses of ``sheet_ids`` are combined by one GROUP BY per
+    entry table, so no entry is loaded into Python. Templates are ordered by
+    id and custom entries by their lower-cased text within each bucket.
+    """
+    LOGGER.debug("get_preference_buckets sheets=%s group=%s", sheet_ids, group_id)
+    buckets = _empty_buckets()
+    if group_id is not None:
+        overview = get_group_consent_overview(
+            group_id, with_comments=False, session=session
+        )
+        for template_id in sorted(overview.templates):
+            buckets.templates[overview.preference(template_id)].append(template_id)
+        for aggregate in overview.custom_entries:
+            buckets.custom_entries[aggregate.preference].append(aggregate.content_key)
+        return buckets
+    if not sheet_ids:
+        return buckets
+
+    template_rows = session.exec(
+        select(
+            ConsentEntry.consent_template_id,
+            _most_restrictive(ConsentEntry.preference),
+        )
+        .where(ConsentEntry.consent_sheet_id.in_(list(sheet_ids)))
+        .group_by(ConsentEntry.consent_template_id)
+        .order_by(ConsentEntry.consent_template_id)
+    ).all()
+    for template_id, status in template_rows:
+        buckets.templates[status].append(template_id)
+
+    content_key = func.lower(CustomConsentEntry.content)
+    custom_rows = session.exec(
+        select(content_key, _most_restrictive(CustomConsentEntry.preference))
+        .where(
+            CustomConsentEntry.consent_sheet_id.in_(list(sheet_ids)),
+            CustomConsentEntry.content.is_not(None),
+            CustomConsentEntry.content != "",
+        )
+        .group_by(content_key)
+        .order_by(content_key)
+    ).all()
+    for content, status in custom_rows:
+        buckets.custom_entries[status].append(content)
+    return buckets
+
+
+# Async-friendly wrappers ---------------------------------------------------
+
+
+async def get_group_consent_overview_async(
+    group_id: int, with_comments: bool = True
+) -> GroupConsentOverview:
+    """Asynchronous wrapper for :func:`get_group_consent_overview`."""
+
+    return await run_sync(get_group_consent_overview, group_id, with_comments)
+
+
+async def get_preference_buckets_async(
+    sheet_ids: Sequence[int] = (), group_id: int | None = None
+) -> PreferenceBuckets:
+    """Asynchronous wrapper for :func:`get_preference_buckets`."""
+
+    return await run_sync(get_preference_buckets, sheet_ids, group_id)
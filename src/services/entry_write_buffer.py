@@ -0,0 +1,380 @@
+"""Write-behind buffer for consent entry edits.
+
+Toggling a preference or leaving a comment field used to commit one
+transaction per click. Edits are now queued per sheet and coalesced by
+``(sheet, template)``, so only the latest value of each entry is written. A
+sheet is flushed in one transaction once it has been quiet for
+:data:`ENTRY_FLUSH_DELAY_SECONDS`, at the latest :data:`ENTRY_FLUSH_MAX_DELAY_SECONDS`
+after its oldest pending edit. Loading a sheet, disconnecting the editing
+client and shutting the app down flush right away, so reads see every edit
+and nothing is lost. A flush that fails puts its edits back and is retried
+with a doubling delay; after :data:`ENTRY_FLUSH_MAX_ATTEMPTS` failures the
+edits are dropped.
+
+Each entry is written with an UPDATE guarded by the version it was loaded
+with. Edits of entries that were changed elsewhere in the meantime are
+dropped instead of overwriting the newer value. Either way the editing
+client learns about a dropped edit through the ``on_conflict`` callback
+queued with it.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable
+
+from sqlmodel import Session, select
+
+from a_logger_setup import LOGGER_NAME
+from models.db_models import ConsentEntry, ConsentSheet, ConsentStatus, User
+from models.model_utils import session_scope
+from services.consent_aggregate_service import refresh_sheet_entry_aggregates
+from services.service_utils import insert_ignoring_conflicts
+from services.sheet_service import (
+    ConcurrentUpdateError,
+    touch_sheets,
+    update_entry_if_current,
+)
+from telemetry import get_metrics_recorder
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+ENTRY_FLUSH_DELAY_SECONDS = 1.0
+ENTRY_FLUSH_MAX_DELAY_SECONDS = 5.0
+ENTRY_FLUSH_MAX_ATTEMPTS = 5
+
+# called from the flushing thread when an edit is dropped, with a
+# ConcurrentUpdateError for a conflict or the error of the last failed flush
+ConflictHandler = Callable[[Exception], None]
+
+
+@dataclass(frozen=True, slots=True)
+class EntryChange:
+    """The latest queued value of one entry and who made it.
+
+    ``entry`` is the component's instance; its version is read when the
+    change is written and moved on once it is stored.
+    """
+
+    entry: ConsentEntry
+    user_id: int
+    template_id: int
+    preference: ConsentStatus
+    comment: str | None
+    on_conflict: ConflictHandler | None = None
+
+
+@dataclass
+class _PendingSheet:
+    first_queued_at: float
+    changes: dict[int, EntryChange]
+    timer: threading.Timer | None = None
+    failed_attempts: int = 0
+
+
+@dataclass(frozen=True)
+class EntryFlushResult:
+    """What one flush of a sheet wrote.
+
+    ``conflicts`` lists the templates whose entries were changed elsewhere
+    since they were loaded; those edits are dropped, not written.
+    """
+
+    sheet_id: int
+    batch_size: int
+    latency_ms: float
+    conflicts: tuple[int, ...] = ()
+
+
+class EntryWriteBuffer:
+    """Per-sheet queue of entry edits, flushed on a debounce."""
+
+    def __init__(
+        self,
+        delay_seconds: float = ENTRY_FLUSH_DELAY_SECONDS,
+        max_delay_seconds: float = ENTRY_FLUSH_MAX_DELAY_SECONDS,
+    ) -> None:
+        self.delay_seconds = delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._lock = threading.Lock()
+        # keeps batches of one sheet from being committed out of order
+        self._flush_lock = threading.Lock()
+        self._pending: dict[int, _PendingSheet] = {}
+
+    def enqueue(
+        self,
+        user: User,
+        entry: ConsentEntry,
+        on_conflict: ConflictHandler | None = None,
+    ) -> None:
+        """Queue the current preference and comment of ``entry``.
+
+        ``on_conflict`` is called if the edit is dropped, because the entry
+        was changed elsewhere since it was loaded or it could not be written.
+        """
+        sheet_id = entry.consent_sheet_id or entry.consent_sheet.id
+        change = EntryChange(
+            entry=entry,
+            user_id=user.id,
+            template_id=entry.consent_template_id,
+            preference=entry.preference or ConsentStatus.unknown,
+            comment=entry.comment,
+            on_conflict=on_conflict,
+        )
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending.get(sheet_id)
+            if pending is None:
+                pending = _PendingSheet(now, {})
+                self._pending[sheet_id] = pending
+            pending.changes[change.template_id] = change
+            delay = min(
+                self.delay_seconds,
+                max(0.0, pending.first_queued_at + self.max_delay_seconds - now),
+            )
+            self._flush_later(sheet_id, delay)
+
+    def pending_sheet_ids(self) -> list[int]:
+        with self._lock:
+            return list(self._pending)
+
+    def flush(self, sheet_ids: Iterable[int] | None = None) -> list[EntryFlushResult]:
+        """Write the queued edits of ``sheet_ids``, or of every sheet for ``None``."""
+        with self._flush_lock:
+            with self._lock:
+                if sheet_ids is None:
+                    sheet_ids = list(self._pending)
+                batches = {
+                    sheet_id: self._take(sheet_id)
+                    for sheet_id in sheet_ids
+                    if sheet_id in self._pending
+                }
+            if not batches:
+                return []
+            try:
+                with session_scope() as session:
+                    results = _write(session, batches)
+            except Exception as error:
+                self._restore(batches, error)
+                raise
+        for result in results:
+            if recorder := get_metrics_recorder():
+                recorder.record_entry_flush(result.batch_size, result.latency_ms)
+            LOGGER.debug(
+                "flushed %s entries of sheet %s after %.1f ms",
+                result.batch_size,
+                result.sheet_id,
+                result.latency_ms,
+            )
+            for template_id in result.conflicts:
+                change = batches[result.sheet_id].changes[template_id]
+                _report_dropped(
+                    change,
+                    ConcurrentUpdateError(
+                        "consententry", change.entry.id, change.entry.version or 0
+                    ),
+                )
+        return results
+
+    def _take(self, sheet_id: int) -> _PendingSheet:
+        pending = self._pending.pop(sheet_id)
+        if pending.timer is not None:
+            pending.timer.cancel()
+        return pending
+
+    def _restore(self, batches: dict[int, _PendingSheet], error: Exception) -> None:
+        """Queue the edits of a failed flush again, under any newer edits.
+
+        A batch that failed :data:`ENTRY_FLUSH_MAX_ATTEMPTS` times is dropped
+        instead; edits queued since then keep their own attempts.
+        """
+        dropped: list[EntryChange] = []
+        with self._lock:
+            for sheet_id, batch in batches.items():
+                batch.failed_attempts += 1
+                pending = self._pending.get(sheet_id)
+                if batch.failed_attempts >= ENTRY_FLUSH_MAX_ATTEMPTS:
+                    newer = pending.changes if pending is not None else {}
+                    dropped.extend(
+                        change
+                        for template_id, change in batch.changes.items()
+                        if template_id not in newer
+                    )
+                    LOGGER.error(
+                        "gave up on edits of sheet %s after %s failed flushes",
+                        sheet_id,
+                        batch.failed_attempts,
+                    )
+                    continue
+                if pending is not None:
+                    batch.changes.update(pending.changes)
+                    batch.first_queued_at = min(
+                        batch.first_queued_at, pending.first_queued_at
+                    )
+                    batch.timer = pending.timer
+                self._pending[sheet_id] = batch
+                # not capped by the max delay, a failing database is not hammered
+                self._flush_later(
+                    sheet_id, self.delay_seconds * 2 ** (batch.failed_attempts - 1)
+                )
+                LOGGER.warning(
+                    "flush of sheet %s failed %s times, re-queued its edits",
+                    sheet_id,
+                    batch.failed_attempts,
+                )
+        for change in dropped:
+            _report_dropped(change, error)
+
+    def _flush_later(self, sheet_id: int, delay: float) -> None:
+        pending = self._pending[sheet_id]
+        if pending.timer is not None:
+            pending.timer.cancel()
+        pending.timer = threading.Timer(delay, self._flush_quietly, args=(sheet_id,))
+        pending.timer.daemon = True
+        pending.timer.start()
+
+    def _flush_quietly(self, sheet_id: int) -> None:
+        try:
+            self.flush([sheet_id])
+        except Exception:
+            LOGGER.exception("flushing entries of sheet %s failed", sheet_id)
+
+
+def _write(
+    session: Session, batches: dict[int, _PendingSheet]
+) -> list[EntryFlushResult]:
+    now = datetime.now()
+    updated: dict[int, list[EntryChange]] = {}
+    unmatched: list[tuple[int, EntryChange]] = []
+    for sheet_id, pending in batches.items():
+        for change in pending.changes.values():
+            # read under the flush lock, after earlier flushes bumped it
+            if update_entry_if_current(
+                session,
+                sheet_id,
+                change.template_id,
+                change.preference,
+                change.comment,
+                change.entry.version or 0,
+                now,
+                owner_id=change.user_id,
+            ):
+                updated.setdefault(sheet_id, []).append(change)
+            else:
+                unmatched.append((sheet_id, change))
+    inserted: dict[int, list[EntryChange]] = {}
+    conflicts: dict[int, list[int]] = {}
+    if unmatched:
+        inserted, conflicts = _resolve_unmatched(session, unmatched, now)
+    written = {
+        sheet_id: updated.get(sheet_id, []) + inserted.get(sheet_id, [])
+        for sheet_id in batches
+        if sheet_id in updated or sheet_id in inserted
+    }
+    touch_sheets(session, list(written), now)
+    for sheet_id, changes in written.items():
+        refresh_sheet_entry_aggregates(
+            [sheet_id], [change.template_id for change in changes], session
+        )
+    session.commit()
+    for changes in updated.values():
+        for change in changes:
+            change.entry.version = (change.entry.version or 0) + 1
+    for changes in written.values():
+        for change in changes:
+            change.entry.updated_at = now
+    finished = time.monotonic()
+    return [
+        EntryFlushResult(
+            sheet_id=sheet_id,
+            batch_size=len(written.get(sheet_id, [])),
+            latency_ms=(finished - pending.first_queued_at) * 1000,
+            conflicts=tuple(conflicts.get(sheet_id, [])),
+        )
+        for sheet_id, pending in batches.items()
+        if sheet_id in written or sheet_id in conflicts
+    ]
+
+
+def _report_dropped(change: EntryChange, error: Exception) -> None:
+    if change.on_conflict is None:
+        return
+    try:
+        change.on_conflict(error)
+    except Exception:
+        LOGGER.exception("conflict handler of template %s failed", change.template_id)
+
+
+def _resolve_unmatched(
+    session: Session, unmatched: list[tuple[int, EntryChange]], now: datetime
+) -> tuple[dict[int, list[EntryChange]], dict[int, list[int]]]:
+    """Insert missing entries and sort out foreign and conflicting edits.
+
+    Only edits whose conditional UPDATE matched no row are looked up here.
+    """
+    sheet_ids = list({sheet_id for sheet_id, _ in unmatched})
+    owners = dict(
+        session.exec(
+            select(ConsentSheet.id, ConsentSheet.user_id).where(
+                ConsentSheet.id.in_(sheet_ids)
+            )
+        ).all()
+    )
+    existing = set(
+        session.exec(
+            select(
+                ConsentEntry.consent_sheet_id, ConsentEntry.consent_template_id
+            ).where(ConsentEntry.consent_sheet_id.in_(sheet_ids))
+        ).all()
+    )
+    inserted: dict[int, list[EntryChange]] = {}
+    conflicts: dict[int, list[int]] = {}
+    for sheet_id, change in unmatched:
+        if owners.get(sheet_id) != change.user_id:
+            LOGGER.warning("User %s may not edit sheet %s", change.user_id, sheet_id)
+        elif (sheet_id, change.template_id) in existing:
+            LOGGER.warning(
+                "entry of template %s on sheet %s changed since version %s, "
+                "dropped the edit",
+                change.template_id,
+                sheet_id,
+                change.entry.version,
+            )
+            conflicts.setdefault(sheet_id, []).append(change.template_id)
+        else:
+            inserted.setdefault(sheet_id, []).append(change)
+    if inserted:
+        # an entry saved by the editor in the meantime keeps its value
+        insert_ignoring_conflicts(
+            session,
+            ConsentEntry,
+            [
+                {
+                    "consent_sheet_id": sheet_id,
+                    "consent_template_id": change.template_id,
+                    "preference": change.preference,
+                    "comment": change.comment,
+                    "updated_at": now,
+                }
+                for sheet_id, changes in inserted.items()
+                for change in changes
+            ],
+        )
+    return inserted, conflicts
+
+
+entry_write_buffer = EntryWriteBuffer()
+
+
+def queue_entry_update(
+    user: User, entry: ConsentEntry, on_conflict: ConflictHandler | None = None
+) -> None:
+    """Queue an edit of ``entry`` on the shared buffer."""
+    entry_write_buffer.enqueue(user, entry, on_conflict)
+
+
+def flush_entry_updates(sheet_ids: Iterable[int] | None = None) -> None:
+    """Write pending edits of ``sheet_ids`` (all sheets for ``None``) now."""
+    entry_write_buffer.flush(sheet_ids)
@@ -0,0 +1,178 @@
+"""Streaming JSON export of one or more consent sheets.
+
+Entries are read ordered by template id and merged group by group, so the
+export is built in a single pass and never holds more than one template's
+entries in memory. Custom entries of one sheet are kept as they are written,
+so an export imports back unchanged; across several sheets they are merged
+by their lower-cased content, as the group display does, keeping the first
+spelling. There are only a few per sheet, so they are collected in memory.
+The output has the same shape ``services.import_service`` reads.
+"""
+
+import json
+import logging
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator, Sequence
+from urllib.parse import urlencode
+
+from sqlmodel import select
+
+from a_logger_setup import LOGGER_NAME
+from models.db_models import (
+    ConsentEntry,
+    ConsentSheet,
+    ConsentStatus,
+    CustomConsentEntry,
+)
+from models.model_utils import session_scope
+from services.entry_write_buffer import flush_entry_updates
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+EXPORT_PATH = "/api/export"
+EXPORT_BATCH_SIZE = 500
+
+ExportRow = tuple[object, ConsentStatus, str | None]
+
+
+def export_url(sheet_ids: Iterable[int]) -> str:
+    """Return the download URL of the export of ``sheet_ids``."""
+    query = urlencode([("sheet_id", sheet_id) for sheet_id in sheet_ids])
+    return f"{EXPORT_PATH}?{query}"
+
+
+def export_filename(sheet_ids: Sequence[int]) -> str:
+    suffix = sheet_ids[0] if len(sheet_ids) == 1 else "group"
+    return f"export_consent_sheet_{suffix}.json"
+
+
+def export_header(sheets: Sequence[ConsentSheet]) -> dict:
+    """Return the sheet level fields of an export of ``sheets``."""
+    if len(sheets) == 1:
+        return {
+            "unique_name": f"export_of_sheet_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "human_name": sheets[0].human_name,
+            "comment": sheets[0].comment,
+        }
+    return {
+        "unique_name": "export_of_multiple_sheets",
+        "human_name": None,
+        "comment": "; ".join(sheet.comment for sheet in sheets if sheet.comment),
+    }
+
+
+def _merge(rows: Iterable[ExportRow], key_name: str) -> Iterator[dict]:
+    """Combine consecutive rows sharing a key into one exported entry."""
+    for key, group in groupby(rows, key=itemgetter(0)):
+        preferences = []
+        comments = []
+        for _, preference, comment in group:
+            preferences.append(preference)
+            if comment:
+                comments.append(comment)
+        yield {
+            key_name: key,
+            "preference": ConsentStatus.get_consent(preferences),
+            "comment": "; ".join(comments) or None,
+        }
+
+
+def _merge_custom(rows: Iterable[ExportRow], fold_case: bool) -> Iterator[dict]:
+    """Combine custom rows with the same content.
+
+    With ``fold_case`` content that only differs in case is combined as well.
+    """
+    grouped: dict[str, list[ExportRow]] = {}
+    for row in rows:
+        grouped.setdefault(row[0].lower() if fold_case else row[0], []).append(row)
+    for key in sorted(grouped):
+        group = grouped[key]
+        yield from _merge(((group[0][0], *row[1:]) for row in group), "content")
+
+
+def _json_array(items: Iterable[dict]) -> Iterator[str]:
+    yield "["
+    for index, item in enumerate(items):
+        yield ("," if index else "") + json.dumps(item)
+    yield "]"
+
+
+def iter_export_json(
+    header: dict,
+    entry_rows: Iterable[ExportRow],
+    custom_rows: Iterable[ExportRow],
+    *,
+    several_sheets: bool = False,
+) -> Iterator[str]:
+    """Yield the export document in chunks.
+
+    ``entry_rows`` are ``(template_id, preference, comment)`` tuples sorted by
+    template id and ``custom_rows`` ``(content, preference, comment)`` tuples
+    in the order they were written, taken from all exported sheets. Custom
+    entries are only merged regardless of case for ``several_sheets``.
+    """
+    yield "{"
+    for key, value in header.items():
+        yield f"{json.dumps(key)}: {json.dumps(value)}, "
+    yield '"consent_entries": '
+    yield from _json_array(_merge(entry_rows, "consent_template_id"))
+    yield ', "custom_consent_entries": '
+    yield from _json_array(_merge_custom(custom_rows, fold_case=several_sheets))
+    yield "}"
+
+
+def _rows(session, statement) -> Iterator[ExportRow]:
+    yield from session.exec(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+
+def iter_sheets_export(sheet_ids: Sequence[int]) -> Iterator[str]:
+    """Stream the export of ``sheet_ids`` straight from the database.
+
+    The generator owns its session, so it can be handed to a streaming
+    response. Callers are responsible for checking that the sheets may be
+    exported; unknown ids are skipped and nothing is yielded if none exist.
+    """
+    sheet_ids = list(sheet_ids)
+    LOGGER.debug("iter_sheets_export %s", sheet_ids)
+    flush_entry_updates(sheet_ids)
+    with session_scope() as session:
+        sheets = session.exec(
+            select(ConsentSheet)
+            .where(ConsentSheet.id.in_(sheet_ids))
+            .order_by(ConsentSheet.id)
+        ).all()
+        if not sheets:
+            return
+        sheet_ids = [sheet.id for sheet in sheets]
+        entry_rows = _rows(
+            session,
+            select(
+                ConsentEntry.consent_template_id,
+                ConsentEntry.preference,
+                ConsentEntry.comment,
+            )
+            .where(ConsentEntry.consent_sheet_id.in_(sheet_ids))
+            .order_by(ConsentEntry.consent_template_id, ConsentEntry.consent_sheet_id),
+        )
+        custom_rows = _rows(
+            session,
+            select(
+                CustomConsentEntry.content,
+                CustomConsentEntry.preference,
+                CustomConsentEntry.comment,
+            )
+            .where(
+                CustomConsentEntry.consent_sheet_id.in_(sheet_ids),
+                CustomConsentEntry.content.is_not(None),
+                CustomConsentEntry.content != "",
+            )
+            .order_by(CustomConsentEntry.consent_sheet_id, CustomConsentEntry.id),
+        )
+        yield from iter_export_json(
+            export_header(sheets),
+            entry_rows,
+            custom_rows,
+            several_sheets=len(sheets) > 1,
+        )
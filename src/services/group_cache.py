@@ -0,0 +1,98 @@
+"""Cached lookup of groups by id, used to resolve ``name-id`` page urls.
+
+Only the group's own columns are cached, as an immutable snapshot; every
+lookup hands out a new detached ``RPGGroup`` built from it, so pages can bind
+and edit their copy without touching other clients. A miss loads the one
+group by primary key. ``update_group``, ``delete_group`` and
+``regenerate_invite_code`` call :func:`invalidate_group_cache` after commit.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlmodel import Session, select
+
+from a_logger_setup import LOGGER_NAME
+from models.db_models import RPGGroup
+from models.model_utils import session_scope
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedGroup:
+    """Read-only copy of the columns of an ``RPGGroup`` row."""
+
+    id: int
+    name: str | None
+    invite_code: str | None
+    gm_user_id: int | None
+    gm_consent_sheet_id: int | None
+
+    def to_group(self) -> RPGGroup:
+        """Return a new detached ``RPGGroup``; relationships are not loaded."""
+        return RPGGroup(
+            id=self.id,
+            name=self.name,
+            invite_code=self.invite_code,
+            gm_user_id=self.gm_user_id,
+            gm_consent_sheet_id=self.gm_consent_sheet_id,
+        )
+
+
+_lock = threading.Lock()
+_generation = 0
+_groups: dict[int, CachedGroup] = {}
+
+
+def _load(session: Session, group_id: int) -> CachedGroup | None:
+    row = session.exec(
+        select(
+            RPGGroup.id,
+            RPGGroup.name,
+            RPGGroup.invite_code,
+            RPGGroup.gm_user_id,
+            RPGGroup.gm_consent_sheet_id,
+        ).where(RPGGroup.id == group_id)
+    ).first()
+    return CachedGroup(*row) if row is not None else None
+
+
+def get_cached_group(
+    group_id: int, session: Session | None = None
+) -> CachedGroup | None:
+    """Return the snapshot of ``group_id`` or ``None`` if there is no such group.
+
+    Unknown ids are not cached, a group created later is found right away.
+    """
+    cached = _groups.get(group_id)
+    if cached is not None:
+        return cached
+    generation = _generation
+    if session is not None:
+        group = _load(session, group_id)
+    else:
+        with session_scope() as scoped_session:
+            group = _load(scoped_session, group_id)
+    if group is not None:
+        with _lock:
+            # an invalidation while loading may have made the row stale
+            if generation == _generation:
+                _groups[group_id] = group
+    return group
+
+
+def invalidate_group_cache(group_ids: Iterable[int] | None = None) -> None:
+    """Forget the cached ``group_ids``, or every group for ``None``."""
+    global _generation
+    group_ids = None if group_ids is None else list(group_ids)
+    with _lock:
+        _generation += 1
+        if group_ids is None:
+            _groups.clear()
+        else:
+            for group_id in group_ids:
+                _groups.pop(group_id, None)
+    LOGGER.debug("group cache invalidated for %s", group_ids or "all groups")
@@ -2,12 +2,16 @@
 
 import logging
 import random
+import secrets
 import string
+from dataclasses import dataclass
 
-from sqlmodel import Session, delete, select
+from sqlalchemy import update
+from sqlmodel import Session, delete, func, select
 
 from a_logger_setup import LOGGER_NAME
 from models.db_models import (
+    ConsentEntry,
     ConsentSheet,
     ConsentStatus,
     GroupConsentSheetLink,
@@ -17,12 +21,39 @@ from models.db_models import (
 )
 from models.model_utils import add_and_refresh, session_scope
 from services.async_utils import run_sync
-from services.service_utils import transactional
+from services.consent_aggregate_service import (
+    delete_group_aggregates,
+    refresh_group_aggregates,
+)
+from services.group_cache import get_cached_group, invalidate_group_cache
+from services.service_utils import insert_ignoring_conflicts, transactional
 from services.sheet_service import create_consent_sheet
+from services.sheet_visibility import group_member_ids, invalidate_visible_sheets
+from settings import get_settings
 from utlis import sanitize_name
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 
+MEMBER_PAGE_SIZE = 25
+
+
+@dataclass(frozen=True)
+class GroupMember:
+    """A member of a group, without any of their sheets."""
+
+    user_id: int
+    nickname: str | None
+
+
+@dataclass(frozen=True)
+class RosterEntry:
+    """A member of a group with their role and whether they shared a sheet."""
+
+    user_id: int
+    nickname: str | None
+    is_gm: bool
+    has_sheet_in_group: bool
+
 
 @transactional
 def get_group_by_id(group_id: int, session: Session | None = None) -> RPGGroup | None:
@@ -38,6 +69,107 @@ def fetch_group_sheets(group: RPGGroup, session: Session = None) -> list[Consent
     return group.fetch_consent_sheets(session)
 
 
+@transactional
+def fetch_group_sheet_ids(
+    group: RPGGroup, user_id: int | None = None, session: Session = None
+) -> list[int]:
+    """Return the ids of the consent sheets attached to ``group``.
+
+    With ``user_id`` only the sheets owned by that user are returned.
+    """
+    LOGGER.debug("fetch_group_sheet_ids %s %s", group.id, user_id)
+    query = select(GroupConsentSheetLink.consent_sheet_id).where(
+        GroupConsentSheetLink.group_id == group.id
+    )
+    if user_id is not None:
+        query = query.join(
+            ConsentSheet, ConsentSheet.id == GroupConsentSheetLink.consent_sheet_id
+        ).where(ConsentSheet.user_id == user_id)
+    return list(session.exec(query).all())
+
+
+@transactional
+def fetch_group_roster(group: RPGGroup, session: Session = None) -> list[RosterEntry]:
+    """Return every member of ``group`` ordered by nickname.
+
+    One query LEFT JOINs the members with the owners of the group's sheets,
+    so neither users nor sheets are loaded as ORM objects.
+    """
+    LOGGER.debug("fetch_group_roster %s", group.id)
+    sheet_owners = (
+        select(ConsentSheet.user_id)
+        .join(
+            GroupConsentSheetLink,
+            GroupConsentSheetLink.consent_sheet_id == ConsentSheet.id,
+        )
+        .where(GroupConsentSheetLink.group_id == group.id)
+        .distinct()
+        .subquery()
+    )
+    rows = session.exec(
+        select(
+            User.id,
+            User.nickname,
+            User.id == RPGGroup.gm_user_id,
+            sheet_owners.c.user_id.is_not(None),
+        )
+        .join(UserGroupLink, UserGroupLink.user_id == User.id)
+        .join(RPGGroup, RPGGroup.id == UserGroupLink.group_id)
+        .outerjoin(sheet_owners, sheet_owners.c.user_id == User.id)
+        .where(UserGroupLink.group_id == group.id)
+        .order_by(User.nickname, User.id)
+    ).all()
+    return [
+        RosterEntry(user_id, nickname, bool(is_gm), bool(has_sheet))
+        for user_id, nickname, is_gm, has_sheet in rows
+    ]
+
+
+@transactional
+def count_group_members(group: RPGGroup, session: Session = None) -> int:
+    """Return the number of members of ``group`` without loading them."""
+    return session.exec(
+        select(func.count()).where(UserGroupLink.group_id == group.id)
+    ).one()
+
+
+@transactional
+def count_group_sheets(group: RPGGroup, session: Session = None) -> int:
+    """Return the number of consent sheets attached to ``group``."""
+    return session.exec(
+        select(func.count()).where(GroupConsentSheetLink.group_id == group.id)
+    ).one()
+
+
+def is_large_group(member_count: int) -> bool:
+    """Whether a group of ``member_count`` members is shown in large-group mode.
+
+    Large groups render aggregated counts and a paginated member list, so
+    the page does not load every member and sheet.
+    """
+    return member_count > get_settings().large_group_member_threshold
+
+
+@transactional
+def fetch_group_member_page(
+    group: RPGGroup,
+    page: int = 1,
+    page_size: int = MEMBER_PAGE_SIZE,
+    session: Session = None,
+) -> list[GroupMember]:
+    """Return one page of the members of ``group``, ordered by nickname."""
+    LOGGER.debug("fetch_group_member_page %s page=%s", group.id, page)
+    rows = session.exec(
+        select(User.id, User.nickname)
+        .join(UserGroupLink, UserGroupLink.user_id == User.id)
+        .where(UserGroupLink.group_id == group.id)
+        .order_by(User.nickname, User.id)
+        .offset((max(page, 1) - 1) * page_size)
+        .limit(page_size)
+    ).all()
+    return [GroupMember(user_id, nickname) for user_id, nickname in rows]
+
+
 @transactional
 def fetch_group_users(group: RPGGroup, session: Session = None) -> list[User]:
     """Return all users who are members of the supplied ``group``."""
@@ -45,41 +177,23 @@ def fetch_group_users(group: RPGGroup, session: Session = None) -> list[User]:
     return group.fetch_users(session)
 
 
-@transactional
 def get_group_by_name_id(group_name_id: str, session: Session = None) -> RPGGroup:
-    """Resolve the composite ``name-id`` identifier used in the UI to a group."""
+    """Resolve the composite ``name-id`` identifier used in the UI to a group.
+
+    Served from the group cache; the returned group is a detached copy whose
+    relationships are not loaded.
+    """
     LOGGER.debug("get_group_by_name_id %s", group_name_id)
 
     name, group_id = group_name_id.rsplit("-", 1)
-    group = session.get(RPGGroup, int(group_id))
-    if not group:
-        groups = session.exec(select(RPGGroup)).all()
-        for existing in groups:
-            LOGGER.debug("%s", existing)
+    group = get_cached_group(int(group_id), session)
+    if group is None:
         raise ValueError(f"Invalid questioneer_id: {group_name_id}")
 
     normalized_expected = name.lower().replace(" ", "")
     normalized_actual = (group.name or "").lower().replace(" ", "")
-
-    if group.invite_code == "global" and not group.gm_consent_sheet:
-        gm_sheet = session.exec(
-            select(ConsentSheet).where(ConsentSheet.user_id == group.gm_user_id)
-        ).first()
-        if gm_sheet:
-            group.gm_consent_sheet = gm_sheet
-            group.gm_consent_sheet_id = gm_sheet.id
-            session.merge(group)
-            session.merge(
-                GroupConsentSheetLink(
-                    group_id=group.id,
-                    consent_sheet_id=gm_sheet.id,
-                )
-            )
-            session.commit()
-            session.refresh(group)
-
     if normalized_actual == normalized_expected:
-        return group
+        return group.to_group()
 
     raise ValueError(f"Mismatch questioneer_id: {group_name_id}", group.name)
 
@@ -107,7 +221,10 @@ def assign_consent_sheet_to_group(
             consent_sheet_id=db_sheet.id,
         )
     )
+    session.flush()
+    refresh_group_aggregates([db_group.id], session)
     session.commit()
+    invalidate_visible_sheets(group_member_ids(db_group.id, session))
     session.refresh(db_group)
     return db_group
 
@@ -137,7 +254,10 @@ def unassign_consent_sheet_from_group(
     ).first()
     if link:
         session.delete(link)
+        session.flush()
+        refresh_group_aggregates([db_group.id], session)
         session.commit()
+        invalidate_visible_sheets(group_member_ids(db_group.id, session))
     else:
         LOGGER.warning(
             "no link found %s <RPGGroup id=%s name=%s>",
@@ -156,23 +276,21 @@ def create_new_group(
     LOGGER.debug("create_group %s", user)
 
     managed_user = session.get(User, user.id) or user
-    sheet = (
-        session.get(ConsentSheet, sheet_id)
-        if sheet_id
-        else create_consent_sheet(managed_user, session=session)
-    )
+    sheet_id = sheet_id or create_consent_sheet(managed_user, session=session).id
     group = RPGGroup(
         name=sanitize_name(f"{managed_user.nickname}-Group"),
         gm_user_id=managed_user.id,
-        gm_consent_sheet_id=sheet.id,
-        gm_consent_sheet=sheet,
+        gm_consent_sheet_id=sheet_id,
         invite_code=_generate_invite_code(None),
     )
     session.add(group)
     session.commit()
-    session.add(GroupConsentSheetLink(group_id=group.id, consent_sheet_id=sheet.id))
+    session.add(GroupConsentSheetLink(group_id=group.id, consent_sheet_id=sheet_id))
     session.add(UserGroupLink(user_id=managed_user.id, group_id=group.id))
+    session.flush()
+    refresh_group_aggregates([group.id], session)
     session.commit()
+    invalidate_visible_sheets([managed_user.id])
     session.refresh(group)
     return regenerate_invite_code(group, session=session)
 
@@ -183,11 +301,12 @@ def update_group(group: RPGGroup, session: Session = None) -> RPGGroup:
     LOGGER.debug("update_group %s", group)
 
     group.name = sanitize_name(group.name)
-    session.merge(group)
+    db_group = session.merge(group)
     session.commit()
-    session.refresh(group)
-    LOGGER.debug("merged %s", group)
-    return group
+    invalidate_group_cache([db_group.id])
+    session.refresh(db_group)
+    LOGGER.debug("merged %s", db_group)
+    return db_group
 
 
 @transactional
@@ -200,7 +319,10 @@ def regenerate_invite_code(group: RPGGroup, session: Session = None) -> RPGGroup
     LOGGER.debug("regenerate_invite_code %s", db_group)
     db_group.invite_code = _generate_invite_code(db_group.id)
     session.commit()
+    invalidate_group_cache([db_group.id])
     session.refresh(db_group)
+    # pages bind the invite code of the copy they hold
+    group.invite_code = db_group.invite_code
     LOGGER.debug("merged %s", db_group)
     return db_group
 
@@ -213,14 +335,18 @@ def delete_group(group: RPGGroup, session: Session = None) -> RPGGroup:
     db_group = session.get(RPGGroup, group.id)
     if not db_group:
         raise ValueError("Group not found when deleting")
+    member_ids = group_member_ids(db_group.id, session)
     session.exec(
         delete(GroupConsentSheetLink).where(
             GroupConsentSheetLink.group_id == db_group.id
         )
     )
     session.exec(delete(UserGroupLink).where(UserGroupLink.group_id == db_group.id))
+    delete_group_aggregates([db_group.id], session)
     session.delete(db_group)
     session.commit()
+    invalidate_group_cache([group.id])
+    invalidate_visible_sheets(member_ids)
     LOGGER.debug("deleted %s", db_group)
     return db_group
 
@@ -254,20 +380,19 @@ def join_group(code: str, user: User, session: Session = None) -> RPGGroup | Non
     """Add ``user`` to the group identified by ``code`` if it exists."""
     LOGGER.debug("join_group <%s> invite_code=%s", user, code)
 
-    managed_user = session.get(User, user.id)
-    if managed_user is None:
+    if session.exec(select(User.id).where(User.id == user.id)).first() is None:
         return None
 
     if code.lower() == "global":
-        return _ensure_membership(
-            managed_user,
-            ensure_global_group(session),
-            session,
-        )
+        return _ensure_membership(user, ensure_global_group(session), session)
 
-    group = session.exec(select(RPGGroup).where(RPGGroup.invite_code == code)).first()
-    if group:
-        return _ensure_membership(managed_user, group, session)
+    # invite codes are unique and indexed, the group itself comes from the cache
+    group_id = session.exec(
+        select(RPGGroup.id).where(RPGGroup.invite_code == code)
+    ).first()
+    if group_id is not None:
+        group = get_cached_group(group_id, session)
+        return _ensure_membership(user, group.to_group(), session)
 
     LOGGER.debug("no group found %s", code)
     return None
@@ -285,12 +410,13 @@ def leave_group(
     if not db_group or not db_user:
         return None
 
+    # the leaving user loses the group's sheets, the others lose theirs
+    member_ids = group_member_ids(db_group.id, session)
     session.exec(
         delete(UserGroupLink).where(
             UserGroupLink.user_id == db_user.id,
             UserGroupLink.group_id == db_group.id,
-        ),
-        execution_options={"is_delete_using": True},
+        )
     )
     group_sheet_links = session.exec(
         select(GroupConsentSheetLink).where(
@@ -301,22 +427,24 @@ def leave_group(
     ).all()
     for link in group_sheet_links:
         session.delete(link)
-    session.merge(db_group)
+    if group_sheet_links:
+        session.flush()
+        refresh_group_aggregates([db_group.id], session)
     session.commit()
+    invalidate_visible_sheets(member_ids)
     LOGGER.debug("left %s", db_group)
     return db_group
 
 
 def _ensure_membership(user: User, group: RPGGroup, session: Session) -> RPGGroup:
-    """Upsert the membership link between ``user`` and ``group``."""
-    session.merge(
-        UserGroupLink(
-            user_id=user.id,
-            group_id=group.id,
-        )
+    """Add the membership link between ``user`` and ``group`` unless it exists."""
+    joined = insert_ignoring_conflicts(
+        session, UserGroupLink, {"user_id": user.id, "group_id": group.id}
     )
     session.commit()
-    LOGGER.debug("joined %s", group)
+    if joined:
+        invalidate_visible_sheets([user.id])
+        LOGGER.debug("joined %s", group)
     return group
 
 
@@ -344,17 +472,22 @@ def _get_or_create_global_sheet(session: Session, user: User) -> ConsentSheet:
     if existing_sheet is not None:
         return existing_sheet
 
-    sheet = create_consent_sheet(user, session=session)
-    for entry in sheet.consent_entries:
-        entry.preference = ConsentStatus.yes
+    sheet_id = create_consent_sheet(user, session=session).id
+    session.exec(
+        update(ConsentEntry)
+        .where(ConsentEntry.consent_sheet_id == sheet_id)
+        .values(preference=ConsentStatus.yes)
+    )
     session.commit()
-    session.refresh(sheet)
-    return sheet
+    return session.get(ConsentSheet, sheet_id)
 
 
 def _generate_invite_code(group_id: int | None) -> str:
-    """Return a short invite code, prefixing the group id once available."""
-    prefix = str(group_id) if group_id else "?"
+    """Return a short invite code, unique through the group id prefix.
+
+    Before the group has an id a random placeholder keeps the code unique.
+    """
+    prefix = str(group_id) if group_id else f"?{secrets.token_hex(8)}"
     return "-".join(
         [
             prefix,
@@ -379,6 +512,40 @@ async def fetch_group_sheets_async(group: RPGGroup) -> list[ConsentSheet]:
     return await run_sync(fetch_group_sheets, group)
 
 
+async def fetch_group_sheet_ids_async(
+    group: RPGGroup, user_id: int | None = None
+) -> list[int]:
+    """Asynchronous wrapper for :func:`fetch_group_sheet_ids`."""
+
+    return await run_sync(fetch_group_sheet_ids, group, user_id)
+
+
+async def fetch_group_roster_async(group: RPGGroup) -> list[RosterEntry]:
+    """Asynchronous wrapper for :func:`fetch_group_roster`."""
+
+    return await run_sync(fetch_group_roster, group)
+
+
+async def count_group_members_async(group: RPGGroup) -> int:
+    """Asynchronous wrapper for :func:`count_group_members`."""
+
+    return await run_sync(count_group_members, group)
+
+
+async def count_group_sheets_async(group: RPGGroup) -> int:
+    """Asynchronous wrapper for :func:`count_group_sheets`."""
+
+    return await run_sync(count_group_sheets, group)
+
+
+async def fetch_group_member_page_async(
+    group: RPGGroup, page: int = 1, page_size: int = MEMBER_PAGE_SIZE
+) -> list[GroupMember]:
+    """Asynchronous wrapper for :func:`fetch_group_member_page`."""
+
+    return await run_sync(fetch_group_member_page, group, page, page_size)
+
+
 async def fetch_group_users_async(group: RPGGroup) -> list[User]:
     """Asynchronous wrapper for :func:`fetch_group_users`."""
 
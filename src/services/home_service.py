@@ -5,12 +5,13 @@ from typing import Iterable, Sequence
 
 from sqlmodel import Session, select
 
-from controller.sheet_controller import delete_sheet, import_sheet_from_json
+from controller.sheet_controller import delete_sheet
 from controller.user_controller import delete_account
 from models.db_models import ConsentSheet, RPGGroup, User
 from models.model_utils import session_scope
 from services.async_utils import run_sync
 from services.group_service import delete_group, join_group, leave_group
+from services.import_service import SheetImportError, import_sheets
 
 
 class HomeServiceError(RuntimeError):
@@ -100,8 +101,8 @@ class HomeService:
     async def delete_account(self, user_id_name: str) -> None:
         await run_sync(self._delete_account, user_id_name)
 
-    async def import_sheet(self, user_id_name: str, json_text: str) -> int:
-        return await run_sync(self._import_sheet, user_id_name, json_text)
+    async def import_sheets(self, user_id_name: str, payload: bytes) -> list[int]:
+        return await run_sync(self._import_sheets, user_id_name, payload)
 
     def _load_dashboard(self, user_id_name: str) -> HomeDashboard:
         with session_scope() as session:
@@ -159,10 +160,13 @@ class HomeService:
             user = self._require_user(session, user_id_name)
             delete_account(user, session=session)
 
-    def _import_sheet(self, user_id_name: str, json_text: str) -> int:
+    def _import_sheets(self, user_id_name: str, payload: bytes) -> list[int]:
         with session_scope() as session:
             user = self._require_user(session, user_id_name)
-        return import_sheet_from_json(json_text, user)
+            try:
+                return import_sheets(payload, user, session=session)
+            except SheetImportError as exc:
+                raise HomeServiceError(f"Import failed: {exc}") from exc
 
     @staticmethod
     def _require_user(session: Session, user_id_name: str) -> User:
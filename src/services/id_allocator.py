@@ -0,0 +1,69 @@
+"""Allocation of random public identifiers backed by unique indexes.
+
+Candidates are drawn from a cryptographic RNG and written straight away inside
+a SAVEPOINT; a unique index violation rolls back just that write and another
+candidate is tried. Existing identifiers are never read.
+"""
+
+import logging
+import secrets
+import string
+from typing import Callable, TypeVar
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from a_logger_setup import LOGGER_NAME
+from telemetry import get_metrics_recorder
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+T = TypeVar("T")
+
+ID_ALPHABET = string.ascii_letters + string.digits
+# 62**12 ~ 2**71 possible ids, so a retry practically never happens
+DEFAULT_ID_LENGTH = 12
+MAX_ATTEMPTS = 5
+
+
+class IdAllocationError(RuntimeError):
+    """Raised when no free identifier was found within ``MAX_ATTEMPTS``."""
+
+
+def generate_id(length: int = DEFAULT_ID_LENGTH) -> str:
+    """Return a random alphanumeric identifier of ``length`` characters."""
+    return "".join(secrets.choice(ID_ALPHABET) for _ in range(length))
+
+
+def allocate_unique_id(
+    session: Session,
+    write: Callable[[T], None],
+    *,
+    kind: str,
+    generate: Callable[[], T] = generate_id,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> T:
+    """Persist a fresh identifier through ``write`` and return it.
+
+    ``write`` receives a candidate and must flush a row that a unique index
+    covers. It runs inside a SAVEPOINT, so a collision only rolls back that
+    attempt and the surrounding transaction stays usable; committing is left
+    to the caller. ``kind`` labels the retry metric. ``generate`` may also
+    return a batch of ids that ``write`` inserts at once; a collision then
+    retries the whole batch.
+    """
+    last_error: IntegrityError | None = None
+    for attempt in range(max_attempts):
+        candidate = generate()
+        try:
+            with session.begin_nested():
+                write(candidate)
+            return candidate
+        except IntegrityError as error:
+            last_error = error
+            LOGGER.warning("%s id collision on attempt %s, retrying", kind, attempt + 1)
+            if recorder := get_metrics_recorder():
+                recorder.record_id_allocation_retry(kind)
+    raise IdAllocationError(
+        f"no free {kind} id after {max_attempts} attempts"
+    ) from last_error
@@ -0,0 +1,307 @@
+"""Validated import of exported consent sheets.
+
+An upload is either one exported sheet, a JSON array of them or a zip archive
+of such files. Each sheet is checked against the shared template catalog before
+it is written, sheets are inserted in batches with multi-row INSERTs and the
+whole import is committed once, so an invalid sheet leaves nothing behind.
+Only one batch of validated sheets is held in memory at a time.
+"""
+
+import io
+import json
+import logging
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Collection, Iterable, Iterator
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from a_logger_setup import LOGGER_NAME
+from models.db_models import (
+    ConsentEntry,
+    ConsentSheet,
+    ConsentStatus,
+    CustomConsentEntry,
+    User,
+)
+from services.async_utils import run_sync
+from services.id_allocator import allocate_unique_id, generate_id
+from services.service_utils import transactional
+from services.sheet_service import current_template_version
+from services.template_catalog import get_template_catalog
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+MAX_IMPORT_BYTES = 10 * 1024 * 1024
+MAX_SHEETS_PER_IMPORT = 100
+MAX_ENTRIES_PER_SHEET = 2000
+IMPORT_BATCH_SIZE = 20
+
+EntryRow = tuple[int, ConsentStatus, str | None]
+CustomEntryRow = tuple[str, ConsentStatus, str | None]
+
+
+class SheetImportError(ValueError):
+    """Raised when an upload is not a valid sheet export."""
+
+
+@dataclass(frozen=True)
+class ValidatedSheet:
+    """A sheet export that passed validation and is ready to insert."""
+
+    human_name: str | None
+    comment: str | None
+    entries: list[EntryRow]
+    custom_entries: list[CustomEntryRow]
+
+
+def _iter_json(raw: bytes | str, source: str) -> Iterator[tuple[str, object]]:
+    try:
+        data = json.loads(raw)
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise SheetImportError(f"{source} is not valid JSON") from error
+    if isinstance(data, list):
+        for index, item in enumerate(data):
+            yield f"{source}[{index}]", item
+    else:
+        yield source, data
+
+
+def _iter_archive(payload: bytes) -> Iterator[tuple[str, object]]:
+    budget = MAX_IMPORT_BYTES
+    with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(".json"):
+                continue
+            if info.file_size > budget:
+                raise SheetImportError("archive is too large once unpacked")
+            with archive.open(info) as member:
+                # the header size may lie, so never read past the budget
+                raw = member.read(budget + 1)
+            if len(raw) > budget:
+                raise SheetImportError("archive is too large once unpacked")
+            budget -= len(raw)
+            yield from _iter_json(raw, info.filename)
+
+
+def iter_import_documents(payload: bytes | str) -> Iterator[tuple[str, object]]:
+    """Yield ``(source, document)`` for every sheet in an upload.
+
+    ``source`` names the document in error messages. Archive members are
+    unpacked one at a time.
+    """
+    if len(payload) > MAX_IMPORT_BYTES:
+        raise SheetImportError("upload is too large")
+    if isinstance(payload, bytes) and zipfile.is_zipfile(io.BytesIO(payload)):
+        yield from _iter_archive(payload)
+    else:
+        yield from _iter_json(payload, "upload")
+
+
+def _optional_text(value: object, field: str, source: str) -> str | None:
+    if value is not None and not isinstance(value, str):
+        raise SheetImportError(f"{source}: {field} must be a string")
+    return value
+
+
+def _preference(data: dict, source: str) -> ConsentStatus:
+    try:
+        return ConsentStatus(data["preference"])
+    except (KeyError, ValueError, TypeError) as error:
+        raise SheetImportError(
+            f"{source}: invalid preference {data.get('preference')!r}"
+        ) from error
+
+
+def _entries_list(data: dict, field: str, source: str) -> list:
+    value = data.get(field) or []
+    if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+        raise SheetImportError(f"{source}: {field} must be a list of objects")
+    return value
+
+
+def validate_sheet(
+    data: object, template_ids: Collection[int], source: str = "sheet"
+) -> ValidatedSheet:
+    """Check one exported sheet against ``template_ids``.
+
+    Rejects unknown or repeated template ids, invalid preferences, empty
+    custom entries and sheets with more than ``MAX_ENTRIES_PER_SHEET`` entries.
+    """
+    if not isinstance(data, dict):
+        raise SheetImportError(f"{source}: expected a sheet object")
+    entries_data = _entries_list(data, "consent_entries", source)
+    custom_data = _entries_list(data, "custom_consent_entries", source)
+    if len(entries_data) + len(custom_data) > MAX_ENTRIES_PER_SHEET:
+        raise SheetImportError(f"{source}: too many entries")
+
+    entries: list[EntryRow] = []
+    seen: set[int] = set()
+    for entry in entries_data:
+        template_id = entry.get("consent_template_id")
+        if not isinstance(template_id, int) or isinstance(template_id, bool):
+            raise SheetImportError(f"{source}: invalid template id {template_id!r}")
+        if template_id in seen:
+            raise SheetImportError(f"{source}: duplicate template id {template_id}")
+        if template_id not in template_ids:
+            raise SheetImportError(f"{source}: unknown template id {template_id}")
+        seen.add(template_id)
+        entries.append(
+            (
+                template_id,
+                _preference(entry, source),
+                _optional_text(entry.get("comment"), "comment", source),
+            )
+        )
+
+    custom_entries: list[CustomEntryRow] = []
+    for entry in custom_data:
+        content = entry.get("content")
+        if not isinstance(content, str) or not content.strip():
+            raise SheetImportError(f"{source}: custom entries need a content text")
+        custom_entries.append(
+            (
+                content,
+                _preference(entry, source),
+                _optional_text(entry.get("comment"), "comment", source),
+            )
+        )
+
+    return ValidatedSheet(
+        human_name=_optional_text(data.get("human_name"), "human_name", source),
+        comment=_optional_text(data.get("comment"), "comment", source),
+        entries=entries,
+        custom_entries=custom_entries,
+    )
+
+
+def _complete(entries: list[EntryRow], template_ids: Collection[int]) -> list[EntryRow]:
+    """Add an ``unknown`` row for every template ``entries`` do not mention."""
+    present = {template_id for template_id, _, _ in entries}
+    return entries + [
+        (template_id, ConsentStatus.unknown, None)
+        for template_id in template_ids
+        if template_id not in present
+    ]
+
+
+def _insert_batch(
+    session: Session,
+    user_id: int,
+    batch: list[ValidatedSheet],
+    template_ids: Collection[int],
+    template_version: int,
+) -> list[int]:
+    sheet_ids: list[int] = []
+
+    def _insert(unique_names: list[str]) -> None:
+        sheet_ids[:] = session.exec(
+            insert(ConsentSheet).returning(
+                ConsentSheet.id, sort_by_parameter_order=True
+            ),
+            params=[
+                {
+                    "unique_name": unique_name,
+                    "user_id": user_id,
+                    "human_name": sheet.human_name,
+                    "comment": sheet.comment,
+                    "created_at": datetime.now(),
+                    "updated_at": datetime.now(),
+                    "template_version": template_version,
+                }
+                for unique_name, sheet in zip(unique_names, batch)
+            ],
+        ).scalars()
+
+    allocate_unique_id(
+        session,
+        _insert,
+        kind="sheet_unique_name",
+        generate=lambda: [generate_id() for _ in batch],
+    )
+    entry_rows = [
+        {
+            "consent_sheet_id": sheet_id,
+            "consent_template_id": template_id,
+            "preference": preference,
+            "comment": comment,
+        }
+        for sheet_id, sheet in zip(sheet_ids, batch)
+        for template_id, preference, comment in _complete(sheet.entries, template_ids)
+    ]
+    if entry_rows:
+        session.exec(insert(ConsentEntry), params=entry_rows)
+    custom_rows = [
+        {
+            "consent_sheet_id": sheet_id,
+            "content": content,
+            "preference": preference,
+            "comment": comment,
+        }
+        for sheet_id, sheet in zip(sheet_ids, batch)
+        for content, preference, comment in sheet.custom_entries
+    ]
+    if custom_rows:
+        session.exec(insert(CustomConsentEntry), params=custom_rows)
+    return sheet_ids
+
+
+@transactional
+def import_documents(
+    documents: Iterable[tuple[str, object]],
+    user: User,
+    *,
+    session: Session | None = None,
+) -> list[int]:
+    """Validate and insert ``(source, document)`` pairs for ``user``.
+
+    Templates a sheet does not mention are added as ``unknown``. Nothing is
+    committed unless every document is valid; returns the new sheet ids in
+    document order.
+    """
+    user_id = session.exec(select(User.id).where(User.id == user.id)).first()
+    if user_id is None:
+        raise ValueError("User not found when importing consent sheets")
+    template_ids = get_template_catalog(session).by_id.keys()
+    template_version = current_template_version(session)
+
+    sheet_ids: list[int] = []
+    batch: list[ValidatedSheet] = []
+    for count, (source, document) in enumerate(documents, start=1):
+        if count > MAX_SHEETS_PER_IMPORT:
+            raise SheetImportError(
+                f"an import may contain at most {MAX_SHEETS_PER_IMPORT} sheets"
+            )
+        batch.append(validate_sheet(document, template_ids, source))
+        if len(batch) == IMPORT_BATCH_SIZE:
+            sheet_ids += _insert_batch(
+                session, user_id, batch, template_ids, template_version
+            )
+            batch = []
+    if batch:
+        sheet_ids += _insert_batch(
+            session, user_id, batch, template_ids, template_version
+        )
+    if not sheet_ids:
+        raise SheetImportError("the upload contains no sheets")
+    session.commit()
+    LOGGER.info("imported %s sheets for user %s", len(sheet_ids), user_id)
+    return sheet_ids
+
+
+def import_sheets(
+    payload: bytes | str, user: User, *, session: Session | None = None
+) -> list[int]:
+    """Import every sheet of an upload; see :func:`iter_import_documents`."""
+    return import_documents(iter_import_documents(payload), user, session=session)
+
+
+# Async-friendly wrappers ---------------------------------------------------
+
+
+async def import_sheets_async(payload: bytes | str, user: User) -> list[int]:
+    """Asynchronous wrapper for :func:`import_sheets`."""
+
+    return await run_sync(import_sheets, payload, user)
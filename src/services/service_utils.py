@@ -1,13 +1,16 @@
 import functools
 from typing import Callable, ParamSpec, TypeVar
 
-from sqlmodel import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, SQLModel
 
 from models.model_utils import session_scope
 
 P = ParamSpec("P")
 R = TypeVar("R")
 
+_CONFLICT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
 
 def transactional(func: Callable[P, R]) -> Callable[P, R]:
     """
@@ -29,3 +32,27 @@ def transactional(func: Callable[P, R]) -> Callable[P, R]:
             return func(*args, **kwargs)
             
     return wrapper
+
+
+def dialect_insert(session: Session, model: type[SQLModel]):
+    """Return an INSERT into ``model`` that supports ``on_conflict_do_nothing``.
+
+    SQLite and PostgreSQL each have their own insert construct for it.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect not in _CONFLICT_INSERTS:
+        raise NotImplementedError(f"no conflict-ignoring insert for {dialect}")
+    return _CONFLICT_INSERTS[dialect](model)
+
+
+def insert_ignoring_conflicts(
+    session: Session, model: type[SQLModel], values: dict | list[dict]
+) -> int:
+    """INSERT ``values`` into the table of ``model``, skipping existing rows.
+
+    Uses ``INSERT ... ON CONFLICT DO NOTHING`` so no SELECT is needed first and
+    concurrent inserts of the same key do not fail. Returns the number of rows
+    actually inserted.
+    """
+    statement = dialect_insert(session, model).values(values)
+    return session.exec(statement.on_conflict_do_nothing()).rowcount
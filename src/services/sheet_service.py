@@ -1,19 +1,60 @@
 """Sheet-oriented business operations shared between UI and controllers."""
 
 import logging
-import random
-import string
-from typing import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Sequence
 
-from sqlmodel import Session, select
+from sqlalchemy import exists, insert, literal, true, update
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, delete, func, select
 
 from a_logger_setup import LOGGER_NAME
-from models.db_models import ConsentEntry, ConsentSheet, ConsentTemplate, User
+from models.db_models import (
+    ConsentEntry,
+    ConsentSheet,
+    ConsentStatus,
+    ConsentTemplate,
+    CustomConsentEntry,
+    User,
+)
 
-from services.service_utils import transactional
+from services.consent_aggregate_service import refresh_sheet_entry_aggregates
+from services.id_allocator import allocate_unique_id, generate_id
+from services.service_utils import dialect_insert, transactional
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 
+# what the sheet pages read from a loaded sheet; touching any other
+# relationship is a lazy load (see LAZY_MODE), every other use reads columns
+SHEET_CONTENT = (
+    selectinload(ConsentSheet.consent_entries),
+    selectinload(ConsentSheet.custom_consent_entries),
+)
+
+
+class ConcurrentUpdateError(RuntimeError):
+    """A row was changed elsewhere since it was loaded.
+
+    Raised instead of overwriting the other change; callers reload the row
+    and let the user redo the edit.
+    """
+
+    def __init__(self, table: str, row_id: int, expected_version: int) -> None:
+        super().__init__(f"{table} {row_id} changed since version {expected_version}")
+        self.table = table
+        self.row_id = row_id
+        self.expected_version = expected_version
+
+
+@dataclass(frozen=True)
+class CreatedSheet:
+    """Projection of a freshly created consent sheet."""
+
+    id: int
+    unique_name: str
+    user_id: int
+
 
 @transactional
 def create_consent_sheet(
@@ -21,52 +62,293 @@ def create_consent_sheet(
     *,
     session: Session | None = None,
     unique_name_factory: Callable[[Session], str] | None = None,
-) -> ConsentSheet:
+) -> CreatedSheet:
     """Create a new consent sheet for the given user.
 
     The optional ``session`` argument allows composition in larger transactions.
     ``unique_name_factory`` enables deterministic testing.
     """
-    managed_user = session.get(User, user.id)
-    if managed_user is None:
+    return create_consent_sheets(
+        user, 1, session=session, unique_name_factory=unique_name_factory
+    )[0]
+
+
+@transactional
+def create_consent_sheets(
+    user: User,
+    count: int,
+    *,
+    session: Session | None = None,
+    unique_name_factory: Callable[[Session], str] | None = None,
+) -> list[CreatedSheet]:
+    """Create ``count`` consent sheets for ``user`` in a single transaction.
+
+    The sheets are inserted with one multi-row INSERT and their entries for
+    every template with one INSERT…SELECT, followed by a single commit.
+    SQLite hands out the id of a deleted sheet again, entries still stored
+    under a new id are dropped before the new ones are inserted.
+    """
+    user_id = session.exec(select(User.id).where(User.id == user.id)).first()
+    if user_id is None:
         raise ValueError("User not found when creating consent sheet")
 
     name_factory = unique_name_factory or _generate_unique_name
-    unique_name = name_factory(session)
+    template_version = current_template_version(session)
+    created: list[CreatedSheet] = []
+
+    def _insert(unique_names: list[str]) -> None:
+        rows = session.exec(
+            insert(ConsentSheet).returning(ConsentSheet.id, ConsentSheet.unique_name),
+            params=[
+                {
+                    "unique_name": unique_name,
+                    "user_id": user_id,
+                    "created_at": datetime.now(),
+                    "updated_at": datetime.now(),
+                    "template_version": template_version,
+                }
+                for unique_name in unique_names
+            ],
+        ).all()
+        created[:] = [
+            CreatedSheet(id=row.id, unique_name=row.unique_name, user_id=user_id)
+            for row in rows
+        ]
 
-    sheet = ConsentSheet(
-        unique_name=unique_name,
-        user_id=managed_user.id,
-        user=managed_user,
+    allocate_unique_id(
+        session,
+        _insert,
+        kind="sheet_unique_name",
+        generate=lambda: [name_factory(session) for _ in range(count)],
+    )
+    sheet_ids = [sheet.id for sheet in created]
+    for model in (ConsentEntry, CustomConsentEntry):
+        session.exec(delete(model).where(model.consent_sheet_id.in_(sheet_ids)))
+    session.exec(
+        dialect_insert(session, ConsentEntry)
+        .from_select(
+            ["consent_sheet_id", "consent_template_id", "preference"],
+            select(
+                ConsentSheet.id,
+                ConsentTemplate.id,
+                literal(
+                    ConsentStatus.unknown, ConsentEntry.__table__.c.preference.type
+                ),
+            )
+            .join(ConsentTemplate, true())
+            .where(ConsentSheet.id.in_(sheet_ids)),
+        )
+        .on_conflict_do_nothing()
     )
-    managed_user.consent_sheets.append(sheet)
-    session.add(sheet)
     session.commit()
-    session.refresh(sheet)
-
-    templates = session.exec(select(ConsentTemplate)).all()
-    for template in templates:
-        entry = ConsentEntry(
-            consent_sheet_id=sheet.id,
-            consent_sheet=sheet,
-            consent_template_id=template.id,
-            consent_template=template,
+    LOGGER.info("created consent sheets %s", created)
+    return created
+
+
+def _generate_unique_name(session: Session) -> str:
+    """Return a random sheet name; uniqueness is enforced on insert."""
+    return generate_id()
+
+
+def current_template_version(session: Session) -> int:
+    """Return the version of the template catalog.
+
+    Templates are only ever appended, so the highest template id identifies
+    the catalog a sheet was completed against.
+    """
+    return session.exec(select(func.max(ConsentTemplate.id))).one() or 0
+
+
+@transactional
+def backfill_consent_entries(
+    sheets: Sequence[ConsentSheet], *, session: Session | None = None
+) -> bool:
+    """Create missing template entries for every sheet with a stale stamp.
+
+    Sheets stamped with the current template version are skipped without
+    touching the entry table. Stale sheets are completed with a single
+    INSERT…SELECT, re-stamped and committed once; only the aggregates of the
+    inserted templates are refreshed. Returns ``True`` when rows were written
+    so callers know to refresh their loaded sheets.
+    """
+    version = current_template_version(session)
+    stale_ids = [sheet.id for sheet in sheets if sheet.template_version != version]
+    if not stale_ids:
+        return False
+
+    missing_entries = (
+        select(
+            ConsentSheet.id,
+            ConsentTemplate.id,
+            literal(ConsentStatus.unknown, ConsentEntry.__table__.c.preference.type),
+        )
+        .join(ConsentTemplate, true())
+        .where(
+            ConsentSheet.id.in_(stale_ids),
+            ~exists().where(
+                ConsentEntry.consent_sheet_id == ConsentSheet.id,
+                ConsentEntry.consent_template_id == ConsentTemplate.id,
+            ),
+        )
+    )
+    # a concurrent backfill of the same sheet may have inserted some already
+    inserted = session.exec(
+        dialect_insert(session, ConsentEntry)
+        .from_select(
+            ["consent_sheet_id", "consent_template_id", "preference"],
+            missing_entries,
+        )
+        .on_conflict_do_nothing()
+        .returning(ConsentEntry.consent_sheet_id, ConsentEntry.consent_template_id)
+    ).all()
+    session.exec(
+        update(ConsentSheet)
+        .where(ConsentSheet.id.in_(stale_ids))
+        .values(template_version=version)
+    )
+    if inserted:
+        refresh_sheet_entry_aggregates(
+            {row.consent_sheet_id for row in inserted},
+            {row.consent_template_id for row in inserted},
+            session,
         )
-        sheet.consent_entries.append(entry)
-        session.add(entry)
     session.commit()
-    session.refresh(sheet)
-    session.merge(managed_user)
+    LOGGER.debug(
+        "backfilled %s entries for sheets %s to template version %s",
+        len(inserted),
+        stale_ids,
+        version,
+    )
+    return True
+
+
+@transactional
+def set_category_preference(
+    sheet_id: int,
+    category_id: int,
+    status: ConsentStatus,
+    only_unknown: bool = True,
+    *,
+    session: Session | None = None,
+) -> list[int]:
+    """Set ``status`` on every entry of ``sheet_id`` in ``category_id``.
+
+    Runs as one UPDATE joined with the templates of the category; with
+    ``only_unknown`` entries that already have a preference are kept. Returns
+    the template ids of the entries that changed, so callers can refresh just
+    those. Each changed entry moves on one version.
+    """
+    now = datetime.now()
+    conditions = [
+        ConsentEntry.consent_sheet_id == sheet_id,
+        ConsentEntry.consent_template_id == ConsentTemplate.id,
+        ConsentTemplate.category_id == category_id,
+        ConsentEntry.preference != status,
+    ]
+    if only_unknown:
+        conditions.append(ConsentEntry.preference == ConsentStatus.unknown)
+    changed = list(
+        session.exec(
+            update(ConsentEntry)
+            .where(*conditions)
+            .values(preference=status, version=ConsentEntry.version + 1, updated_at=now)
+            .returning(ConsentEntry.consent_template_id)
+        ).scalars()
+    )
+    if changed:
+        touch_sheets(session, [sheet_id], now)
+        refresh_sheet_entry_aggregates([sheet_id], changed, session)
     session.commit()
-    LOGGER.info("created consent sheet %s", sheet)
-    return sheet
+    LOGGER.debug(
+        "set %s entries of sheet %s in category %s to %s",
+        len(changed),
+        sheet_id,
+        category_id,
+        status,
+    )
+    return changed
 
 
-def _generate_unique_name(session: Session) -> str:
-    """Return a random unique identifier not already used by any sheet."""
-    existing = set(session.exec(select(ConsentSheet.unique_name)).all())
-    while True:
-        candidate = "".join(random.choices(string.ascii_letters + string.digits, k=8))
-        if candidate not in existing:
-            existing.add(candidate)
-            return candidate
+@transactional
+def update_sheet_details(
+    sheet: ConsentSheet, *, session: Session | None = None
+) -> None:
+    """Store name, comment and share id of ``sheet`` if it is still current.
+
+    One UPDATE guarded by ``sheet.version``, without reading the row first.
+    On success ``sheet.version`` and ``sheet.updated_at`` follow the stored
+    row; if the sheet was changed elsewhere nothing is written and
+    :class:`ConcurrentUpdateError` is raised.
+    """
+    now = datetime.now()
+    result = session.exec(
+        update(ConsentSheet)
+        .where(ConsentSheet.id == sheet.id, ConsentSheet.version == sheet.version)
+        .values(
+            human_name=sheet.human_name,
+            comment=sheet.comment,
+            public_share_id=sheet.public_share_id,
+            updated_at=now,
+            version=ConsentSheet.version + 1,
+        )
+    )
+    if result.rowcount != 1:
+        session.rollback()
+        raise ConcurrentUpdateError("consentsheet", sheet.id, sheet.version)
+    session.commit()
+    sheet.version += 1
+    sheet.updated_at = now
+
+
+def update_entry_if_current(
+    session: Session,
+    sheet_id: int,
+    template_id: int,
+    preference: ConsentStatus,
+    comment: str | None,
+    expected_version: int,
+    now: datetime,
+    owner_id: int | None = None,
+) -> bool:
+    """Write one entry if it is still at ``expected_version``.
+
+    With ``owner_id`` the sheet has to belong to that user as well. Returns
+    ``False`` if no row matched; the caller decides whether the entry is
+    missing, foreign or was changed elsewhere. Does not commit.
+    """
+    conditions = [
+        ConsentEntry.consent_sheet_id == sheet_id,
+        ConsentEntry.consent_template_id == template_id,
+        ConsentEntry.version == expected_version,
+    ]
+    if owner_id is not None:
+        conditions.append(
+            ConsentEntry.consent_sheet_id.in_(
+                select(ConsentSheet.id).where(ConsentSheet.user_id == owner_id)
+            )
+        )
+    result = session.exec(
+        update(ConsentEntry)
+        .where(*conditions)
+        .values(
+            preference=preference,
+            comment=comment,
+            version=ConsentEntry.version + 1,
+            updated_at=now,
+        )
+    )
+    return result.rowcount == 1
+
+
+def touch_sheets(session: Session, sheet_ids: Sequence[int], now: datetime) -> None:
+    """Move ``updated_at`` of ``sheet_ids`` after their entries changed.
+
+    The sheet version is left alone, entry edits do not conflict with edits
+    of the sheet name or comment.
+    """
+    if sheet_ids:
+        session.exec(
+            update(ConsentSheet)
+            .where(ConsentSheet.id.in_(list(sheet_ids)))
+            .values(updated_at=now)
+        )
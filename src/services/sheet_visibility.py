@@ -0,0 +1,118 @@
+"""Which consent sheets a user may see, resolved in bulk and cached per user.
+
+A user sees their own sheets, sheets assigned to a group they are a member
+of and every publicly shared sheet. The first two sets are loaded with one
+query per user and cached for :data:`VISIBILITY_TTL_SECONDS`; group
+membership and sheet assignment changes invalidate the affected users right
+away. Public sharing is not cached, ids outside the cached set are checked
+against the database in one query per :func:`filter_visible` call.
+"""
+
+import logging
+import threading
+import time
+from typing import Iterable
+
+from sqlalchemy import union
+from sqlmodel import Session, or_, select
+
+from a_logger_setup import LOGGER_NAME
+from models.db_models import ConsentSheet, GroupConsentSheetLink, User, UserGroupLink
+from models.model_utils import session_scope
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+VISIBILITY_TTL_SECONDS = 30.0
+
+_lock = threading.Lock()
+_generation = 0
+_visible: dict[int, tuple[float, frozenset[int]]] = {}
+
+
+def _user_id(user: User | int | None) -> int | None:
+    return user.id if isinstance(user, User) else user
+
+
+def _load_visible(session: Session, user_id: int) -> frozenset[int]:
+    owned = select(ConsentSheet.id).where(ConsentSheet.user_id == user_id)
+    shared_in_groups = (
+        select(GroupConsentSheetLink.consent_sheet_id)
+        .join(UserGroupLink, UserGroupLink.group_id == GroupConsentSheetLink.group_id)
+        .where(UserGroupLink.user_id == user_id)
+    )
+    return frozenset(session.exec(union(owned, shared_in_groups)).scalars())
+
+
+def visible_sheet_ids(user_id: int, session: Session | None = None) -> frozenset[int]:
+    """Return the ids of the sheets ``user_id`` owns or sees through a group."""
+    now = time.monotonic()
+    cached = _visible.get(user_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    generation = _generation
+    if session is not None:
+        sheet_ids = _load_visible(session, user_id)
+    else:
+        with session_scope() as scoped_session:
+            sheet_ids = _load_visible(scoped_session, user_id)
+    with _lock:
+        # an invalidation while loading may have made the result stale
+        if generation == _generation:
+            _visible[user_id] = (now + VISIBILITY_TTL_SECONDS, sheet_ids)
+    return sheet_ids
+
+
+def filter_visible(
+    user: User | int | None, sheet_ids: Iterable[int], session: Session | None = None
+) -> list[int]:
+    """Return the ids of ``sheet_ids`` ``user`` may see, in their given order.
+
+    Without a user only publicly shared sheets are visible.
+    """
+    requested = list(dict.fromkeys(sheet_ids))
+    if not requested:
+        return []
+    user_id = _user_id(user)
+    visible = set(visible_sheet_ids(user_id, session)) if user_id is not None else set()
+    unresolved = [sheet_id for sheet_id in requested if sheet_id not in visible]
+    if unresolved:
+        # public sheets, and own sheets created since the cache was filled
+        condition = ConsentSheet.public_share_id.is_not(None)
+        if user_id is not None:
+            condition = or_(condition, ConsentSheet.user_id == user_id)
+        query = select(ConsentSheet.id).where(
+            ConsentSheet.id.in_(unresolved), condition
+        )
+        if session is not None:
+            visible.update(session.exec(query).all())
+        else:
+            with session_scope() as scoped_session:
+                visible.update(scoped_session.exec(query).all())
+    return [sheet_id for sheet_id in requested if sheet_id in visible]
+
+
+def invalidate_visible_sheets(user_ids: Iterable[int] | None = None) -> None:
+    """Forget the cached sheets of ``user_ids``, or of every user for ``None``.
+
+    Call it after the change is committed, so a concurrent load cannot cache
+    the old state again.
+    """
+    global _generation
+    user_ids = None if user_ids is None else list(user_ids)
+    with _lock:
+        _generation += 1
+        if user_ids is None:
+            _visible.clear()
+        else:
+            for user_id in user_ids:
+                _visible.pop(user_id, None)
+    LOGGER.debug("visible sheets invalidated for %s", user_ids or "all users")
+
+
+def group_member_ids(group_id: int, session: Session) -> list[int]:
+    """Return the ids of the members of ``group_id`` to invalidate later."""
+    return list(
+        session.exec(
+            select(UserGroupLink.user_id).where(UserGroupLink.group_id == group_id)
+        ).all()
+    )
@@ -0,0 +1,176 @@
+"""Shared, immutable snapshot of every consent template and its texts.
+
+The catalog is built with one query and handed to every component as the
+same read-only instance. It carries a version number; writes to templates or
+their texts call :func:`invalidate_template_catalog`, which bumps the version
+so the next :func:`get_template_catalog` call builds a fresh snapshot.
+Snapshots already handed out stay valid and unchanged.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterator, Mapping
+
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from a_logger_setup import LOGGER_NAME
+from models.db_models import ConsentTemplate, LocalizedText
+from models.model_utils import session_scope
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogText:
+    """Read-only copy of a ``LocalizedText`` row in every language."""
+
+    id: int
+    text_en: str | None
+    text_de: str | None
+
+    def get_text(self, lang: str = "") -> str | None:
+        return self.text_de if lang == "de" else self.text_en
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogTemplate:
+    """Read-only copy of a ``ConsentTemplate`` with its resolved texts.
+
+    Attribute names match the ORM model, so it can stand in for a loaded
+    template wherever texts are only read.
+    """
+
+    id: int
+    category_id: int
+    topic_id: int
+    explanation_id: int
+    category_local: CatalogText
+    topic_local: CatalogText
+    explanation_local: CatalogText
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateCatalog:
+    """All templates ordered by id, indexed by id and grouped by category."""
+
+    version: int
+    templates: tuple[CatalogTemplate, ...]
+    by_id: Mapping[int, CatalogTemplate]
+    categories: tuple[int, ...]
+    grouped: Mapping[int, tuple[CatalogTemplate, ...]]
+
+    @classmethod
+    def build(cls, templates: list[CatalogTemplate], version: int) -> "TemplateCatalog":
+        templates = sorted(templates, key=lambda template: template.id)
+        grouped: dict[int, list[CatalogTemplate]] = {}
+        for template in templates:
+            grouped.setdefault(template.category_id, []).append(template)
+        return cls(
+            version=version,
+            templates=tuple(templates),
+            by_id=MappingProxyType({template.id: template for template in templates}),
+            categories=tuple(sorted(grouped)),
+            grouped=MappingProxyType(
+                {category_id: tuple(grouped[category_id]) for category_id in grouped}
+            ),
+        )
+
+    def get(self, template_id: int) -> CatalogTemplate | None:
+        return self.by_id.get(template_id)
+
+    def category_text(self, category_id: int) -> CatalogText:
+        return self.grouped[category_id][0].category_local
+
+    def __contains__(self, template_id: object) -> bool:
+        return template_id in self.by_id
+
+    def __iter__(self) -> Iterator[CatalogTemplate]:
+        return iter(self.templates)
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+
+_lock = threading.Lock()
+_version = 0
+_catalog: TemplateCatalog | None = None
+
+
+def _load_templates(session: Session) -> list[CatalogTemplate]:
+    category = aliased(LocalizedText)
+    topic = aliased(LocalizedText)
+    explanation = aliased(LocalizedText)
+    rows = session.exec(
+        select(
+            ConsentTemplate.id,
+            category.id,
+            category.text_en,
+            category.text_de,
+            topic.id,
+            topic.text_en,
+            topic.text_de,
+            explanation.id,
+            explanation.text_en,
+            explanation.text_de,
+        )
+        .join(category, category.id == ConsentTemplate.category_id)
+        .join(topic, topic.id == ConsentTemplate.topic_id)
+        .join(explanation, explanation.id == ConsentTemplate.explanation_id)
+    ).all()
+    texts: dict[int, CatalogText] = {}
+
+    def _text(text_id: int, text_en: str | None, text_de: str | None) -> CatalogText:
+        # categories are shared by many templates, keep one instance per text
+        if text_id not in texts:
+            texts[text_id] = CatalogText(text_id, text_en, text_de)
+        return texts[text_id]
+
+    return [
+        CatalogTemplate(
+            id=row[0],
+            category_id=row[1],
+            topic_id=row[4],
+            explanation_id=row[7],
+            category_local=_text(*row[1:4]),
+            topic_local=_text(*row[4:7]),
+            explanation_local=_text(*row[7:10]),
+        )
+        for row in rows
+    ]
+
+
+def get_template_catalog(session: Session | None = None) -> TemplateCatalog:
+    """Return the current catalog, building it if templates changed.
+
+    ``session`` is only used when a new snapshot has to be loaded.
+    """
+    global _catalog
+    catalog = _catalog
+    if catalog is not None and catalog.version == _version:
+        return catalog
+    with _lock:
+        if _catalog is not None and _catalog.version == _version:
+            return _catalog
+        version = _version
+        if session is not None:
+            templates = _load_templates(session)
+        else:
+            with session_scope() as scoped_session:
+                templates = _load_templates(scoped_session)
+        _catalog = TemplateCatalog.build(templates, version)
+        LOGGER.debug(
+            "built template catalog v%s with %s templates", version, len(_catalog)
+        )
+        return _catalog
+
+
+def invalidate_template_catalog() -> int:
+    """Mark the current catalog as stale and return the new version."""
+    global _version
+    with _lock:
+        _version += 1
+        LOGGER.debug("template catalog invalidated, now v%s", _version)
+        return _version
@@ -0,0 +1,100 @@
+"""Shared, read-only lookup of localized texts, one snapshot per language.
+
+Each language is loaded once with a single two-column query and then shared
+by every client, so components look up the ids they render instead of each
+holding a copy of every ``LocalizedText`` row. Admin edits call
+:func:`invalidate_text_catalog`; the next lookup reloads the language.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+from sqlmodel import Session, select
+
+from a_logger_setup import LOGGER_NAME
+from models.db_models import LocalizedText
+from models.model_utils import session_scope
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+DEFAULT_LANGUAGE = "en"
+_TEXT_COLUMNS = {"en": LocalizedText.text_en, "de": LocalizedText.text_de}
+
+
+@dataclass(frozen=True, slots=True)
+class LanguageTexts:
+    """Every localized text of one language keyed by ``LocalizedText.id``."""
+
+    language: str
+    version: int
+    texts: Mapping[int, str | None]
+
+    def get(self, text_id: int, default: str | None = None) -> str | None:
+        return self.texts.get(text_id, default)
+
+    def lookup(self, text_ids: Iterable[int]) -> dict[int, str | None]:
+        """Return the texts of ``text_ids``; unknown ids are left out."""
+        return {
+            text_id: self.texts[text_id]
+            for text_id in text_ids
+            if text_id in self.texts
+        }
+
+
+_lock = threading.Lock()
+_version = 0
+_catalogs: dict[str, LanguageTexts] = {}
+
+
+def _language(lang: str | None) -> str:
+    return lang if lang in _TEXT_COLUMNS else DEFAULT_LANGUAGE
+
+
+def _load(session: Session, language: str) -> dict[int, str | None]:
+    return dict(session.exec(select(LocalizedText.id, _TEXT_COLUMNS[language])).all())
+
+
+def get_language_texts(
+    lang: str | None = None, session: Session | None = None
+) -> LanguageTexts:
+    """Return the shared snapshot of ``lang``, loading it if texts changed.
+
+    Unknown languages fall back to English, as ``LocalizedText.get_text`` does.
+    """
+    language = _language(lang)
+    catalog = _catalogs.get(language)
+    if catalog is not None and catalog.version == _version:
+        return catalog
+    with _lock:
+        catalog = _catalogs.get(language)
+        if catalog is not None and catalog.version == _version:
+            return catalog
+        version = _version
+        if session is not None:
+            texts = _load(session, language)
+        else:
+            with session_scope() as scoped_session:
+                texts = _load(scoped_session, language)
+        catalog = LanguageTexts(language, version, MappingProxyType(texts))
+        _catalogs[language] = catalog
+        LOGGER.debug("loaded %s %s texts for v%s", len(texts), language, version)
+        return catalog
+
+
+def lookup_texts(
+    text_ids: Iterable[int], lang: str | None = None
+) -> dict[int, str | None]:
+    """Return just the texts of ``text_ids`` in ``lang``."""
+    return get_language_texts(lang).lookup(text_ids)
+
+
+def invalidate_text_catalog() -> int:
+    """Mark every language snapshot as stale and return the new version."""
+    global _version
+    with _lock:
+        _version += 1
+        LOGGER.debug("text catalog invalidated, now v%s", _version)
+        return _version
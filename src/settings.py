@@ -43,6 +43,16 @@ class Settings:
     otel_exporter_headers: Tuple[Tuple[str, str], ...] = ()
     otel_service_name: str = "rpg_consent_finder"
     otel_metrics_export_interval_ms: int = 60000
+    large_group_member_threshold: int = 50
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size_mb: int = 256
+    sqlite_cache_size_kib: int = 65536
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_pre_ping: bool = True
+    db_pool_recycle_seconds: int = 1800
 
     @property
     def base_url(self) -> str:
@@ -77,4 +87,16 @@ def get_settings() -> Settings:
         otel_metrics_export_interval_ms=int(
             os.getenv("OTEL_METRICS_EXPORT_INTERVAL_MS", "60000")
         ),
+        large_group_member_threshold=int(
+            os.getenv("LARGE_GROUP_MEMBER_THRESHOLD", "50")
+        ),
+        sqlite_journal_mode=os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        sqlite_synchronous=os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        sqlite_busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        sqlite_mmap_size_mb=int(os.getenv("SQLITE_MMAP_SIZE_MB", "256")),
+        sqlite_cache_size_kib=int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536")),
+        db_pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        db_pool_pre_ping=_to_bool(os.getenv("DB_POOL_PRE_PING"), True),
+        db_pool_recycle_seconds=int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800")),
     )
@@ -29,6 +29,9 @@ class MetricsRecorder:
         session_created,
         login_attempts,
         startup_duration,
+        id_allocation_retries,
+        entry_flush_latency,
+        entry_flush_batch_size,
     ) -> None:
         self._request_counter = request_counter
         self._request_duration = request_duration
@@ -36,7 +39,11 @@ class MetricsRecorder:
         self._session_created = session_created
         self._login_attempts = login_attempts
         self._startup_duration = startup_duration
+        self._id_allocation_retries = id_allocation_retries
+        self._entry_flush_latency = entry_flush_latency
+        self._entry_flush_batch_size = entry_flush_batch_size
         self._session_stats_provider: Callable[[], dict[str, int]] | None = None
+        self._pool_stats_provider: Callable[[], dict[str, int]] | None = None
 
     # ----- HTTP metrics -----
     def record_request(
@@ -98,6 +105,27 @@ class MetricsRecorder:
     def record_startup_duration(self, duration_ms: float) -> None:
         self._startup_duration.record(duration_ms)
 
+    # ----- Database metrics -----
+    def record_id_allocation_retry(self, kind: str) -> None:
+        self._id_allocation_retries.add(1, {"kind": kind})
+
+    def record_entry_flush(self, batch_size: int, latency_ms: float) -> None:
+        self._entry_flush_batch_size.record(batch_size)
+        self._entry_flush_latency.record(latency_ms)
+
+    def set_pool_stats_provider(self, provider: Callable[[], dict[str, int]]) -> None:
+        self._pool_stats_provider = provider
+
+    def pool_connections_callback(self, _: CallbackOptions) -> list[Observation]:
+        if not self._pool_stats_provider:
+            return []
+        stats = self._pool_stats_provider() or {}
+        return [
+            Observation(count, {"state": state})
+            for state, count in stats.items()
+            if state != "size"
+        ]
+
 
 def get_metrics_recorder() -> MetricsRecorder | None:
     return metrics_recorder
@@ -181,6 +209,22 @@ def setup_metrics(
         unit="ms",
     )
 
+    id_allocation_retries = meter.create_counter(
+        name="db.id_allocation.retries",
+        description="Generated ids rejected by a unique index and retried.",
+        unit="1",
+    )
+    entry_flush_latency = meter.create_histogram(
+        name="db.entry_flush.latency",
+        description="Time from the first queued entry edit of a sheet to its commit.",
+        unit="ms",
+    )
+    entry_flush_batch_size = meter.create_histogram(
+        name="db.entry_flush.batch_size",
+        description="Entries written per sheet by one buffered flush.",
+        unit="1",
+    )
+
     recorder = MetricsRecorder(
         request_counter=request_counter,
         request_duration=request_duration,
@@ -188,6 +232,9 @@ def setup_metrics(
         session_created=session_created,
         login_attempts=login_attempts,
         startup_duration=startup_duration,
+        id_allocation_retries=id_allocation_retries,
+        entry_flush_latency=entry_flush_latency,
+        entry_flush_batch_size=entry_flush_batch_size,
     )
 
     meter.create_observable_gauge(
@@ -196,6 +243,12 @@ def setup_metrics(
         unit="1",
         callbacks=[recorder.session_active_callback],
     )
+    meter.create_observable_gauge(
+        name="db.pool.connections",
+        description="Pooled database connections by state.",
+        unit="1",
+        callbacks=[recorder.pool_connections_callback],
+    )
 
     LOGGER.info(
         "OpenTelemetry metrics configured: endpoint=%s, service.name=%s, interval_ms=%s",
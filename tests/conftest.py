@@ -16,6 +16,8 @@ from sqlmodel import SQLModel, create_engine
 #     sys.path.insert(0, str(SRC_PATH))
 
 os.environ["DB_CONNECTION_STRING"] = "sqlite://"
+# fail on every relationship that a query did not load explicitly
+os.environ["DB_LAZY_LOAD"] = "raise_on_sql"
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -158,13 +160,14 @@ def test_user():
 def sample_consent_entry(test_user):
     """Fixture providing a sample consent entry for component testing."""
     sheet_controller = importlib.import_module("controller.sheet_controller")
-    from models.db_models import ConsentEntry, ConsentStatus
+    user_controller = importlib.import_module("controller.user_controller")
 
-    # Get or create a sheet for the test user
-    if test_user.consent_sheets:
-        sheet = test_user.consent_sheets[0]
+    # Get or create a sheet for the test user, loaded with its entries
+    if sheets := user_controller.fetch_user_consent_sheets(test_user):
+        sheet_id = sheets[0].id
     else:
-        sheet = sheet_controller.create_new_consentsheet(test_user)
+        sheet_id = sheet_controller.create_new_consentsheet(test_user).id
+    sheet = sheet_controller.get_consent_sheet_by_id(test_user.id_name, sheet_id)
 
     # Get consent entries from the sheet
     if sheet.consent_entries:
@@ -32,10 +32,10 @@ async def test_consent_entry_renders(
     await user.open("/test-consent-entry")
 
     # Check that the toggle element exists
-    await user.should_see(f"toggle_{sample_consent_entry.consent_template.id}")
+    await user.should_see(f"toggle_{sample_consent_entry.consent_template_id}")
 
     # Check that the comment toggle exists
-    await user.should_see(f"comment_toggle_{sample_consent_entry.consent_template.id}")
+    await user.should_see(f"comment_toggle_{sample_consent_entry.consent_template_id}")
 
 
 async def test_consent_entry_toggle_changes(
@@ -55,7 +55,7 @@ async def test_consent_entry_toggle_changes(
 
     # Find the toggle element
     toggle = marked_elements(user, "🟠").get(
-        f"toggle_{sample_consent_entry.consent_template.id}"
+        f"toggle_{sample_consent_entry.consent_template_id}"
     )
 
     toggle.set_value(ConsentStatus.unknown)
@@ -96,31 +96,33 @@ async def test_consent_entry_comment_visibility(
 
     # Comment input should initially be hidden
     comment_toggle = user.find(
-        f"comment_toggle_{sample_consent_entry.consent_template.id}"
+        f"comment_toggle_{sample_consent_entry.consent_template_id}"
     )
 
     # Initially, comment input should not be visible
     await user.should_not_see(
-        f"comment_input_{sample_consent_entry.consent_template.id}"
+        f"comment_input_{sample_consent_entry.consent_template_id}"
     )
     # Toggle to show comment
     comment_toggle.click()
 
     # Now comment input should be visible
-    await user.should_see(f"comment_input_{sample_consent_entry.consent_template.id}")
+    await user.should_see(f"comment_input_{sample_consent_entry.consent_template_id}")
 
 
 async def test_multiple_consent_entries(user: User, component_page, test_user):
     """Test rendering multiple consent entry components."""
     from controller import sheet_controller
-    from models.db_models import ConsentEntry
+    from controller.user_controller import fetch_user_consent_sheets
 
     @component_page("/test-multiple-consents")
     def setup():
         with ui.column().classes("w-full"):
             # Get sheet and entries
-            if test_user.consent_sheets:
-                sheet = test_user.consent_sheets[0]
+            if sheets := fetch_user_consent_sheets(test_user):
+                sheet = sheet_controller.get_consent_sheet_by_id(
+                    test_user.id_name, sheets[0].id
+                )
                 entries = sheet.consent_entries
 
                 # Render multiple components
@@ -4,6 +4,10 @@ from sqlalchemy.pool import StaticPool
 
 
 from models import db_models  # Import models to register them with SQLModel
+from services.group_cache import invalidate_group_cache
+from services.sheet_visibility import invalidate_visible_sheets
+from services.template_catalog import invalidate_template_catalog
+from services.text_catalog import invalidate_text_catalog
 
 
 @pytest.fixture(name="session")
@@ -14,5 +18,10 @@ def session_fixture():
         poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(engine)
+    # every test starts from an empty database
+    invalidate_template_catalog()
+    invalidate_text_catalog()
+    invalidate_visible_sheets()
+    invalidate_group_cache()
     with Session(engine) as session:
         yield session
@@ -0,0 +1,137 @@
+from sqlalchemy import event
+from sqlmodel import select
+
+from models.db_models import (
+    ConsentEntry,
+    ConsentSheet,
+    ConsentStatus,
+    ConsentTemplate,
+    CustomConsentEntry,
+    GroupConsentSheetLink,
+    LocalizedText,
+    PlayFunAnswer,
+    PlayFunResult,
+    RPGGroup,
+    User,
+    UserGroupLink,
+    UserLogin,
+)
+from services.account_service import delete_user_account
+from services.consent_aggregate_service import get_group_consent_overview
+from services.group_cache import get_cached_group
+from services.group_service import (
+    assign_consent_sheet_to_group,
+    create_new_group,
+    join_group,
+)
+from services.sheet_service import SHEET_CONTENT, create_consent_sheets
+from services.sheet_visibility import filter_visible
+
+
+def _setup(session, sheet_count):
+    text = LocalizedText(text_en="topic", text_de="Thema")
+    session.add(text)
+    session.commit()
+    template = ConsentTemplate(
+        category_id=text.id, topic_id=text.id, explanation_id=text.id
+    )
+    leaving = User(id_name="leaving", nickname="Leaving")
+    other = User(id_name="other", nickname="Other")
+    session.add_all([template, leaving, other])
+    session.commit()
+
+    own_group = create_new_group(leaving, session=session)
+    other_group = create_new_group(other, session=session)
+    join_group(own_group.invite_code, other, session=session)
+    join_group(other_group.invite_code, leaving, session=session)
+    sheets = create_consent_sheets(leaving, sheet_count, session=session)
+    shared_sheet = session.get(ConsentSheet, sheets[0].id, options=SHEET_CONTENT)
+    shared_sheet.consent_entries[0].preference = ConsentStatus.no
+    session.add(CustomConsentEntry(consent_sheet_id=shared_sheet.id, content="bugs"))
+    result = PlayFunResult(user_id=leaving.id)
+    session.add_all(
+        [
+            result,
+            UserLogin(user_id=leaving.id, account_name="leaving", password_hash="x"),
+        ]
+    )
+    session.commit()
+    session.add(PlayFunAnswer(result_id=result.id, question_id=1, rating=3))
+    session.commit()
+    assign_consent_sheet_to_group(shared_sheet, other_group, session=session)
+    return leaving, other, template, other_group, own_group
+
+
+def test_delete_account_removes_whole_graph(session):
+    leaving, other, template, other_group, _ = _setup(session, 3)
+    overview = get_group_consent_overview(other_group.id, session=session)
+    assert overview.preference(template.id) == ConsentStatus.no
+
+    report = delete_user_account(leaving.id, session=session)
+
+    assert report.deleted_rows["user"] == 1
+    assert report.deleted_rows["rpggroup"] == 1
+    assert report.deleted_rows["consentsheet"] == 4
+    assert report.deleted_rows["consententry"] == 4
+    assert report.deleted_rows["customconsententry"] == 1
+    assert report.deleted_rows["playfunresult"] == 1
+    assert report.deleted_rows["playfunanswer"] == 1
+    assert report.deleted_rows["userlogin"] == 1
+    for model in (PlayFunAnswer, PlayFunResult, UserLogin, CustomConsentEntry):
+        assert session.exec(select(model)).all() == []
+    assert session.exec(select(User.id)).all() == [other.id]
+    assert session.exec(select(RPGGroup.id)).all() == [other_group.id]
+    assert session.exec(select(UserGroupLink.user_id)).all() == [other.id]
+    remaining_sheets = session.exec(select(ConsentSheet.id)).all()
+    linked_sheets = session.exec(select(GroupConsentSheetLink.consent_sheet_id)).all()
+    assert set(linked_sheets) <= set(remaining_sheets)
+    assert len(session.exec(select(ConsentEntry)).all()) == len(remaining_sheets)
+    overview = get_group_consent_overview(other_group.id, session=session)
+    assert overview.preference(template.id) == ConsentStatus.unknown
+
+
+def test_delete_account_invalidates_group_and_visibility_caches(session):
+    leaving, other, _, other_group, own_group = _setup(session, 1)
+    shared_sheet = session.exec(
+        select(GroupConsentSheetLink.consent_sheet_id)
+        .join(ConsentSheet)
+        .where(
+            GroupConsentSheetLink.group_id == other_group.id,
+            ConsentSheet.user_id == leaving.id,
+        )
+    ).one()
+    leaving_sheets = [own_group.gm_consent_sheet_id, shared_sheet]
+    own_group_id, other_id = own_group.id, other.id
+    assert get_cached_group(own_group_id, session) is not None
+    assert filter_visible(other_id, leaving_sheets, session) == leaving_sheets
+
+    delete_user_account(leaving.id, session=session)
+
+    assert get_cached_group(own_group_id, session) is None
+    assert filter_visible(other_id, leaving_sheets, session) == []
+
+
+def test_delete_account_statement_count_does_not_grow(session):
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    small_user = _setup(session, 1)[0]
+    event.listen(session.get_bind(), "before_cursor_execute", _count)
+    delete_user_account(small_user.id, session=session)
+    small_count = len(statements)
+    statements.clear()
+
+    large_user = User(id_name="large", nickname="Large")
+    session.add(large_user)
+    session.commit()
+    create_consent_sheets(large_user, 25, session=session)
+    create_new_group(large_user, session=session)
+    statements.clear()
+    large_user_id = large_user.id
+    delete_user_account(large_user_id, session=session)
+    event.remove(session.get_bind(), "before_cursor_execute", _count)
+
+    assert len(statements) <= small_count
+    assert delete_user_account(large_user_id, session=session) is None
@@ -0,0 +1,22 @@
+from controller import admin_controller
+from models.db_models import ConsentSheet, RPGGroup, User, UserGroupLink
+from services.group_cache import get_cached_group
+from services.group_service import create_new_group
+from services.sheet_visibility import filter_visible
+
+
+def test_clear_table_invalidates_group_and_visibility_caches(session, monkeypatch):
+    monkeypatch.setattr(admin_controller, "engine", session.get_bind())
+    owner = User(id_name="owner", nickname="Owner")
+    session.add(owner)
+    session.commit()
+    group = create_new_group(owner, session=session)
+    group_id, owner_id, gm_sheet = group.id, owner.id, group.gm_consent_sheet_id
+    assert get_cached_group(group_id, session) is not None
+    assert filter_visible(owner_id, [gm_sheet], session) == [gm_sheet]
+
+    for table in (RPGGroup, UserGroupLink, ConsentSheet):
+        admin_controller.clear_table(table)
+
+    assert get_cached_group(group_id, session) is None
+    assert filter_visible(owner_id, [gm_sheet], session) == []
@@ -0,0 +1,183 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlmodel import select
+
+from models.db_models import (
+    ConsentEntry,
+    ConsentSheet,
+    ConsentStatus,
+    ConsentTemplate,
+    CustomConsentEntry,
+    LocalizedText,
+    User,
+)
+from services.consent_aggregate_service import (
+    get_group_consent_overview,
+    get_preference_buckets,
+    refresh_sheet_custom_aggregates,
+    refresh_sheet_entry_aggregates,
+    status_counts,
+)
+from services.group_service import (
+    assign_consent_sheet_to_group,
+    create_new_group,
+    join_group,
+    leave_group,
+    unassign_consent_sheet_from_group,
+)
+from services.sheet_service import create_consent_sheet
+
+
+def _setup_group(session):
+    text = LocalizedText(text_en="topic", text_de="Thema")
+    session.add(text)
+    session.commit()
+    templates = [
+        ConsentTemplate(category_id=text.id, topic_id=text.id, explanation_id=text.id)
+        for _ in range(2)
+    ]
+    session.add_all(templates)
+    gm = User(id_name="gm", nickname="GM")
+    player = User(id_name="player", nickname="Player")
+    session.add_all([gm, player])
+    session.commit()
+    group = create_new_group(gm, session=session)
+    join_group(group.invite_code, player, session=session)
+    player_sheet = session.get(
+        ConsentSheet, create_consent_sheet(player, session=session).id
+    )
+    return group, templates, player, player_sheet
+
+
+def _set_preference(session, sheet, template, status, comment=""):
+    entry = session.exec(
+        select(ConsentEntry).where(
+            ConsentEntry.consent_sheet_id == sheet.id,
+            ConsentEntry.consent_template_id == template.id,
+        )
+    ).one()
+    entry.preference = status
+    entry.comment = comment
+    session.flush()
+    refresh_sheet_entry_aggregates([sheet.id], [template.id], session)
+    session.commit()
+
+
+def test_group_overview_follows_sheet_assignment(session):
+    group, templates, _, player_sheet = _setup_group(session)
+    _set_preference(session, player_sheet, templates[0], ConsentStatus.no, "hard")
+
+    overview = get_group_consent_overview(group.id, session=session)
+    assert overview.preference(templates[0].id) == ConsentStatus.unknown
+    assert overview.templates[templates[0].id].sheet_count == 1
+
+    assign_consent_sheet_to_group(player_sheet, group, session=session)
+    overview = get_group_consent_overview(group.id, session=session)
+    aggregate = overview.templates[templates[0].id]
+    assert aggregate.preference == ConsentStatus.no
+    assert aggregate.has_hard_limit
+    assert (aggregate.sheet_count, aggregate.no_count) == (2, 1)
+    assert aggregate.comments == "hard"
+
+    unassign_consent_sheet_from_group(player_sheet, group, session=session)
+    overview = get_group_consent_overview(group.id, session=session)
+    assert overview.preference(templates[0].id) == ConsentStatus.unknown
+    assert not overview.templates[templates[0].id].has_hard_limit
+
+
+def test_group_overview_follows_entry_changes_and_leaving(session):
+    group, templates, player, player_sheet = _setup_group(session)
+    assign_consent_sheet_to_group(player_sheet, group, session=session)
+    gm_sheet = session.get(ConsentSheet, group.gm_consent_sheet_id)
+    for sheet in (gm_sheet, player_sheet):
+        _set_preference(session, sheet, templates[1], ConsentStatus.yes)
+    _set_preference(session, player_sheet, templates[1], ConsentStatus.maybe)
+    session.add(
+        CustomConsentEntry(
+            consent_sheet_id=player_sheet.id,
+            content="Spiders",
+            preference=ConsentStatus.okay,
+            comment="",
+        )
+    )
+    session.flush()
+    refresh_sheet_custom_aggregates([player_sheet.id], session)
+    session.commit()
+
+    overview = get_group_consent_overview(group.id, session=session)
+    assert overview.preference(templates[1].id) == ConsentStatus.maybe
+    assert overview.templates[templates[1].id].yes_count == 1
+    assert [
+        (entry.content_key, entry.preference) for entry in overview.custom_entries
+    ] == [("spiders", ConsentStatus.okay)]
+
+    leave_group(group, player, session=session)
+    overview = get_group_consent_overview(group.id, session=session)
+    assert overview.preference(templates[1].id) == ConsentStatus.yes
+    assert overview.custom_entries == []
+
+
+def test_preference_buckets_for_sheets_and_group(session):
+    group, templates, _, player_sheet = _setup_group(session)
+    assign_consent_sheet_to_group(player_sheet, group, session=session)
+    gm_sheet = session.get(ConsentSheet, group.gm_consent_sheet_id)
+    _set_preference(session, gm_sheet, templates[0], ConsentStatus.yes)
+    _set_preference(session, player_sheet, templates[0], ConsentStatus.okay)
+    _set_preference(session, gm_sheet, templates[1], ConsentStatus.no)
+    _set_preference(session, player_sheet, templates[1], ConsentStatus.yes)
+
+    buckets = get_preference_buckets([gm_sheet.id, player_sheet.id], session=session)
+    assert buckets.templates[ConsentStatus.okay] == [templates[0].id]
+    assert buckets.templates[ConsentStatus.no] == [templates[1].id]
+    assert len(buckets) == 2
+    assert list(buckets.templates) == ConsentStatus.ordered()
+
+    group_buckets = get_preference_buckets(group_id=group.id, session=session)
+    assert group_buckets == buckets
+
+    single = get_preference_buckets([player_sheet.id], session=session)
+    assert single.templates[ConsentStatus.yes] == [templates[1].id]
+    assert single.size(ConsentStatus.okay) == 1
+
+
+def test_group_overview_of_a_template_without_aggregate(session):
+    group, templates, _, player_sheet = _setup_group(session)
+    assign_consent_sheet_to_group(player_sheet, group, session=session)
+    added = ConsentTemplate(
+        category_id=templates[0].category_id,
+        topic_id=templates[0].topic_id,
+        explanation_id=templates[0].explanation_id,
+    )
+    session.add(added)
+    session.commit()
+
+    overview = get_group_consent_overview(group.id, session=session)
+
+    assert added.id not in overview.templates
+    aggregate = overview.aggregate(added.id)
+    assert aggregate.preference == ConsentStatus.unknown
+    assert not any(status_counts(aggregate).values())
+    assert overview.aggregate(templates[0].id) is overview.templates[templates[0].id]
+
+
+def test_group_overview_counts_without_comments(session):
+    group, templates, _, player_sheet = _setup_group(session)
+    assign_consent_sheet_to_group(player_sheet, group, session=session)
+    _set_preference(session, player_sheet, templates[0], ConsentStatus.okay, "fine")
+    group_id, template_id = group.id, templates[0].id
+    session.expunge_all()
+
+    overview = get_group_consent_overview(
+        group_id, with_comments=False, session=session
+    )
+
+    aggregate = overview.templates[template_id]
+    assert status_counts(aggregate) == {
+        ConsentStatus.yes: 0,
+        ConsentStatus.okay: 1,
+        ConsentStatus.maybe: 0,
+        ConsentStatus.unknown: 1,
+        ConsentStatus.no: 0,
+    }
+    with pytest.raises(InvalidRequestError):
+        aggregate.comments
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+from models.consent_matrix import MISSING, ConsentMatrix
+from models.db_models import ConsentStatus
+
+
+def _sheet(entries: dict[int, ConsentStatus], custom: dict[str, ConsentStatus] = {}):
+    return SimpleNamespace(
+        consent_entries=[
+            SimpleNamespace(consent_template_id=template_id, preference=status)
+            for template_id, status in entries.items()
+        ],
+        custom_consent_entries=[
+            SimpleNamespace(content=content, preference=status)
+            for content, status in custom.items()
+        ],
+    )
+
+
+def test_status_tables_match_restriction_order():
+    assert ConsentStatus.ordered() == [
+        ConsentStatus.no,
+        ConsentStatus.unknown,
+        ConsentStatus.maybe,
+        ConsentStatus.okay,
+        ConsentStatus.yes,
+    ]
+    assert ConsentStatus.get_consent([]) == ConsentStatus.unknown
+    assert (
+        ConsentStatus.get_consent(s for s in (ConsentStatus.yes, ConsentStatus.maybe))
+        == ConsentStatus.maybe
+    )
+
+
+def test_most_restrictive_per_template_and_per_sheet():
+    sheets = [
+        _sheet({1: ConsentStatus.yes, 2: ConsentStatus.no}),
+        _sheet({1: ConsentStatus.maybe}),
+    ]
+    matrix = ConsentMatrix.from_sheets(sheets, [1, 2, 3])
+
+    assert matrix.ordinals.shape == (2, 3)
+    assert matrix.ordinals[1, 1] == MISSING
+    assert matrix.status_by_key() == {
+        1: ConsentStatus.maybe,
+        2: ConsentStatus.no,
+        3: None,
+    }
+    assert matrix.statuses(axis=1) == [ConsentStatus.no, ConsentStatus.maybe]
+
+
+def test_custom_entries_are_grouped_by_key():
+    sheets = [
+        _sheet({}, {"Spiders": ConsentStatus.okay, "": ConsentStatus.no}),
+        _sheet({}, {"spiders": ConsentStatus.yes}),
+    ]
+    matrix = ConsentMatrix.from_custom_entries(sheets, key=str.lower)
+
+    assert matrix.status_by_key() == {"spiders": ConsentStatus.okay}
+    assert ConsentMatrix.from_custom_entries([]).status_by_key() == {}
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.exc import InvalidRequestError
+from sqlmodel import select
+
+from models.db_models import ConsentEntry, ConsentSheet, User
+from services.sheet_service import SHEET_CONTENT
+
+
+def test_entry_index_follows_entry_changes(session):
+    user = User(id_name="owner", nickname="Owner")
+    session.add(user)
+    session.commit()
+    sheet = ConsentSheet(unique_name="indexed", user_id=user.id)
+    first = ConsentEntry(consent_template_id=1)
+    sheet.consent_entries.append(first)
+    index = sheet.entry_index
+    assert sheet.get_entry(1) is first
+    assert sheet.entry_index is index
+
+    second = ConsentEntry(consent_template_id=2)
+    sheet.consent_entries.append(second)
+    assert sheet.get_entry(2) is second
+    first.consent_template_id = 3
+    assert sheet.get_entry(1) is None
+    assert sheet.get_entry(3) is first
+
+    session.add(sheet)
+    session.commit()
+    session.exec(delete(ConsentEntry).where(ConsentEntry.id == second.id))
+    session.commit()
+    session.refresh(sheet, ["consent_entries"])
+    assert sheet.get_entry(2) is None
+    assert session.exec(select(ConsentEntry.consent_template_id)).all() == [3]
+
+
+def test_relationships_load_only_when_requested(session):
+    user = User(id_name="owner", nickname="Owner")
+    session.add(user)
+    session.commit()
+    sheet = ConsentSheet(unique_name="lazy", user_id=user.id)
+    session.add(sheet)
+    session.commit()
+    sheet_id = sheet.id
+    session.expunge_all()
+
+    sheet = session.get(ConsentSheet, sheet_id)
+    with pytest.raises(InvalidRequestError):
+        sheet.consent_entries
+
+    session.expunge_all()
+    sheet = session.get(ConsentSheet, sheet_id, options=SHEET_CONTENT)
+    assert sheet.consent_entries == []
+    assert sheet.custom_consent_entries == []
+    with pytest.raises(InvalidRequestError):
+        sheet.user
@@ -0,0 +1,232 @@
+import time
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select
+
+from models import model_utils
+from models.db_models import (
+    ConsentEntry,
+    ConsentStatus,
+    ConsentTemplate,
+    LocalizedText,
+    User,
+)
+from services import entry_write_buffer as buffer_module
+from services.entry_write_buffer import EntryWriteBuffer
+from services.sheet_service import ConcurrentUpdateError, create_consent_sheet
+
+
+class _Recorder:
+    def __init__(self):
+        self.flushes = []
+
+    def record_entry_flush(self, batch_size, latency_ms):
+        self.flushes.append((batch_size, latency_ms))
+
+
+def _setup(session, monkeypatch):
+    monkeypatch.setattr(model_utils, "engine", session.get_bind())
+    text = LocalizedText(text_en="topic", text_de="Thema")
+    session.add(text)
+    session.commit()
+    templates = [
+        ConsentTemplate(category_id=text.id, topic_id=text.id, explanation_id=text.id)
+        for _ in range(3)
+    ]
+    owner = User(id_name="owner", nickname="Owner")
+    stranger = User(id_name="stranger", nickname="Stranger")
+    session.add_all([*templates, owner, stranger])
+    session.commit()
+    sheet_id = create_consent_sheet(owner, session=session).id
+    # the buffer gets detached copies, as the UI components hold them
+    return (
+        User(id=owner.id),
+        User(id=stranger.id),
+        sheet_id,
+        [template.id for template in templates],
+    )
+
+
+def _stored(session, sheet_id):
+    session.expire_all()
+    return {
+        entry.consent_template_id: (entry.preference, entry.comment)
+        for entry in session.exec(
+            select(ConsentEntry).where(ConsentEntry.consent_sheet_id == sheet_id)
+        )
+    }
+
+
+def test_edits_are_coalesced_into_one_flush(session, monkeypatch):
+    owner, stranger, sheet_id, (first, second, third) = _setup(session, monkeypatch)
+    recorder = _Recorder()
+    monkeypatch.setattr(buffer_module, "get_metrics_recorder", lambda: recorder)
+    buffer = EntryWriteBuffer(delay_seconds=60)
+
+    for status in (ConsentStatus.yes, ConsentStatus.maybe, ConsentStatus.no):
+        buffer.enqueue(
+            owner,
+            ConsentEntry(
+                consent_sheet_id=sheet_id, consent_template_id=first, preference=status
+            ),
+        )
+    buffer.enqueue(
+        owner,
+        ConsentEntry(
+            consent_sheet_id=sheet_id,
+            consent_template_id=second,
+            comment="only with warning",
+        ),
+    )
+    buffer.enqueue(
+        stranger,
+        ConsentEntry(
+            consent_sheet_id=sheet_id,
+            consent_template_id=third,
+            preference=ConsentStatus.yes,
+        ),
+    )
+    assert buffer.pending_sheet_ids() == [sheet_id]
+
+    [result] = buffer.flush()
+
+    assert result.batch_size == 2
+    assert recorder.flushes == [(2, result.latency_ms)]
+    assert buffer.pending_sheet_ids() == []
+    assert _stored(session, sheet_id) == {
+        first: (ConsentStatus.no, None),
+        second: (ConsentStatus.unknown, "only with warning"),
+        third: (ConsentStatus.unknown, None),
+    }
+
+
+def test_quiet_sheet_is_flushed_after_the_delay(session, monkeypatch):
+    owner, _, sheet_id, templates = _setup(session, monkeypatch)
+    buffer = EntryWriteBuffer(delay_seconds=0.05)
+
+    buffer.enqueue(
+        owner,
+        ConsentEntry(
+            consent_sheet_id=sheet_id,
+            consent_template_id=templates[0],
+            preference=ConsentStatus.okay,
+        ),
+    )
+    for _ in range(100):
+        if not buffer.pending_sheet_ids():
+            break
+        time.sleep(0.02)
+
+    # waits for the timer's flush to commit, nothing is left to write
+    assert buffer.flush() == []
+    assert _stored(session, sheet_id)[templates[0]][0] == ConsentStatus.okay
+
+
+def test_edit_of_an_entry_changed_elsewhere_is_dropped(session, monkeypatch):
+    owner, _, sheet_id, (first, second, _) = _setup(session, monkeypatch)
+    buffer = EntryWriteBuffer(delay_seconds=60)
+    # both tabs loaded the entries at version 0
+    this_tab, other_tab = (
+        ConsentEntry(consent_sheet_id=sheet_id, consent_template_id=first)
+        for _ in range(2)
+    )
+    other_tab.preference = ConsentStatus.no
+    buffer.enqueue(owner, other_tab)
+    buffer.flush()
+
+    this_tab.preference = ConsentStatus.yes
+    reported = []
+    buffer.enqueue(owner, this_tab, reported.append)
+    buffer.enqueue(
+        owner,
+        ConsentEntry(
+            consent_sheet_id=sheet_id,
+            consent_template_id=second,
+            preference=ConsentStatus.maybe,
+        ),
+    )
+    [result] = buffer.flush()
+
+    assert (result.batch_size, result.conflicts) == (1, (first,))
+    assert (other_tab.version, this_tab.version) == (1, 0)
+    stored = _stored(session, sheet_id)
+    assert stored[first][0] == ConsentStatus.no
+    assert stored[second][0] == ConsentStatus.maybe
+    [error] = reported
+    assert isinstance(error, ConcurrentUpdateError)
+
+
+def test_edits_of_a_failed_flush_are_kept_and_retried(session, monkeypatch):
+    owner, _, sheet_id, (first, second, _) = _setup(session, monkeypatch)
+    buffer = EntryWriteBuffer(delay_seconds=60)
+    write = buffer_module._write
+
+    def _locked(*args):
+        raise OperationalError("UPDATE", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(buffer_module, "_write", _locked)
+    for template_id, status in ((first, ConsentStatus.yes), (second, ConsentStatus.no)):
+        buffer.enqueue(
+            owner,
+            ConsentEntry(
+                consent_sheet_id=sheet_id,
+                consent_template_id=template_id,
+                preference=status,
+            ),
+        )
+    with pytest.raises(OperationalError):
+        buffer.flush()
+    assert buffer.pending_sheet_ids() == [sheet_id]
+
+    monkeypatch.setattr(buffer_module, "_write", write)
+    buffer.delay_seconds = 0.05
+    buffer.enqueue(
+        owner,
+        ConsentEntry(
+            consent_sheet_id=sheet_id,
+            consent_template_id=first,
+            preference=ConsentStatus.maybe,
+        ),
+    )
+    for _ in range(100):
+        if not buffer.pending_sheet_ids():
+            break
+        time.sleep(0.02)
+
+    assert buffer.flush() == []
+    stored = _stored(session, sheet_id)
+    assert stored[first][0] == ConsentStatus.maybe
+    assert stored[second][0] == ConsentStatus.no
+
+
+def test_edits_of_a_failing_flush_are_dropped_and_reported(session, monkeypatch):
+    owner, _, sheet_id, (first, _, _) = _setup(session, monkeypatch)
+    buffer = EntryWriteBuffer(delay_seconds=60)
+
+    def _broken(*args):
+        raise OperationalError("UPDATE", {}, Exception("constraint failed"))
+
+    monkeypatch.setattr(buffer_module, "_write", _broken)
+    reported = []
+    buffer.enqueue(
+        owner,
+        ConsentEntry(
+            consent_sheet_id=sheet_id,
+            consent_template_id=first,
+            preference=ConsentStatus.yes,
+        ),
+        reported.append,
+    )
+    for _ in range(buffer_module.ENTRY_FLUSH_MAX_ATTEMPTS - 1):
+        with pytest.raises(OperationalError):
+            buffer.flush()
+        assert buffer.pending_sheet_ids() == [sheet_id]
+    assert reported == []
+
+    with pytest.raises(OperationalError):
+        buffer.flush()
+
+    assert buffer.pending_sheet_ids() == []
+    [error] = reported
+    assert isinstance(error, OperationalError)
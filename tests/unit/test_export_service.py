@@ -0,0 +1,109 @@
+import json
+
+from models import model_utils
+from models.db_models import (
+    ConsentSheet,
+    ConsentStatus,
+    ConsentTemplate,
+    CustomConsentEntry,
+    LocalizedText,
+    User,
+)
+from services.export_service import export_url, iter_sheets_export
+from services.sheet_service import SHEET_CONTENT, create_consent_sheets
+
+
+def _setup_sheets(session):
+    text = LocalizedText(text_en="topic", text_de="Thema")
+    session.add(text)
+    session.commit()
+    templates = [
+        ConsentTemplate(category_id=text.id, topic_id=text.id, explanation_id=text.id)
+        for _ in range(2)
+    ]
+    user = User(id_name="player", nickname="Player")
+    session.add_all([*templates, user])
+    session.commit()
+    sheets = [
+        session.get(ConsentSheet, created.id, options=SHEET_CONTENT)
+        for created in create_consent_sheets(user, 2, session=session)
+    ]
+    return templates, sheets
+
+
+def test_export_merges_entries_of_all_sheets(session, monkeypatch):
+    monkeypatch.setattr(model_utils, "engine", session.get_bind())
+    templates, (first, second) = _setup_sheets(session)
+    first.consent_entries_dict[templates[0].id].preference = ConsentStatus.yes
+    first.consent_entries_dict[templates[0].id].comment = "fine"
+    second.consent_entries_dict[templates[0].id].preference = ConsentStatus.no
+    second.consent_entries_dict[templates[0].id].comment = "never"
+    session.add_all(
+        [
+            CustomConsentEntry(
+                consent_sheet_id=first.id, content="bugs", preference=ConsentStatus.okay
+            ),
+            CustomConsentEntry(
+                consent_sheet_id=second.id,
+                content="Bugs",
+                preference=ConsentStatus.maybe,
+            ),
+            CustomConsentEntry(
+                consent_sheet_id=second.id, content="ants", comment="only here"
+            ),
+        ]
+    )
+    session.commit()
+    expected_comment = "; ".join(
+        sheet.comment for sheet in (first, second) if sheet.comment
+    )
+
+    exported = json.loads("".join(iter_sheets_export([second.id, first.id])))
+
+    assert exported["unique_name"] == "export_of_multiple_sheets"
+    assert exported["comment"] == expected_comment
+    assert exported["consent_entries"] == [
+        {
+            "consent_template_id": templates[0].id,
+            "preference": "no",
+            "comment": "fine; never",
+        },
+        {
+            "consent_template_id": templates[1].id,
+            "preference": "unknown",
+            "comment": None,
+        },
+    ]
+    assert exported["custom_consent_entries"] == [
+        {"content": "ants", "preference": "unknown", "comment": "only here"},
+        {"content": "bugs", "preference": "maybe", "comment": None},
+    ]
+
+
+def test_export_of_one_sheet_keeps_custom_entries_differing_in_case(
+    session, monkeypatch
+):
+    monkeypatch.setattr(model_utils, "engine", session.get_bind())
+    _, (sheet, _) = _setup_sheets(session)
+    session.add_all(
+        CustomConsentEntry(consent_sheet_id=sheet.id, content=content)
+        for content in ("spiders", "Spiders")
+    )
+    session.commit()
+
+    exported = json.loads("".join(iter_sheets_export([sheet.id])))
+
+    assert [entry["content"] for entry in exported["custom_consent_entries"]] == [
+        "Spiders",
+        "spiders",
+    ]
+
+
+def test_export_of_unknown_sheets_is_empty(session, monkeypatch):
+    monkeypatch.setattr(model_utils, "engine", session.get_bind())
+
+    assert list(iter_sheets_export([404])) == []
+
+
+def test_export_url_lists_every_sheet():
+    assert export_url([1, 2]) == "/api/export?sheet_id=1&sheet_id=2"
@@ -1,11 +1,27 @@
-from models.db_models import User, RPGGroup
+import pytest
+from sqlalchemy import update
+
+from models.db_models import ConsentSheet, User, RPGGroup
+from services import group_service
 from services.group_service import (
+    RosterEntry,
+    assign_consent_sheet_to_group,
+    count_group_members,
+    count_group_sheets,
     create_new_group,
+    fetch_group_member_page,
+    fetch_group_roster,
+    fetch_group_sheet_ids,
     join_group,
     leave_group,
     fetch_group_users,
-    get_group_by_id
+    get_group_by_id,
+    get_group_by_name_id,
+    is_large_group,
+    update_group,
 )
+from services.sheet_service import create_consent_sheet
+from settings import Settings
 
 def test_create_new_group(session):
     user = User(id_name="test", nickname="Test User")
@@ -41,6 +57,10 @@ def test_join_and_leave_group(session):
     assert joined_group is not None
     assert joined_group.id == group.id
     
+    # Joining again keeps the one membership
+    assert join_group(group.invite_code, player, session=session).id == group.id
+    assert join_group("no-such-code", player, session=session) is None
+
     # Check membership
     members = fetch_group_users(group, session=session)
     assert len(members) == 2
@@ -55,3 +75,88 @@ def test_join_and_leave_group(session):
     members = fetch_group_users(group, session=session)
     assert len(members) == 1
     assert members[0].id == gm.id
+
+
+def test_group_lookup_is_cached_until_the_group_changes(session):
+    gm = User(id_name="gm", nickname="GM")
+    session.add(gm)
+    session.commit()
+    group_id = create_new_group(gm, session=session).id
+
+    first = get_group_by_name_id(f"gm-group-{group_id}", session=session)
+    # a write that bypasses the service is not seen
+    session.exec(update(RPGGroup).values(name="renamed"))
+    session.commit()
+    second = get_group_by_name_id(f"gm-group-{group_id}", session=session)
+
+    assert first is not second
+    assert (first.id, first.gm_user_id) == (group_id, gm.id)
+
+    second.name = "Renamed Group"
+    update_group(second, session=session)
+
+    renamed = get_group_by_name_id(f"renamed-group-{group_id}", session=session)
+    assert renamed.id == group_id
+    with pytest.raises(ValueError):
+        get_group_by_name_id(f"gm-group-{group_id}", session=session)
+    with pytest.raises(ValueError):
+        get_group_by_name_id(f"gm-group-{group_id + 1}", session=session)
+
+
+def test_large_group_is_read_in_pages_and_counts(session, monkeypatch):
+    monkeypatch.setattr(
+        group_service,
+        "get_settings",
+        lambda: Settings(large_group_member_threshold=2),
+    )
+    gm = User(id_name="gm", nickname="GM")
+    players = [
+        User(id_name=f"p{index}", nickname=f"Player {index}") for index in range(3)
+    ]
+    session.add_all([gm, *players])
+    session.commit()
+    group = create_new_group(gm, session=session)
+    for player in players:
+        join_group(group.invite_code, player, session=session)
+
+    member_count = count_group_members(group, session=session)
+    first_page = fetch_group_member_page(group, 1, page_size=3, session=session)
+    second_page = fetch_group_member_page(group, 2, page_size=3, session=session)
+
+    assert member_count == 4
+    assert is_large_group(member_count) and not is_large_group(2)
+    assert [member.nickname for member in first_page + second_page] == [
+        "GM",
+        "Player 0",
+        "Player 1",
+        "Player 2",
+    ]
+    assert count_group_sheets(group, session=session) == 1
+    assert fetch_group_sheet_ids(group, gm.id, session=session) == [
+        group.gm_consent_sheet_id
+    ]
+    assert fetch_group_sheet_ids(group, players[0].id, session=session) == []
+
+
+def test_group_roster_marks_gm_and_shared_sheets(session):
+    gm = User(id_name="gm", nickname="GM")
+    sharing = User(id_name="sharing", nickname="Alice")
+    missing = User(id_name="missing", nickname="Bob")
+    session.add_all([gm, sharing, missing])
+    session.commit()
+    group = create_new_group(gm, session=session)
+    join_group(group.invite_code, sharing, session=session)
+    join_group(group.invite_code, missing, session=session)
+    for _ in range(2):
+        created = create_consent_sheet(sharing, session=session)
+        sheet = session.get(ConsentSheet, created.id)
+        assign_consent_sheet_to_group(sheet, group, session=session)
+    create_consent_sheet(missing, session=session)
+
+    roster = fetch_group_roster(group, session=session)
+
+    assert roster == [
+        RosterEntry(sharing.id, "Alice", False, True),
+        RosterEntry(missing.id, "Bob", False, False),
+        RosterEntry(gm.id, "GM", True, True),
+    ]
@@ -0,0 +1,50 @@
+import pytest
+
+from models.db_models import ConsentSheet, User
+from services.id_allocator import IdAllocationError, allocate_unique_id, generate_id
+from services.sheet_service import create_consent_sheet
+
+
+def test_generate_id_is_alphanumeric():
+    share_id = generate_id()
+    assert len(share_id) == 12
+    assert share_id.isalnum()
+
+
+def test_collision_is_retried_inside_the_transaction(session):
+    user = User(id_name="ids", nickname="Ids")
+    session.add(user)
+    session.commit()
+    names = iter(["taken", "taken", "fresh"])
+
+    first = create_consent_sheet(
+        user, session=session, unique_name_factory=lambda _: "taken"
+    )
+    second = create_consent_sheet(
+        user, session=session, unique_name_factory=lambda _: next(names)
+    )
+
+    assert first.unique_name == "taken"
+    assert second.unique_name == "fresh"
+    session.refresh(user, ["consent_sheets"])
+    assert len(user.consent_sheets) == 2
+
+
+def test_allocation_gives_up_after_max_attempts(session):
+    user = User(id_name="full", nickname="Full")
+    session.add(user)
+    session.commit()
+    session.add(ConsentSheet(unique_name="dup", user_id=user.id))
+    session.commit()
+
+    def _insert(unique_name: str) -> None:
+        session.add(ConsentSheet(unique_name=unique_name, user_id=user.id))
+        session.flush()
+
+    with pytest.raises(IdAllocationError):
+        allocate_unique_id(
+            session, _insert, kind="test", generate=lambda: "dup", max_attempts=3
+        )
+    # the surrounding transaction is still usable
+    session.add(ConsentSheet(unique_name="other", user_id=user.id))
+    session.commit()
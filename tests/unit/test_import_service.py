@@ -0,0 +1,107 @@
+import io
+import json
+import zipfile
+
+import pytest
+from sqlmodel import select
+
+from models.db_models import (
+    ConsentEntry,
+    ConsentSheet,
+    ConsentStatus,
+    ConsentTemplate,
+    CustomConsentEntry,
+    LocalizedText,
+    User,
+)
+from services.import_service import SheetImportError, import_sheets
+from services.sheet_service import SHEET_CONTENT
+
+
+def _setup(session):
+    text = LocalizedText(text_en="topic", text_de="Thema")
+    session.add(text)
+    session.commit()
+    templates = [
+        ConsentTemplate(category_id=text.id, topic_id=text.id, explanation_id=text.id)
+        for _ in range(3)
+    ]
+    user = User(id_name="player", nickname="Player")
+    session.add_all([*templates, user])
+    session.commit()
+    return [template.id for template in templates], user
+
+
+def _export(template_id, name="Imported"):
+    return {
+        "human_name": name,
+        "comment": "from elsewhere",
+        "consent_entries": [
+            {"consent_template_id": template_id, "preference": "no", "comment": "x"}
+        ],
+        "custom_consent_entries": [{"content": "bugs", "preference": "maybe"}],
+    }
+
+
+def test_import_single_sheet_completes_missing_templates(session):
+    template_ids, user = _setup(session)
+
+    [sheet_id] = import_sheets(
+        json.dumps(_export(template_ids[0])), user, session=session
+    )
+
+    sheet = session.get(ConsentSheet, sheet_id, options=SHEET_CONTENT)
+    assert sheet.human_name == "Imported"
+    assert {
+        entry.consent_template_id: entry.preference for entry in sheet.consent_entries
+    } == {
+        template_ids[0]: ConsentStatus.no,
+        template_ids[1]: ConsentStatus.unknown,
+        template_ids[2]: ConsentStatus.unknown,
+    }
+    assert [entry.content for entry in sheet.custom_consent_entries] == ["bugs"]
+
+
+def test_import_array_and_zip_archive(session):
+    template_ids, user = _setup(session)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zipped:
+        zipped.writestr("a.json", json.dumps(_export(template_ids[0], "a")))
+        zipped.writestr(
+            "b.json",
+            json.dumps([_export(template_ids[1], "b"), _export(template_ids[2], "c")]),
+        )
+        zipped.writestr("readme.txt", "ignored")
+
+    sheet_ids = import_sheets(archive.getvalue(), user, session=session)
+
+    names = [session.get(ConsentSheet, sheet_id).human_name for sheet_id in sheet_ids]
+    assert names == ["a", "b", "c"]
+    assert len(session.exec(select(CustomConsentEntry)).all()) == 3
+
+
+@pytest.mark.parametrize(
+    "entries",
+    [
+        [{"consent_template_id": 999, "preference": "no"}],
+        [
+            {"consent_template_id": "TEMPLATE", "preference": "no"},
+            {"consent_template_id": "TEMPLATE", "preference": "yes"},
+        ],
+        [{"consent_template_id": "TEMPLATE", "preference": "never"}],
+    ],
+    ids=["unknown template", "duplicate template", "invalid preference"],
+)
+def test_invalid_sheet_rolls_back_whole_import(session, entries):
+    template_ids, user = _setup(session)
+    for entry in entries:
+        if entry["consent_template_id"] == "TEMPLATE":
+            entry["consent_template_id"] = template_ids[0]
+    payload = json.dumps([_export(template_ids[0]), {"consent_entries": entries}])
+
+    with pytest.raises(SheetImportError):
+        import_sheets(payload, user, session=session)
+    session.rollback()
+
+    assert session.exec(select(ConsentSheet)).all() == []
+    assert session.exec(select(ConsentEntry)).all() == []
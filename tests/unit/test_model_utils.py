@@ -0,0 +1,42 @@
+from models.model_utils import create_db_engine, engine_options, pool_stats
+from settings import Settings
+
+
+def _pragma(connection, name: str):
+    return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_sqlite_connections_use_configured_pragmas(tmp_path):
+    settings = Settings(sqlite_busy_timeout_ms=1234, sqlite_cache_size_kib=2048)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'db.sqlite'}", settings)
+
+    with engine.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "synchronous") == 1  # NORMAL
+        assert _pragma(connection, "busy_timeout") == 1234
+        assert _pragma(connection, "cache_size") == -2048
+        assert _pragma(connection, "mmap_size") == 256 * 1024 * 1024
+        assert pool_stats(engine)["checked_out"] == 1
+    assert pool_stats(engine)["checked_out"] == 0
+    engine.dispose()
+
+
+def test_in_memory_sqlite_keeps_its_journal():
+    engine = create_db_engine("sqlite://", Settings())
+
+    with engine.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "memory"
+        assert _pragma(connection, "busy_timeout") == 5000
+    assert pool_stats(engine) == {}
+
+
+def test_server_databases_get_a_tuned_pool():
+    settings = Settings(db_pool_size=20, db_max_overflow=5, db_pool_recycle_seconds=60)
+
+    assert engine_options("postgresql://user:secret@db/consent", settings) == {
+        "pool_size": 20,
+        "max_overflow": 5,
+        "pool_pre_ping": True,
+        "pool_recycle": 60,
+    }
+    assert engine_options("sqlite:///db/database.sqlite", settings) == {}
@@ -0,0 +1,127 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from controller.playfun_controller import update_playfun_answer
+from models.db_models import (
+    ConsentSheet,
+    ConsentStatus,
+    ConsentTemplate,
+    LocalizedText,
+    PlayFunQuestion,
+    PlayFunResult,
+    User,
+)
+from services.account_service import delete_user_account
+from services.consent_aggregate_service import get_group_consent_overview
+from services.group_service import (
+    assign_consent_sheet_to_group,
+    count_group_members,
+    count_group_sheets,
+    create_new_group,
+    fetch_group_member_page,
+    fetch_group_roster,
+    fetch_group_sheet_ids,
+    join_group,
+    leave_group,
+)
+from services.sheet_service import create_consent_sheet, update_entry_if_current
+from services.sheet_visibility import filter_visible
+
+# tables that grow with the number of users and must never be scanned
+INDEXED_TABLES = (
+    "consententry",
+    "consentsheet",
+    "customconsententry",
+    "groupconsentsheetlink",
+    "usergrouplink",
+    "userlogin",
+    "playfunanswer",
+)
+
+
+def _record_statements(session):
+    statements = {}
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.setdefault(statement, parameters)
+
+    event.listen(session.get_bind(), "before_cursor_execute", _record)
+    return statements
+
+
+def _scans(session, statement, parameters) -> list[str]:
+    plan = session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", parameters
+    )
+    return [
+        detail
+        for *_, detail in plan
+        if detail.startswith("SCAN ") and detail.split()[1] in INDEXED_TABLES
+    ]
+
+
+@pytest.fixture
+def players(session):
+    text = LocalizedText(text_en="text")
+    session.add(text)
+    session.commit()
+    session.add_all(
+        ConsentTemplate(category_id=text.id, topic_id=text.id, explanation_id=text.id)
+        for _ in range(3)
+    )
+    gm = User(id_name="gm", nickname="GM")
+    player = User(id_name="player", nickname="Player")
+    session.add_all([gm, player])
+    session.commit()
+    return gm, player
+
+
+def test_service_queries_use_indexes(session, players):
+    gm, player = players
+    question_text = LocalizedText(text_en="question")
+    session.add(question_text)
+    session.commit()
+    question = PlayFunQuestion(question_id=question_text.id, play_style="Challenge")
+    result = PlayFunResult(user_id=player.id)
+    session.add_all([question, result])
+    session.commit()
+    statements = _record_statements(session)
+
+    group = create_new_group(gm, session=session)
+    join_group(group.invite_code, player, session=session)
+    sheet_id = create_consent_sheet(player, session=session).id
+    sheet = session.get(ConsentSheet, sheet_id)
+    assign_consent_sheet_to_group(sheet, group, session=session)
+    fetch_group_roster(group, session=session)
+    fetch_group_sheet_ids(group, player.id, session=session)
+    count_group_members(group, session=session)
+    count_group_sheets(group, session=session)
+    fetch_group_member_page(group, session=session)
+    filter_visible(player.id, [sheet_id, group.gm_consent_sheet_id], session=session)
+    get_group_consent_overview(group.id, session=session)
+    template_id = session.get(ConsentTemplate, 1).id
+    update_entry_if_current(
+        session,
+        sheet_id,
+        template_id,
+        ConsentStatus.yes,
+        None,
+        0,
+        datetime.now(),
+        owner_id=player.id,
+    )
+    update_playfun_answer(question, 4, result, session=session)
+    leave_group(group, player, session=session)
+    delete_user_account(player.id, session=session)
+
+    assert statements
+    scans = {
+        statement: found
+        for statement, parameters in list(statements.items())
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE"))
+        and (found := _scans(session, statement, parameters))
+    }
+    assert scans == {}
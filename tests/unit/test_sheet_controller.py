@@ -0,0 +1,97 @@
+from sqlmodel import select
+
+from controller import sheet_controller
+from models.db_models import (
+    ConsentEntry,
+    ConsentSheet,
+    ConsentStatus,
+    ConsentTemplate,
+    CustomConsentEntry,
+    LocalizedText,
+    User,
+)
+from services.sheet_service import SHEET_CONTENT, create_consent_sheet
+
+
+def test_duplicate_sheet_copies_all_entries(session, monkeypatch):
+    monkeypatch.setattr(sheet_controller, "engine", session.get_bind())
+    text = LocalizedText(text_en="topic", text_de="Thema")
+    session.add(text)
+    session.commit()
+    session.add_all(
+        ConsentTemplate(category_id=text.id, topic_id=text.id, explanation_id=text.id)
+        for _ in range(3)
+    )
+    owner = User(id_name="owner", nickname="Owner")
+    copier = User(id_name="copier", nickname="Copier")
+    session.add_all([owner, copier])
+    session.commit()
+    blueprint = session.get(
+        ConsentSheet,
+        create_consent_sheet(owner, session=session).id,
+        options=SHEET_CONTENT,
+    )
+    blueprint.human_name = "Campaign"
+    blueprint.comment = "be nice"
+    blueprint.consent_entries[0].preference = ConsentStatus.no
+    blueprint.consent_entries[0].comment = "never"
+    session.add(
+        CustomConsentEntry(
+            consent_sheet_id=blueprint.id,
+            content="Spiders",
+            preference=ConsentStatus.maybe,
+        )
+    )
+    session.commit()
+
+    copy_id = sheet_controller.duplicate_sheet(blueprint.id, copier.id)
+
+    copy = session.get(ConsentSheet, copy_id)
+    assert copy.user_id == copier.id
+    assert copy.human_name == "Copy of Campaign"
+    assert copy.comment == "be nice"
+    assert copy.unique_name != blueprint.unique_name
+
+    def _entries(model, sheet_id, *columns):
+        return sorted(
+            session.exec(
+                select(*columns).where(model.consent_sheet_id == sheet_id)
+            ).all()
+        )
+
+    entry_columns = (
+        ConsentEntry.consent_template_id,
+        ConsentEntry.preference,
+        ConsentEntry.comment,
+    )
+    assert _entries(ConsentEntry, copy_id, *entry_columns) == _entries(
+        ConsentEntry, blueprint.id, *entry_columns
+    )
+    assert _entries(
+        CustomConsentEntry,
+        copy_id,
+        CustomConsentEntry.content,
+        CustomConsentEntry.preference,
+    ) == [("Spiders", ConsentStatus.maybe)]
+    assert sheet_controller.duplicate_sheet(-1, copier.id) is None
+
+
+def test_delete_sheet_removes_all_entries(session):
+    text = LocalizedText(text_en="topic", text_de="Thema")
+    session.add(text)
+    session.commit()
+    session.add(
+        ConsentTemplate(category_id=text.id, topic_id=text.id, explanation_id=text.id)
+    )
+    owner = User(id_name="owner", nickname="Owner")
+    session.add(owner)
+    session.commit()
+    sheet_id = create_consent_sheet(owner, session=session).id
+    session.add(CustomConsentEntry(consent_sheet_id=sheet_id, content="Spiders"))
+    session.commit()
+
+    sheet_controller.delete_sheet(owner, session.get(ConsentSheet, sheet_id), session)
+
+    assert session.get(ConsentSheet, sheet_id) is None
+    for model in (ConsentEntry, CustomConsentEntry):
+        assert session.exec(select(model)).all() == []
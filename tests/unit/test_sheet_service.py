@@ -0,0 +1,226 @@
+import pytest
+from sqlmodel import delete, select
+
+from models.db_models import (
+    ConsentEntry,
+    ConsentSheet,
+    ConsentStatus,
+    ConsentTemplate,
+    CustomConsentEntry,
+    LocalizedText,
+    User,
+)
+from services import sheet_service
+from services.sheet_service import (
+    SHEET_CONTENT,
+    ConcurrentUpdateError,
+    backfill_consent_entries,
+    create_consent_sheet,
+    create_consent_sheets,
+    current_template_version,
+    set_category_preference,
+    update_sheet_details,
+)
+
+
+def _add_templates(session, count: int) -> list[ConsentTemplate]:
+    text = LocalizedText(text_en="topic", text_de="Thema")
+    session.add(text)
+    session.commit()
+    templates = [
+        ConsentTemplate(category_id=text.id, topic_id=text.id, explanation_id=text.id)
+        for _ in range(count)
+    ]
+    session.add_all(templates)
+    session.commit()
+    return templates
+
+
+def _entry_template_ids(session, sheet: ConsentSheet) -> list[int]:
+    return sorted(
+        session.exec(
+            select(ConsentEntry.consent_template_id).where(
+                ConsentEntry.consent_sheet_id == sheet.id
+            )
+        ).all()
+    )
+
+
+def test_create_consent_sheet_is_stamped(session):
+    user = User(id_name="stamped", nickname="Stamped")
+    session.add(user)
+    session.commit()
+    templates = _add_templates(session, 3)
+
+    sheet = session.get(ConsentSheet, create_consent_sheet(user, session=session).id)
+
+    assert sheet.template_version == current_template_version(session)
+    assert _entry_template_ids(session, sheet) == [t.id for t in templates]
+    assert backfill_consent_entries([sheet], session=session) is False
+
+
+def test_backfill_completes_stale_sheets(session, monkeypatch):
+    user = User(id_name="stale", nickname="Stale")
+    session.add(user)
+    session.commit()
+    templates = _add_templates(session, 2)
+    sheet = session.get(ConsentSheet, create_consent_sheet(user, session=session).id)
+    other = ConsentSheet(unique_name="legacy", user_id=user.id)
+    session.add(other)
+    session.commit()
+
+    templates += _add_templates(session, 2)
+    refreshed = []
+    refresh = sheet_service.refresh_sheet_entry_aggregates
+
+    def _refresh(sheet_ids, template_ids, session):
+        refreshed.append(set(template_ids))
+        refresh(sheet_ids, template_ids, session)
+
+    monkeypatch.setattr(sheet_service, "refresh_sheet_entry_aggregates", _refresh)
+    assert backfill_consent_entries([sheet], session=session) is True
+    assert refreshed == [{t.id for t in templates[2:]}]
+    assert backfill_consent_entries([sheet, other], session=session) is True
+    assert refreshed[1] == {t.id for t in templates}
+
+    expected = [t.id for t in templates]
+    assert _entry_template_ids(session, sheet) == expected
+    assert _entry_template_ids(session, other) == expected
+    session.refresh(sheet)
+    session.refresh(other)
+    assert sheet.template_version == other.template_version == templates[-1].id
+    assert backfill_consent_entries([sheet, other], session=session) is False
+
+
+def test_create_consent_sheets_in_bulk(session):
+    user = User(id_name="bulk", nickname="Bulk")
+    session.add(user)
+    session.commit()
+    templates = _add_templates(session, 3)
+
+    created = create_consent_sheets(user, 4, session=session)
+
+    assert len({sheet.unique_name for sheet in created}) == 4
+    assert all(sheet.user_id == user.id for sheet in created)
+    for projection in created:
+        sheet = session.get(ConsentSheet, projection.id, options=SHEET_CONTENT)
+        assert sheet.template_version == templates[-1].id
+        assert _entry_template_ids(session, sheet) == [t.id for t in templates]
+        assert {entry.preference for entry in sheet.consent_entries} == {
+            ConsentStatus.unknown
+        }
+
+
+def test_reused_sheet_id_drops_entries_left_behind(session):
+    user = User(id_name="reused", nickname="Reused")
+    session.add(user)
+    session.commit()
+    templates = _add_templates(session, 2)
+    old_id = create_consent_sheet(user, session=session).id
+    old_entry = session.exec(
+        select(ConsentEntry).where(ConsentEntry.consent_sheet_id == old_id)
+    ).first()
+    old_entry.preference = ConsentStatus.no
+    session.add(CustomConsentEntry(consent_sheet_id=old_id, content="spiders"))
+    # only the sheet row goes, as after a half applied delete
+    session.exec(delete(ConsentSheet).where(ConsentSheet.id == old_id))
+    session.commit()
+    session.expunge(old_entry)
+
+    sheet = session.get(
+        ConsentSheet,
+        create_consent_sheet(user, session=session).id,
+        options=SHEET_CONTENT,
+    )
+
+    assert sheet.id == old_id
+    assert _entry_template_ids(session, sheet) == [t.id for t in templates]
+    assert {entry.preference for entry in sheet.consent_entries} == {
+        ConsentStatus.unknown
+    }
+    assert sheet.custom_consent_entries == []
+
+
+def test_set_category_preference_updates_only_unknown_entries(session):
+    horror, violence = (
+        LocalizedText(text_en="Horror", text_de="Horror"),
+        LocalizedText(text_en="Violence", text_de="Gewalt"),
+    )
+    session.add_all([horror, violence])
+    session.commit()
+    templates = [
+        ConsentTemplate(
+            category_id=category.id, topic_id=horror.id, explanation_id=horror.id
+        )
+        for category in (horror, horror, horror, violence)
+    ]
+    user = User(id_name="owner", nickname="Owner")
+    session.add_all([*templates, user])
+    session.commit()
+    sheet = session.get(
+        ConsentSheet,
+        create_consent_sheet(user, session=session).id,
+        options=SHEET_CONTENT,
+    )
+    other_sheet_id = create_consent_sheet(user, session=session).id
+    sheet.get_entry(templates[0].id).preference = ConsentStatus.no
+    session.commit()
+
+    changed = set_category_preference(
+        sheet.id, horror.id, ConsentStatus.maybe, session=session
+    )
+
+    assert sorted(changed) == [templates[1].id, templates[2].id]
+    preferences = dict(
+        session.exec(
+            select(ConsentEntry.consent_template_id, ConsentEntry.preference).where(
+                ConsentEntry.consent_sheet_id == sheet.id
+            )
+        ).all()
+    )
+    assert preferences == {
+        templates[0].id: ConsentStatus.no,
+        templates[1].id: ConsentStatus.maybe,
+        templates[2].id: ConsentStatus.maybe,
+        templates[3].id: ConsentStatus.unknown,
+    }
+    assert set(
+        session.exec(
+            select(ConsentEntry.preference).where(
+                ConsentEntry.consent_sheet_id == other_sheet_id
+            )
+        ).all()
+    ) == {ConsentStatus.unknown}
+    assert (
+        set_category_preference(
+            sheet.id, horror.id, ConsentStatus.maybe, session=session
+        )
+        == []
+    )
+    assert sorted(
+        set_category_preference(
+            sheet.id, horror.id, ConsentStatus.yes, only_unknown=False, session=session
+        )
+    ) == [template.id for template in templates[:3]]
+
+
+def test_stale_sheet_details_are_not_written(session):
+    user = User(id_name="owner", nickname="Owner")
+    session.add(user)
+    session.commit()
+    sheet_id = create_consent_sheet(user, session=session).id
+    # two tabs holding the sheet as loaded at version 0
+    first = ConsentSheet(id=sheet_id, version=0, human_name="first")
+    second = ConsentSheet(id=sheet_id, version=0, human_name="second")
+
+    update_sheet_details(first, session=session)
+    with pytest.raises(ConcurrentUpdateError) as conflict:
+        update_sheet_details(second, session=session)
+
+    assert first.version == 1
+    assert (conflict.value.table, conflict.value.row_id) == ("consentsheet", sheet_id)
+    assert session.exec(
+        select(ConsentSheet.human_name, ConsentSheet.version).where(
+            ConsentSheet.id == sheet_id
+        )
+    ).one() == ("first", 1)
@@ -0,0 +1,79 @@
+from sqlalchemy import event
+
+from models.db_models import ConsentSheet, User
+from services.group_service import (
+    assign_consent_sheet_to_group,
+    create_new_group,
+    join_group,
+    leave_group,
+    unassign_consent_sheet_from_group,
+)
+from services.sheet_service import create_consent_sheet
+from services.sheet_visibility import filter_visible
+
+
+def _count_statements(session):
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(session.get_bind(), "before_cursor_execute", _count)
+    return statements
+
+
+def test_filter_visible_is_batched_and_cached(session):
+    owner = User(id_name="owner", nickname="Owner")
+    member = User(id_name="member", nickname="Member")
+    stranger = User(id_name="stranger", nickname="Stranger")
+    session.add_all([owner, member, stranger])
+    session.commit()
+    group = create_new_group(owner, session=session)
+    join_group(group.invite_code, member, session=session)
+    own_sheets = [create_consent_sheet(member, session=session).id for _ in range(3)]
+    private = create_consent_sheet(stranger, session=session).id
+    public = session.get(
+        ConsentSheet, create_consent_sheet(stranger, session=session).id
+    )
+    public.public_share_id = "public"
+    session.add(public)
+    session.commit()
+
+    requested = [private, public.id, group.gm_consent_sheet_id, *own_sheets]
+    member_id = member.id
+
+    statements = _count_statements(session)
+    assert filter_visible(member_id, requested, session) == requested[1:]
+    assert len(statements) == 2
+    statements.clear()
+    assert filter_visible(member_id, own_sheets, session) == own_sheets
+    assert statements == []
+    assert filter_visible(None, requested, session) == [public.id]
+
+
+def test_membership_and_assignment_changes_invalidate(session):
+    owner = User(id_name="owner", nickname="Owner")
+    member = User(id_name="member", nickname="Member")
+    session.add_all([owner, member])
+    session.commit()
+    group = create_new_group(owner, session=session)
+    member_sheet = session.get(
+        ConsentSheet, create_consent_sheet(member, session=session).id
+    )
+    gm_sheet = group.gm_consent_sheet_id
+    assert filter_visible(member, [gm_sheet], session) == []
+
+    join_group(group.invite_code, member, session=session)
+    assert filter_visible(member, [gm_sheet], session) == [gm_sheet]
+    assert filter_visible(owner, [member_sheet.id], session) == []
+
+    assign_consent_sheet_to_group(member_sheet, group, session=session)
+    assert filter_visible(owner, [member_sheet.id], session) == [member_sheet.id]
+
+    unassign_consent_sheet_from_group(member_sheet, group, session=session)
+    assert filter_visible(owner, [member_sheet.id], session) == []
+
+    assign_consent_sheet_to_group(member_sheet, group, session=session)
+    leave_group(group, member, session=session)
+    assert filter_visible(member, [gm_sheet], session) == []
+    assert filter_visible(owner, [member_sheet.id], session) == []
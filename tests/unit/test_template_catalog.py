@@ -0,0 +1,59 @@
+import dataclasses
+
+import pytest
+
+from controller import admin_controller
+from models.db_models import ConsentTemplate, LocalizedText
+from services.template_catalog import get_template_catalog
+
+
+def _add_templates(session):
+    violence = LocalizedText(text_en="Violence", text_de="Gewalt")
+    horror = LocalizedText(text_en="Horror", text_de="Horror")
+    topic = LocalizedText(text_en="Blood", text_de="Blut")
+    explanation = LocalizedText(text_en="Lots of it", text_de="Viel davon")
+    session.add_all([violence, horror, topic, explanation])
+    session.commit()
+    templates = [
+        ConsentTemplate(
+            category_id=category.id, topic_id=topic.id, explanation_id=explanation.id
+        )
+        for category in (horror, violence, horror)
+    ]
+    session.add_all(templates)
+    session.commit()
+    return violence, horror, topic, templates
+
+
+def test_catalog_indexes_and_groups_templates(session):
+    violence, horror, topic, templates = _add_templates(session)
+
+    catalog = get_template_catalog(session)
+
+    assert [template.id for template in catalog] == [t.id for t in templates]
+    assert catalog.categories == tuple(sorted([violence.id, horror.id]))
+    assert [t.id for t in catalog.grouped[horror.id]] == [
+        templates[0].id,
+        templates[2].id,
+    ]
+    assert catalog.category_text(violence.id).get_text("de") == "Gewalt"
+    template = catalog.get(templates[1].id)
+    assert template.topic_local.get_text("en") == "Blood"
+    assert catalog.get(404) is None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        template.topic_id = 1
+    assert get_template_catalog() is catalog
+
+
+def test_admin_text_edit_publishes_new_version(session, monkeypatch):
+    monkeypatch.setattr(admin_controller, "engine", session.get_bind())
+    _, _, topic, templates = _add_templates(session)
+    catalog = get_template_catalog(session)
+
+    topic.text_en = "Gore"
+    admin_controller.update_localized_text(topic)
+
+    updated = get_template_catalog(session)
+    assert updated.version > catalog.version
+    assert updated.get(templates[0].id).topic_local.get_text("en") == "Gore"
+    assert catalog.get(templates[0].id).topic_local.get_text("en") == "Blood"
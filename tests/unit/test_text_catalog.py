@@ -0,0 +1,40 @@
+from controller import admin_controller
+from models.db_models import LocalizedText
+from services.text_catalog import get_language_texts, lookup_texts
+
+
+def _add_texts(session):
+    texts = [
+        LocalizedText(text_en="Question", text_de="Frage"),
+        LocalizedText(text_en="Answer", text_de="Antwort"),
+        LocalizedText(text_en="Unused", text_de="Unbenutzt"),
+    ]
+    session.add_all(texts)
+    session.commit()
+    return texts
+
+
+def test_texts_are_shared_per_language(session):
+    question, answer, _ = _add_texts(session)
+
+    german = get_language_texts("de", session)
+
+    assert german.get(question.id) == "Frage"
+    assert german.lookup([answer.id, 404]) == {answer.id: "Antwort"}
+    assert get_language_texts("de") is german
+    assert get_language_texts("fr", session).get(question.id) == "Question"
+    assert lookup_texts([question.id], "en") == {question.id: "Question"}
+
+
+def test_admin_text_edit_reloads_languages(session, monkeypatch):
+    monkeypatch.setattr(admin_controller, "engine", session.get_bind())
+    question, _, _ = _add_texts(session)
+    english = get_language_texts("en", session)
+
+    question.text_en = "New question"
+    admin_controller.update_localized_text(question)
+
+    updated = get_language_texts("en", session)
+    assert updated.version > english.version
+    assert updated.get(question.id) == "New question"
+    assert english.get(question.id) == "Question"